@@ -1,22 +1,43 @@
 import streamlit as st
 import pandas as pd
-import openpyxl
-from openpyxl.styles import Font
 from datetime import datetime, timedelta
-import base64
-import plotly.express as px  # Import Plotly Express
-import plotly.graph_objects as go  # Import graph_objects
+import hashlib
 import io
 import os
-import matplotlib.pyplot as plt
 import numpy as np
 
+from planner import (
+    GANTT_GROUPINGS,
+    GANTT_MAX_BARS,
+    PLAN_STORAGE,
+    RISK_DISTRIBUTIONS,
+    AnalysisPipeline,
+    EditHistory,
+    MilestoneStore,
+    PlanCache,
+    PlanFormatError,
+    PlanSaver,
+    Portfolio,
+    ProjectCatalog,
+    ProjectPlan,
+    DEPENDENCY_PREFIX,
+    RerunProfiler,
+    ScenarioSet,
+    apply_forecasts,
+    as_milestone_store,
+    build_progress_figure,
+    load_project_catalog,
+    load_project_plan,
+    open_plan_storage,
+    write_project_plan,
+)
+
 def go_to_step(step):
         """Callback function to update the current step."""
         st.session_state["current_step"] = step
 
 
-# --- Sample Project Data (Replace with your actual data) ---
+# --- Sample Project Data (used when PROJECT_CATALOG isn't set) ---
 project_data = {
     "Portfolio": [
         "Portfolio A",
@@ -40,7 +61,6 @@ project_data = {
         "Project 5",
     ],
 }
-project_df = pd.DataFrame(project_data)
 
 # --- Functions ---
 
@@ -75,116 +95,185 @@ def user_message(message):
     )
 
 
+@st.cache_resource
+def get_plan_storage():
+    """Returns the storage plans are saved to, set by PLAN_STORAGE (default: workbooks in the working directory)."""
+    return open_plan_storage(PLAN_STORAGE)
+
+
+@st.cache_resource
+def get_plan_saver():
+    """Returns the write-behind saver shared by all sessions of this server process."""
+    return PlanSaver(get_plan_storage(), profiler=get_profiler())
+
+
 def save_project_plan(project_name, description, stakeholders, target_end_date, milestones, file_path):
-    """Saves the project plan to an Excel file using the browser's 'Save As' dialog."""
+    """Queues the project plan to be saved under file_path in the plan storage by the background saver.
 
-    try:
-        wb = openpyxl.Workbook()
-        ws = wb.active
-
-        ws["A1"] = "Project Name:"
-        ws["B1"].font = Font(size=14, bold=True)
-        ws["A2"] = "Description:"
-        ws["A3"] = "Stakeholders:"
-        ws["A4"] = "Target End Date:"
-        ws["A6"] = "Milestone Name"
-        ws["B6"] = "Start Date"
-        ws["C6"] = "End Date"
-        ws["D6"] = "Milestone Owner"
-        ws["E6"] = "Progress"
-        ws["F6"] = "Status"
-
-        ws["B1"] = project_name
-        ws["B2"] = description
-        ws["B3"] = stakeholders
-        ws["B4"] = target_end_date.strftime("%Y-%m-%d") if target_end_date else "N/A"
-
-        for i, milestone in enumerate(milestones, start=7):
-            ws[f"A{i}"] = milestone["Name"]
-            ws[f"B{i}"] = milestone["Start Date"].strftime("%Y-%m-%d") if milestone["Start Date"] else "N/A"
-            ws[f"C{i}"] = milestone["End Date"].strftime("%Y-%m-%d") if milestone["End Date"] else "N/A"
-            ws[f"D{i}"] = milestone["Milestone Owner"]
-            ws[f"E{i}"] = milestone["Progress"]
-            ws[f"F{i}"] = milestone.get("Status", "")
-
-        # Save to the current working directory
-        full_file_path = os.path.join(os.getcwd(), file_path)
-        wb.save(full_file_path)
-        # st.success(f"Project plan saved as '{file_path}' in '{os.getcwd()}'")
-
-    except Exception as e:
-        st.error(f"Error saving the project plan: {e}")
-
-
-def load_project_plan(file_path):
-    """Loads project plan data from an Excel file, handling 'N/A' for Target End Date."""
-    wb = openpyxl.load_workbook(file_path, data_only=True) # data_only=True to read cell values
-    ws = wb.active
-
-    project_name = ws["B1"].value
-    description = ws["B2"].value
-    stakeholders = ws["B3"].value
-
-    target_end_date_str = ws["B4"].value
-    if target_end_date_str == "N/A" or target_end_date_str is None:
-        target_end_date = None
+    Nothing is written on the request thread: the saver writes the plan once
+    the edits settle, atomically, and only if it changed since the last save.
+    """
+    get_plan_saver().save(file_path, ProjectPlan(project_name, description, stakeholders, target_end_date, milestones))
+
+
+def display_save_status(file_path):
+    """Shows whether the plan saved under file_path is saved, still being saved, or failed to save."""
+    saver = get_plan_saver()
+    status = saver.status(file_path)
+    if status == "error":
+        st.error(f"Error saving the project plan: {saver.error(file_path)}")
+    elif status == "pending":
+        st.info(f"Saving project plan to '{file_path}' in the background...")
     else:
-        try:
-            target_end_date = datetime.strptime(str(target_end_date_str), "%Y-%m-%d").date()  # Convert to string before parsing
-        except ValueError:
-            st.error(
-                f"Invalid date format in the Excel file for 'Target End Date'. Please use YYYY-MM-DD format."
+        st.success(f"Project plan saved to '{file_path}'!")
+
+
+def load_project_plan_with_progress(file_path):
+    """Loads a project plan while showing a progress bar for the milestone rows."""
+    progress_bar = st.progress(0.0, text="Loading project plan...")
+
+    def on_progress(rows_read, total_rows):
+        if total_rows:
+            progress_bar.progress(
+                min(rows_read / total_rows, 1.0), text=f"Loaded {rows_read} of {total_rows} milestones..."
             )
-            return None, None, None, None, None
-        
-    # Handle target_end_date separately as it might be a datetime object already
-    target_end_date_str = ws["B4"].value
-    if target_end_date_str == "N/A" or target_end_date_str is None:
-        target_end_date = None
-    elif isinstance(target_end_date_str, datetime):  # Check if it's already a datetime object
-        target_end_date = target_end_date_str.date()
-    else:
-        target_end_date = datetime.strptime(target_end_date_str, "%Y-%m-%d").date()
-
-    milestones = []
-    for row in ws.iter_rows(min_row=7, values_only=True):
-        if row[0] is None:
-            break
-        name, start_date, end_date, owner, progress, status_progress = row
-
-        # Convert to datetime.date, handling potential 'N/A' values
-        if isinstance(start_date, datetime):
-            start_date = start_date.date() 
-        elif isinstance(start_date, str) and start_date != 'N/A':
-            try:
-                start_date = datetime.strptime(start_date, "%Y-%m-%d").date()
-            except ValueError:
-                start_date = None # Or handle the invalid date format appropriately
-        else:
-            start_date = None 
 
-        if isinstance(end_date, datetime):
-            end_date = end_date.date() 
-        elif isinstance(end_date, str) and end_date != 'N/A':
-            try:
-                end_date = datetime.strptime(end_date, "%Y-%m-%d").date()
-            except ValueError:
-                end_date = None # Or handle the invalid date format appropriately
-        else:
-            end_date = None
+    try:
+        with profile_stage("file parse"):
+            return load_project_plan(file_path, on_progress=on_progress)
+    except PlanFormatError as e:
+        st.error(str(e))
+        return None, None, None, None, None
+    finally:
+        progress_bar.empty()
 
-        milestones.append(
-            {
-                "Name": name,
-                "Start Date": start_date,  
-                "End Date": end_date,    
-                "Milestone Owner": owner,
-                "Progress": progress,
-                "Status": status_progress
-            }
+
+# --- Parsed Plan Cache ---
+
+PLAN_STATE_KEYS = ProjectPlan._fields  # The session_state keys holding the current plan
+
+PLAN_CACHE_BUDGET_MB = float(os.environ.get("PLAN_CACHE_BUDGET_MB", 256))
+
+
+@st.cache_resource
+def get_plan_cache():
+    """Returns the plan cache shared by all sessions of this server process."""
+    return PlanCache(int(PLAN_CACHE_BUDGET_MB * 2**20))
+
+
+def plan_content_hash(uploaded_file):
+    """Returns the SHA-256 hex digest of an uploaded file, hashing its in-memory buffer without copying it."""
+    with uploaded_file.getbuffer() as buffer:
+        return hashlib.sha256(buffer).hexdigest()
+
+
+def load_uploaded_plan(uploaded_file):
+    """Loads a project plan straight from a Streamlit upload buffer.
+
+    Parsed plans are kept in the process-wide plan cache under a hash of the
+    file contents, so reruns, repeat uploads and other sessions opening the
+    same file are not parsed again. If the upload is already the session's
+    current plan, that plan (with any edits) is returned as is.
+    """
+    content_hash = plan_content_hash(uploaded_file)
+    if st.session_state["plan_hash"] == content_hash:
+        return tuple(st.session_state[key] for key in PLAN_STATE_KEYS)
+
+    def load():
+        uploaded_file.seek(0)
+        plan = ProjectPlan(*load_project_plan_with_progress(uploaded_file))
+        return plan if plan.milestones is not None else None
+
+    plan = get_plan_cache().get_or_load(content_hash, load)
+    if plan is None:
+        return None, None, None, None, None
+    st.session_state["plan_hash"] = content_hash
+    # The cached plan is shared and frozen; the session edits a copy-on-write copy
+    return plan._replace(milestones=plan.milestones.copy())
+
+
+def saved_plan_picker(key):
+    """Selectbox of the plans in the plan storage; returns the chosen name, or None to upload a file."""
+    names = get_plan_storage().names()
+    if not names:
+        return None
+    return st.selectbox(
+        "Or open a saved plan",
+        [None] + names,
+        format_func=lambda name: "(upload a file instead)" if name is None else name,
+        key=key,
+    )
+
+
+def load_saved_plan(name):
+    """Loads a plan from the plan storage, or returns the session's plan if it's the one already open."""
+    plan_hash = f"saved:{name}"
+    if st.session_state["plan_hash"] == plan_hash:
+        return tuple(st.session_state[key] for key in PLAN_STATE_KEYS)
+    saver = get_plan_saver()
+    if saver.status(name) == "pending":
+        saver.flush(timeout=30)  # Open the latest edits, not the last save
+    try:
+        with profile_stage("plan load"):
+            plan = get_plan_storage().load(name)
+    except (KeyError, PlanFormatError) as e:
+        st.error(f"Could not open saved plan '{name}': {e}")
+        return None, None, None, None, None
+    st.session_state["plan_hash"] = plan_hash
+    return plan
+
+
+# --- Rerun Profiling ---
+
+PROFILE_PANEL = os.environ.get("PROFILE_PANEL", "0") not in ("", "0")  # Show the sidebar panel
+PROFILE_JSON_PATH = os.environ.get("PROFILE_JSON_PATH")  # Rewritten after every rerun, for dashboards
+
+
+@st.cache_resource
+def get_profiler():
+    """Returns the rerun profiler shared by all sessions of this server process."""
+    return RerunProfiler()
+
+
+def profile_stage(name):
+    """Times a named stage ("file parse", "analysis", ...) of the current rerun."""
+    return get_profiler().stage(name)
+
+
+def display_profile_panel(profiler):
+    """Sidebar panel with the rolling step and stage percentiles and a JSON export."""
+    summary = profiler.summary()
+    with st.sidebar.expander("Performance", expanded=False):
+        st.caption(f"{summary['reruns']} reruns, last {summary['window']} samples per row, times in ms")
+        for title, rows in (("Steps", summary["steps"]), ("Stages", summary["stages"])):
+            if rows:
+                st.markdown(f"**{title}**")
+                st.dataframe(pd.DataFrame.from_dict(rows, orient="index"))
+        st.download_button(
+            "Export JSON",
+            data=profiler.to_json(),
+            file_name="rerun_profile.json",
+            mime="application/json",
+            key="profile_export",
         )
 
-    return project_name, description, stakeholders, target_end_date, milestones
+
+# --- Plan Export ---
+
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def plan_export_bytes():
+    """Returns the session's plan as .xlsx bytes, rebuilt only when the plan or its details change."""
+    plan = ProjectPlan(*(st.session_state[key] for key in PLAN_STATE_KEYS))
+    key = (plan.milestones.token, plan.milestones.version) + tuple(plan[:-1])
+    cached = st.session_state.get("plan_export")
+    if cached is None or cached[0] != key:
+        output = io.BytesIO()
+        with profile_stage("excel write"):
+            write_project_plan(output, *plan)
+        cached = st.session_state["plan_export"] = (key, output.getvalue())
+    return cached[1]
 
 
 def display_project_details(
@@ -200,139 +289,122 @@ def display_project_details(
     )
 
     st.subheader("Milestones:")
-    milestones_display = [
-        {
-            "Name": milestone["Name"],
-            "Start Date": milestone["Start Date"].strftime("%Y-%m-%d") if milestone["Start Date"] else "N/A",
-            "End Date": milestone["End Date"].strftime("%Y-%m-%d") if milestone["End Date"] else "N/A",
-            "Milestone Owner": milestone["Milestone Owner"],
-            "Progress": milestone["Progress"],
-            "Status": milestone.get("Status", "")
-        }
-        for milestone in milestones
-    ]
-    df = pd.DataFrame(milestones_display)
+    df = as_milestone_store(milestones).to_display_frame()
     st.dataframe(df, hide_index=True)
 
-import streamlit as st
-import plotly.graph_objects as go  # Make sure you have Plotly installed!
-import pandas as pd
+def display_plotly_progress(milestone_data, fig=None):
+        st.subheader("Milestone Progress Visualization:")
 
+        if fig is None:
+            df = pd.DataFrame(milestone_data)
+            fig = build_progress_figure(
+                df["Name"].to_numpy(),
+                df["Actual Progress"].astype(float).to_numpy(),
+                df["Expected Progress"].astype(float).to_numpy(),
+            )
 
-import streamlit as st
-import plotly.graph_objects as go
-import pandas as pd
+        # Render the chart!
+        with profile_stage("chart serialization"):
+            st.plotly_chart(fig)
+
+
+def display_gantt_chart(pipeline, key, max_bars=GANTT_MAX_BARS):
+    """Displays the Program Plan Gantt, with zoom and grouping controls for plans over max_bars milestones."""
+    milestones = pipeline.milestones
+    window = None
+    group_by = "time"
+    dates = np.concatenate([milestones.start_dates, milestones.end_dates])
+    dates = dates[~np.isnat(dates)]
+    if len(milestones) > max_bars and len(dates):  # Without dates there is nothing to zoom or group
+        first, last = dates.min().astype(object), dates.max().astype(object)
+        col1, col2 = st.columns(2)
+        with col1:
+            group_by = GANTT_GROUPINGS[
+                st.selectbox("Group milestones by", list(GANTT_GROUPINGS), key=f"{key}_group_by")
+            ]
+        with col2:
+            if first < last:
+                window = st.slider(
+                    "Zoom to dates", min_value=first, max_value=last, value=(first, last), key=f"{key}_window"
+                )
 
-def display_plotly_progress(milestone_data):
-        st.subheader("Milestone Progress Visualization:")
+    df_gantt, aggregated, fig = pipeline.gantt(window, group_by, max_bars)
+    if aggregated:
+        st.caption(
+            f"{int(df_gantt['Milestones'].sum())} milestones are shown as {len(df_gantt)} grouped bars. "
+            f"Zoom in to {max_bars} milestones or fewer to see individual bars."
+        )
+    with profile_stage("chart serialization"):
+        st.plotly_chart(fig, use_container_width=True)
 
-        df = pd.DataFrame(milestone_data)
-        milestone_names = df["Name"].tolist()
 
-        fig = go.Figure()
+def milestone_label(milestones, milestone_id):
+    """Selectbox label for a milestone ID: its name, with the ID added if the name isn't unique."""
+    if milestone_id is None:
+        return "(none)"
+    i = milestones.row_of(milestone_id)
+    if i is None:
+        return f"(deleted #{milestone_id})"  # e.g. a selection whose addition was undone
+    name = milestones.names[i]
+    return name if len(milestones.ids_of(name)) == 1 else f"{name} (#{milestone_id})"
 
-        # --- TOTAL PROGRESS BAR ---
-        fig.add_trace(
-            go.Bar(
-                x=milestone_names,
-                y=[100] * len(milestone_names),
-                marker_color="lightgray",
-                name="Total",  # Name for the legend
-                marker_line_color="white",
-                marker_line_width=2,
-            )
-        )
 
-        annotations = []  
-        for i, row in df.iterrows():
-            actual_progress = float(row["Actual Progress"])
-            expected_progress = float(row["Expected Progress"])
-
-            # --- EXPECTED PROGRESS (Orange) ---
-            if expected_progress > actual_progress:
-                fig.add_trace(
-                    go.Bar(
-                        x=[row["Name"]],  
-                        y=[expected_progress],
-                        marker_color="darkorange",
-                        name="Expected Progress", 
-                        width=0.6, 
-                        showlegend=False # Hide from legend 
-                    )
-                )
+def get_edit_history(milestones):
+    """Returns this session's undo/redo history of the plan, starting over when another plan is opened."""
+    history = st.session_state.get("edit_history")
+    if history is None or history.milestones is not milestones:
+        history = st.session_state["edit_history"] = EditHistory(milestones)
+    return history
 
-                # Annotation for Expected Progress (above)
-                # Format the Expected Progress text:
-                if expected_progress == 100.00:
-                    expected_text = "100%"
-                else:
-                    expected_text = f"{expected_progress:.2f}%"
-    
-                annotations.append(
-                    dict(
-                        x=row["Name"],
-                        y=expected_progress + 5,
-                        text=expected_text,  # Use the formatted text here
-                        showarrow=False,
-                        font=dict(color="black"),
-                    )
-                )
-            # --- ACTUAL PROGRESS (Green) --- 
-            fig.add_trace(
-                go.Bar(
-                    x=[row["Name"]], 
-                    y=[actual_progress],
-                    marker_color="green",
-                    name="Actual Progress",  
-                    width=0.6,
-                    showlegend=False  # Hide from legend if expected_progress is shown
-                )
-            )
 
-            # Annotation for Actual Progress (below or center)
-            if expected_progress > actual_progress:
-                y_position = actual_progress - 5  # Below orange bar
-            else:
-                y_position = actual_progress / 2  # Centered
-
-            annotations.append(
-                dict(
-                    x=row["Name"],
-                    y=y_position, 
-                    text=f"{actual_progress:.0f}%" if actual_progress < 100 else "",
-                    showarrow=False,
-                    font=dict(color="white"),
-                )
-            )
+def describe_edit(milestones, edit):
+    """Button label text for an Edit, e.g. "modify 'Design' (Progress)"."""
+    if edit.kind == "update":
+        return f"modify '{milestone_label(milestones, edit.milestone_id)}' ({', '.join(edit.after)})"
+    milestone = edit.after if edit.kind == "insert" else edit.before
+    return f"{'add' if edit.kind == 'insert' else 'delete'} '{milestone['Name']}'"
 
-        # Update the figure layout
-        fig.update_layout(
-            barmode="overlay",
-            xaxis_tickangle=-45,
-            title="Milestone Progress",
-            xaxis_title="Milestone Name",
-            yaxis_title="Progress (%)",
-            plot_bgcolor="rgba(0,0,0,0)",  # Transparent background
-            annotations=annotations,  # Add annotations to the layout
-            bargap=0.1,
-            yaxis=dict(
-                range=[
-                    0,
-                    max(
-                        [float(row["Expected Progress"]) for _, row in df.iterrows()],
-                        default=100,
-                    )
-                    + 10,
-                ]
-            ),
+
+def apply_undo_redo(history, redo=False):
+    """Undo/Redo button callback; bumps edit_revision so the editing widgets show the restored values."""
+    if redo:
+        history.redo()
+    else:
+        history.undo()
+    st.session_state["edit_revision"] = st.session_state.get("edit_revision", 0) + 1
+
+
+def undo_redo_buttons(history):
+    """Undo and Redo buttons for the milestone edits.
+
+    They act in on_click callbacks, which run before the rerun draws the
+    editing widgets; drawn after them, their labels include this run's edit.
+    """
+    undo_col, redo_col = st.columns(2)
+    with undo_col:
+        edit = history.next_undo()
+        st.button(
+            f"Undo {describe_edit(history.milestones, edit)}" if edit else "Undo",
+            on_click=apply_undo_redo,
+            args=(history,),
+            disabled=edit is None,
+            key="undo_button",
+        )
+    with redo_col:
+        edit = history.next_redo()
+        st.button(
+            f"Redo {describe_edit(history.milestones, edit)}" if edit else "Redo",
+            on_click=apply_undo_redo,
+            args=(history, True),
+            disabled=edit is None,
+            key="redo_button",
         )
 
-        # Render the chart!
-        st.plotly_chart(fig)
 
 def milestone_actions(milestones, file_path=None):
     """Handles adding milestones with confirmation."""
     st.subheader("Milestone Actions:")
+    history = get_edit_history(milestones)  # Edits below go through it so they can be undone
 
     col1, col2 = st.columns(2) # Create two columns
 
@@ -356,64 +428,62 @@ def milestone_actions(milestones, file_path=None):
                 "Status": st.text_input("Status"),  
             }
             if st.button("Add Milestone"):
-                milestones.append(new_milestone)
+                history.append(new_milestone)
                 st.success("Milestone added!")
                 
 
         elif action == "Modify Existing Milestone":
             milestone_to_modify = st.selectbox(
                 "Select Milestone to Modify",
-                [m["Name"] for m in milestones],
+                milestones.ids.tolist(),  # Selected by ID, so duplicate names and edits don't mix milestones up
+                format_func=lambda milestone_id: milestone_label(milestones, milestone_id),
                 key="modify_milestone_selectbox",
             )
             st.session_state["selected_milestone"] = milestone_to_modify
-            for i, milestone in enumerate(milestones):
-                if milestone["Name"] == milestone_to_modify:
-                    st.write(f"**Modifying Milestone:** {milestone_to_modify}")
-                    milestones[i]["Name"] = st.text_input(
-                        "Milestone Name", value=milestone["Name"]
-                    )
-
-                    # Convert string dates to datetime objects:
-                    start_date_value = (
-                        datetime.strptime(milestone["Start Date"], "%Y-%m-%d").date()
-                        if isinstance(milestone["Start Date"], str)
-                        else milestone["Start Date"]
-                    )
-                    end_date_value = (
-                        datetime.strptime(milestone["End Date"], "%Y-%m-%d").date()
-                        if isinstance(milestone["End Date"], str)
-                        else milestone["End Date"]
-                    )
-
-                    milestones[i]["Start Date"] = st.date_input(
-                        "Start Date", value=start_date_value
-                    )  # No need to convert to string
-
-                    milestones[i]["End Date"] = st.date_input(
-                        "End Date", value=end_date_value
-                    )  # No need to convert to string
-
-                    milestones[i]["Milestone Owner"] = st.text_input(
-                        "Milestone Owner", value=milestone["Milestone Owner"]
-                    )
-                    milestones[i]["Progress"] = st.number_input(
-                        "Progress (0-100)",
-                        min_value=0,
-                        max_value=100,
-                        value=int(milestone["Progress"])
-                        if isinstance(milestone["Progress"], int)
-                        else 0,
-                        step=1,
-                    )
-
-                    # Modify Status  in the UI
-                    milestones[i]["Status"] = st.text_input(
-                        "Status",
-                        value=milestone.get("Status", ""),
-                    )
-
-                    break
+            i = milestones.row_of(milestone_to_modify) if milestone_to_modify is not None else None
+            if i is not None:
+                milestone = milestones[i]
+                # Keyed by the undo/redo count, so an undo or redo redraws the fields with the restored values
+                widget_key = f"{milestone_to_modify}_{st.session_state.get('edit_revision', 0)}"
+                st.write(f"**Modifying Milestone:** {milestone['Name']}")
+                milestone["Name"] = st.text_input(
+                    "Milestone Name", value=milestone["Name"], key=f"modify_name_{widget_key}"
+                )
+
+                # The store hands out datetime.date objects (or None for "N/A")
+                start_date_value = milestone["Start Date"]
+                end_date_value = milestone["End Date"]
+
+                milestone["Start Date"] = st.date_input(
+                    "Start Date", value=start_date_value, key=f"modify_start_{widget_key}"
+                )  # No need to convert to string
+
+                milestone["End Date"] = st.date_input(
+                    "End Date", value=end_date_value, key=f"modify_end_{widget_key}"
+                )  # No need to convert to string
+
+                milestone["Milestone Owner"] = st.text_input(
+                    "Milestone Owner", value=milestone["Milestone Owner"], key=f"modify_owner_{widget_key}"
+                )
+                milestone["Progress"] = st.number_input(
+                    "Progress (0-100)",
+                    min_value=0,
+                    max_value=100,
+                    value=int(milestone["Progress"])
+                    if isinstance(milestone["Progress"], int)
+                    else 0,
+                    step=1,
+                    key=f"modify_progress_{widget_key}",
+                )
+
+                # Modify Status  in the UI
+                milestone["Status"] = st.text_input(
+                    "Status",
+                    value=milestone.get("Status", ""),
+                    key=f"modify_status_{widget_key}",
+                )
+
+                history.update(i, milestone)  # Only bumps the plan version (and records an edit) if something changed
             if st.button("Save Milestone Changes"):
                 st.success("Milestone modified!")
                 
@@ -421,16 +491,17 @@ def milestone_actions(milestones, file_path=None):
         elif action == "Delete Milestone":
             milestone_to_delete = st.selectbox(
                 "Select Milestone to Delete",
-                [m["Name"] for m in milestones],
+                milestones.ids.tolist(),
+                format_func=lambda milestone_id: milestone_label(milestones, milestone_id),
                 key="delete_milestone_selectbox",
             )
             st.session_state["selected_milestone"] = milestone_to_delete
             if st.button("Confirm Delete"):
-                for i, milestone in enumerate(milestones):
-                    if milestone["Name"] == milestone_to_delete:
-                        del milestones[i]
-                        st.success(f"Milestone '{milestone_to_delete}' deleted!")
-                        break
+                i = milestones.row_of(milestone_to_delete) if milestone_to_delete is not None else None
+                if i is not None:
+                    name = milestones.names[i]
+                    history.delete(i)
+                    st.success(f"Milestone '{name}' deleted!")
                     
 
     with col2:
@@ -446,6 +517,8 @@ def milestone_actions(milestones, file_path=None):
             st.session_state["milestones"], # Display the updated milestones 
         )
 
+    undo_redo_buttons(history)
+
     # Add the "Next" button after the modification controls
     if st.button("Next",on_click=go_to_step, args=(6,), key="next_button_5"):
         # Save the modified project plan
@@ -460,7 +533,7 @@ def milestone_actions(milestones, file_path=None):
                     st.session_state["file_path"],  # Use the original file name
                 )
 
-                st.success(f"Project plan saved to '{st.session_state['file_path']}'!")
+                display_save_status(st.session_state["file_path"])
 
                 
                 st.session_state["current_step"] = 12  # Proceed to Step 12
@@ -492,68 +565,278 @@ def milestone_actions(milestones, file_path=None):
 
 # --- Milestone Analysis Functions ---
 
-def calculate_program_duration(milestones):
-    """Calculates the extreme start and end dates and the program duration."""
-    start_dates = [m["Start Date"] for m in milestones]  # No need for strptime()
-    end_dates = [m["End Date"] for m in milestones]  # No need for strptime()
+def get_analysis_pipeline():
+    """Returns this session's analysis pipeline, bound to the current plan and today's date.
 
-    # Convert to datetime.date objects if needed:
-    start_dates = [d.date() if isinstance(d, datetime) else d for d in start_dates]
-    end_dates = [d.date() if isinstance(d, datetime) else d for d in end_dates]
+    The plan's dependency milestones are updated from their upstream projects
+    first, so the pipeline analyses the plan as it will be shown.
+    """
+    if "analysis_pipeline" not in st.session_state:
+        st.session_state["analysis_pipeline"] = AnalysisPipeline(profiler=get_profiler())
+    st.session_state["upstream_forecasts"] = resolve_upstream_dependencies(st.session_state["milestones"])
+    return st.session_state["analysis_pipeline"].bind(
+        st.session_state["milestones"], datetime.now().date(), st.session_state["target_end_date"]
+    )
 
-    extreme_start_date = min(start_dates)
-    extreme_end_date = max(end_dates)
-    program_duration = (extreme_end_date - extreme_start_date).days
 
-    return extreme_start_date, extreme_end_date, program_duration
+def display_analysis(pipeline, key):
+    """Displays the project duration, delay warnings, status table and charts for a plan."""
+    upstream = st.session_state.get("upstream_forecasts")
+    (extreme_start_date, extreme_end_date, program_duration) = pipeline.duration()
+    if program_duration is None:  # No milestone has a start or an end date yet
+        extreme_start_date = extreme_end_date = program_duration = "N/A"
+    else:
+        extreme_start_date = extreme_start_date.strftime('%Y-%m-%d')
+        extreme_end_date = extreme_end_date.strftime('%Y-%m-%d')
+    chatbot_message(
+        f"Your project is planned to run from {extreme_start_date} to {extreme_end_date}, a total of {program_duration} days."
+    )
 
+    # --- DISPLAY DELAY WARNINGS IN A BOX ---
+    delay_warnings = pipeline.delay_warnings()
+    if delay_warnings:
+        st.warning("Project Warnings:")
+        with st.expander("View Milestone Delay Details", expanded=False):  # Expandable box
+            for warning in delay_warnings:
+                st.markdown(f"- {warning}")  # Display each warning with a bullet point
+
+    # Display Milestone Status
+    st.subheader("Milestone Status:")
+    st.dataframe(pipeline.status_table(), hide_index=True)
+
+    # --- Dependencies and Critical Path ---
+    if len(pipeline.milestones.dependencies):
+        st.subheader("Dependencies and Critical Path:")
+        critical_path = [pipeline.milestones.names[i] for i in pipeline.schedule().critical_path]
+        chatbot_message(f"Critical path: {' → '.join(critical_path)}")
+        schedule_warnings = pipeline.schedule_warnings()
+        if schedule_warnings:
+            st.warning("Some milestones are pushed back by their dependencies:")
+            with st.expander("View Dependency Delay Details", expanded=False):
+                for warning in schedule_warnings:
+                    st.markdown(f"- {warning}")
+        st.dataframe(pipeline.schedule_table(), hide_index=True)
+
+    # --- Upstream Projects ---
+    if upstream:
+        st.subheader("Upstream Projects:")
+        st.caption("Forecasts from the upstream projects' saved plans; the dependency milestones follow them.")
+        st.dataframe(upstream_forecast_frame(upstream), hide_index=True)
+
+    # --- Schedule Risk ---
+    display_schedule_risk(pipeline, key)
+
+    # --- What-If Scenarios ---
+    display_scenarios(pipeline, key)
+
+    # --- Program Plan Visualization ---
+    st.subheader("Program Plan Visualization:")
+    display_gantt_chart(pipeline, key=f"gantt_{key}")
+
+    # Milestone Progress Visualization (Plotly)
+    display_plotly_progress(pipeline.status_table(), fig=pipeline.progress_figure())
+
+
+RISK_TRIAL_OPTIONS = (1000, 2000, 5000, 10000, 20000, 50000)
+
+
+def display_schedule_risk(pipeline, key):
+    """Monte Carlo finish-date percentiles and the chance of meeting the target end date."""
+    st.subheader("Schedule Risk:")
+    with st.expander("Simulation Settings", expanded=False):
+        trials = st.select_slider("Trials", RISK_TRIAL_OPTIONS, value=5000, key=f"risk_trials_{key}")
+        distribution = st.selectbox("Duration distribution", RISK_DISTRIBUTIONS, key=f"risk_distribution_{key}")
+        optimistic = st.slider(
+            "Best case (% of the remaining duration)", 50, 100, 90, step=5, key=f"risk_optimistic_{key}"
+        )
+        pessimistic = st.slider(
+            "Worst case (% of the remaining duration)", 100, 300, 150, step=5, key=f"risk_pessimistic_{key}"
+        )
+    risk = pipeline.schedule_risk(trials, distribution, optimistic / 100, pessimistic / 100)
+    if not risk.trials:
+        st.info("Add start and end dates to the milestones to simulate the schedule risk.")
+        return
 
-def analyze_milestone_progress(milestone, extreme_start_date, extreme_end_date, target_end_date):
-    """Analyzes the progress of a single milestone."""
-    milestone_start = milestone["Start Date"] 
-    milestone_end = milestone["End Date"] 
-    progress = int(milestone["Progress"]) 
+    if risk.on_time_probability is not None:
+        target_end_date = pipeline.target_end_date.strftime("%Y-%m-%d")
+        chatbot_message(
+            f"In {risk.trials} simulated schedules the project finishes by its target end date ({target_end_date}) {risk.on_time_probability:.0%} of the time."
+        )
+    st.dataframe(
+        pd.DataFrame(
+            {
+                "Finish Date": ["Planned", "P50", "P80", "P95"],
+                "Date": [risk.planned_finish, risk.p50, risk.p80, risk.p95],
+            }
+        ),
+        hide_index=True,
+    )
+    drivers = np.argsort(risk.finish_drivers)[::-1][:5]
+    drivers = drivers[risk.finish_drivers[drivers] > 0]
+    if len(drivers):
+        st.caption("Milestones that most often finish last:")
+        st.dataframe(
+            pd.DataFrame(
+                {
+                    "Milestone": pipeline.milestones.names[drivers],
+                    "Finishes Last": [f"{share:.0%}" for share in risk.finish_drivers[drivers]],
+                }
+            ),
+            hide_index=True,
+        )
 
-    milestone_start = milestone_start.date() if isinstance(milestone_start, datetime) else milestone_start
-    milestone_end = milestone_end.date() if isinstance(milestone_end, datetime) else milestone_end
 
-    today = datetime.now().date()
+# --- What-If Scenarios ---
 
-    # 1. Calculate Expected Progress Based on Time:
-    total_milestone_days = (milestone_end - milestone_start).days
-    days_elapsed = (today - milestone_start).days
+BASE_PLAN_LABEL = "Base plan"
 
-    expected_progress = (days_elapsed / total_milestone_days) * 100 if total_milestone_days > 0 else 100
-    expected_progress = min(expected_progress, 100)  # Cap at 100%
 
-    # 2. Determine Milestone Status: 
-    status = "On Track"  # Default status
-    warning = "" 
+def get_scenarios(pipeline):
+    """Returns this session's what-if scenarios of the plan, starting over when another plan is opened."""
+    scenarios = st.session_state.get("scenarios")
+    if scenarios is None or scenarios.plan is not pipeline.milestones:
+        scenarios = st.session_state["scenarios"] = ScenarioSet(pipeline)
+    return scenarios
 
-    if milestone_end < today:  # Milestone end date has passed
-        if progress == 100:
-            status = "Completed"
-        else:
-            status = "Behind Schedule"
-            warning = f"Milestone '{milestone['Name']}' is past its end date and not 100% complete."
-    elif milestone_start <= today <= milestone_end:  # Milestone is in progress
-        if progress < expected_progress - 10:
-            status = "Behind Schedule"
-            warning = f"Milestone '{milestone['Name']}' is behind schedule! It should be at about {expected_progress:.2f}% progress."
-    
-    # Check against target end date (if provided)
-    if target_end_date and milestone_end > target_end_date:
-        status = "Critical"
-        warning = f"Milestone '{milestone['Name']}' end date is after the project target end date! This needs immediate attention."
 
-    return status, warning, expected_progress
+def display_scenarios(pipeline, key):
+    """Branches what-if scenarios off the plan, edits them and compares them side by side."""
+    st.subheader("What-If Scenarios:")
+    scenarios = get_scenarios(pipeline)
+    with st.expander("Create or Edit Scenarios", expanded=not len(scenarios)):
+        name = st.text_input("Scenario name", key=f"scenario_name_{key}")
+        source = st.selectbox("Start from", [BASE_PLAN_LABEL] + scenarios.names(), key=f"scenario_source_{key}")
+        if st.button("Create Scenario", key=f"scenario_create_{key}"):
+            try:
+                scenarios.branch(name, None if source == BASE_PLAN_LABEL else source)
+                st.success(f"Scenario '{name.strip()}' created!")
+            except ValueError as e:
+                st.error(str(e))
+        if len(scenarios):
+            edit_scenario(scenarios, key)
+
+    if len(scenarios):
+        st.caption("Scenarios share the plan's unchanged milestones and analysis; later edits to the plan don't reach them.")
+        st.dataframe(scenarios.compare(), hide_index=True)
+    else:
+        st.caption("Create a scenario to try out changes to the plan without touching it.")
+
+
+def edit_scenario(scenarios, key):
+    """Moves or updates the progress of one milestone of a scenario, or deletes the scenario."""
+    name = st.selectbox("Scenario to edit", scenarios.names(), key=f"scenario_edit_{key}")
+    milestones = scenarios[name].milestones
+    milestone_id = st.selectbox(
+        "Milestone",
+        milestones.ids.tolist(),
+        format_func=lambda milestone_id: milestone_label(milestones, milestone_id),
+        key=f"scenario_milestone_{key}",
+    )
+    if milestone_id is None:
+        return
+    i = milestones.row_of(milestone_id)
+    milestone = milestones[i]
+    shift = st.number_input("Move by (days)", value=0, step=1, key=f"scenario_shift_{key}")
+    progress = st.number_input(
+        "Progress (0-100)",
+        min_value=0,
+        max_value=100,
+        value=int(milestone["Progress"] or 0),
+        step=1,
+        key=f"scenario_progress_{key}_{name}_{milestone_id}",
+    )
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("Apply to Scenario", key=f"scenario_apply_{key}"):
+            change = {"Progress": progress}
+            for field in ("Start Date", "End Date"):
+                if milestone[field] is not None:
+                    change[field] = milestone[field] + timedelta(days=int(shift))
+            milestones.update(i, change)
+            st.success(f"Scenario '{name}' updated!")
+    with col2:
+        if st.button("Delete Scenario", key=f"scenario_delete_{key}"):
+            scenarios.remove(name)
+            st.success(f"Scenario '{name}' deleted!")
+
+
+# --- Project Catalog ---
+
+PROJECT_CATALOG = os.environ.get("PROJECT_CATALOG")  # .csv/.xlsx/.parquet file or SQLite database of projects
+PROJECT_SEARCH_LIMIT = 200  # Most projects offered in the project selectbox at once
+
+
+@st.cache_resource(max_entries=2)
+def load_catalog(path, modified):
+    """Loads and indexes the project catalog; modified (the file's mtime) reloads it when the file changes."""
+    if path is None:
+        return ProjectCatalog.from_records(project_data)
+    return load_project_catalog(path)
+
+
+def get_project_catalog():
+    """Returns the project catalog from PROJECT_CATALOG, or the sample projects if it isn't set."""
+    if not PROJECT_CATALOG:
+        return load_catalog(None, None)
+    return load_catalog(PROJECT_CATALOG, os.path.getmtime(PROJECT_CATALOG))
+
+
+# --- Cross-Project Dependencies ---
+
+@st.cache_resource
+def get_portfolio():
+    """Returns the portfolio forecaster shared by all sessions, loading plans through the plan cache."""
+    return Portfolio(get_plan_storage(), get_plan_cache())
+
+
+def current_portfolio():
+    """The shared portfolio, with its project -> saved plan names taken from the current catalog."""
+    portfolio = get_portfolio()
+    portfolio.plan_names = get_project_catalog().plan_names()
+    return portfolio
+
+
+def resolve_upstream_dependencies(milestones):
+    """Updates the plan's dependency milestones from their upstream projects' saved plans.
+
+    Returns {project name: ProjectForecast} for the upstream projects that
+    have a saved plan; the others keep the dates they were added with.
+    """
+    with profile_stage("dependency resolution"):
+        forecasts = current_portfolio().upstream_forecasts(milestones)
+        apply_forecasts(milestones, forecasts)
+    return forecasts
+
+
+def upstream_forecast_frame(forecasts):
+    """Table of upstream project forecasts, with how many days each finishes after its target."""
+    rows = []
+    for project, forecast in sorted(forecasts.items()):
+        late = None
+        if forecast.finish_date and forecast.target_end_date:
+            late = max((forecast.finish_date - forecast.target_end_date).days, 0)
+        rows.append(
+            {
+                "Project": project,
+                "Forecast Start": forecast.start_date,
+                "Forecast Finish": forecast.finish_date,
+                "Progress": forecast.progress,
+                "Target End Date": forecast.target_end_date,
+                "Days Past Target": late,
+            }
+        )
+    return pd.DataFrame(rows)
 
 
 # --- Dependency Functions ---
 
-def add_dependency_milestone(milestones, dependent_project_name, start_date, end_date, progress=0):  # Add progress parameter
-    """Adds a dependency milestone to the project plan."""
-    dependency_milestone_name = f"d - Dependency on {dependent_project_name}"
+def add_dependency_milestone(milestones, dependent_project_name, start_date, end_date, progress=0, successor=None, lag_days=0):  # Add progress parameter
+    """Adds a dependency milestone to the project plan.
+
+    If successor (a milestone ID) is given, that milestone is made to depend
+    on the new one, starting lag_days after it finishes.
+    """
+    dependency_milestone_name = f"{DEPENDENCY_PREFIX}{dependent_project_name}"
     new_milestone = {
         "Name": dependency_milestone_name,
         "Start Date": start_date, # No need for strftime here (dates are already datetime.date objects)
@@ -563,34 +846,56 @@ def add_dependency_milestone(milestones, dependent_project_name, start_date, end
         "Status": "",
     }
     milestones.append(new_milestone)
+    if successor is not None:
+        milestones.add_dependency(milestones.ids[-1], successor, lag_days)
     return milestones
 
 def handle_dependency_input(milestones, project_name, file_path):
     """Handles user input for dependency details."""
     chatbot_message("Please select the portfolio and sub-portfolio for the dependent project.")
-    portfolio = st.selectbox("Portfolio", project_df["Portfolio"].unique())
-    sub_portfolio = st.selectbox("Sub-Portfolio", project_df[project_df["Portfolio"] == portfolio]["Sub-Portfolio"].unique())
-
-    # Filter projects based on selected portfolio and sub-portfolio
-    filtered_projects = project_df[
-        (project_df["Portfolio"] == portfolio) & (project_df["Sub-Portfolio"] == sub_portfolio)
-    ]["Project Name"].unique()
-
+    catalog = get_project_catalog()
+    portfolio = st.selectbox("Portfolio", catalog.portfolios())
+    sub_portfolio = st.selectbox("Sub-Portfolio", catalog.sub_portfolios(portfolio))
+
+    # Projects of the selected sub-portfolio, narrowed by name prefix from the catalog's index
+    search = st.text_input("Search projects by name", key="dependency_project_search")
+    filtered_projects = catalog.search(search, portfolio, sub_portfolio)
+    if len(filtered_projects) > PROJECT_SEARCH_LIMIT:
+        st.caption(
+            f"Showing the first {PROJECT_SEARCH_LIMIT} of {len(filtered_projects)} projects; type more of the name to narrow them down."
+        )
     dependent_project_name = st.selectbox(
-        "Dependent Project Plan Name:", filtered_projects
+        "Dependent Project Plan Name:", filtered_projects[:PROJECT_SEARCH_LIMIT].tolist()
     )
-    start_date = st.date_input("Dependency Start Date", value=None)
-    end_date = st.date_input("Dependency End Date", value=None)
-    progress = st.number_input("Dependency Progress (0-100)", min_value=0, max_value=100, value=0) # Add Progress input
+    # A project with a saved plan fills in its own forecast, which analysis keeps up to date
+    forecast = current_portfolio().forecast(dependent_project_name) if dependent_project_name else None
+    if forecast is not None and forecast.finish_date is not None:
+        st.caption(f"Dates and progress come from the saved plan of '{dependent_project_name}' and follow it from now on.")
+    else:
+        forecast = None
+    start_date = st.date_input("Dependency Start Date", value=forecast.start_date if forecast else None)
+    end_date = st.date_input("Dependency End Date", value=forecast.finish_date if forecast else None)
+    progress = st.number_input(
+        "Dependency Progress (0-100)", min_value=0, max_value=100, value=forecast.progress if forecast else 0
+    )  # Add Progress input
+    successor = st.selectbox(
+        "Milestone that waits for this dependency",
+        [None] + milestones.ids.tolist(),
+        format_func=lambda milestone_id: milestone_label(milestones, milestone_id),
+        key="dependency_successor",
+    )
+    lag_days = st.number_input("Lag after the dependency finishes (days)", min_value=0, value=0, key="dependency_lag")
 
     # Add dependency milestone to the current project
-    if st.button(f"Add Dependency") and dependent_project_name and start_date and end_date:
+    if st.button("Add Dependency") and dependent_project_name and start_date and end_date:
         milestones = add_dependency_milestone(
             milestones,
             dependent_project_name,
             start_date,
             end_date,
-            progress  # Pass progress to the function
+            progress,  # Pass progress to the function
+            successor=successor,
+            lag_days=int(lag_days),
         )
 
         # --- Do NOT save the plan here. Wait for the "Next" button ---
@@ -609,7 +914,7 @@ def handle_dependency_input(milestones, project_name, file_path):
                     milestones,
                     file_path,
                 )
-                st.success(f"Project plan saved to '{file_path}'!")
+                display_save_status(file_path)
 
                 if not file_path:
                     st.session_state["current_step"] = 7  # Go back to file upload
@@ -690,7 +995,7 @@ if "stakeholders" not in st.session_state:
 if "target_end_date" not in st.session_state:
     st.session_state["target_end_date"] = None
 if "milestones" not in st.session_state:
-    st.session_state["milestones"] = []
+    st.session_state["milestones"] = MilestoneStore()
 if "rating" not in st.session_state:
     st.session_state["rating"] = 1
 if "suggestions" not in st.session_state:
@@ -701,6 +1006,12 @@ if "milestones_entered" not in st.session_state:
     st.session_state["milestones_entered"] = False
 if "dependency_input" not in st.session_state:
     st.session_state["dependency_input"] = False
+if "plan_hash" not in st.session_state:
+    st.session_state["plan_hash"] = None  # Content hash of the uploaded plan currently in the session
+
+# Process-wide plan cache counters, for sizing PLAN_CACHE_BUDGET_MB
+with st.sidebar.expander("Plan cache", expanded=False):
+    st.json(get_plan_cache().stats())
 
 # for key in [
 #     "current_step",
@@ -728,8 +1039,9 @@ def file_upload_section():
     """Handles file upload and data loading, branching to modify or analyze."""
     chatbot_message("Please upload your project plan (.xlsx file).")
     uploaded_file = st.file_uploader("Choose a file", type=["xlsx"])
+    saved_name = saved_plan_picker("saved_plan_analyze") if uploaded_file is None else None
 
-    if uploaded_file is not None:
+    if uploaded_file is not None or saved_name is not None:
         try:
             (
                 st.session_state["project_name"],
@@ -737,7 +1049,7 @@ def file_upload_section():
                 st.session_state["stakeholders"],
                 st.session_state["target_end_date"],
                 st.session_state["milestones"],
-            ) = load_project_plan(uploaded_file.name)
+            ) = load_uploaded_plan(uploaded_file) if uploaded_file is not None else load_saved_plan(saved_name)
 
             if all(
                 val is not None
@@ -749,7 +1061,7 @@ def file_upload_section():
                 ]
             ):
                 chatbot_message("Project plan loaded successfully!")
-                st.session_state["file_path"] = uploaded_file.name
+                st.session_state["file_path"] = uploaded_file.name if uploaded_file is not None else saved_name
 
                 # Show the correct button based on the initial choice
                 if st.session_state["current_step"] == 2:  # Analyze
@@ -778,6 +1090,7 @@ def chatbot_flow():
     #     st.session_state["current_step"] = step
 
     if current_step == 0:
+        st.session_state["plan_hash"] = None  # A new flow loads its upload afresh
         chatbot_message(
             "Welcome! I'm your friendly project planning chatbot. How can I help you today?"
         )
@@ -976,63 +1289,14 @@ def chatbot_flow():
         if not st.session_state["file_path"]:
             chatbot_message("Great! Let's save your project plan. I'll create a file for you to download.")
 
-            # Create the Excel file in memory
-            wb = openpyxl.Workbook()
-            ws = wb.active
-
-            # Add your Excel data to the worksheet
-            ws["A1"] = "Project Name:"
-            ws["B1"].font = Font(size=14, bold=True)
-            ws["A2"] = "Description:"
-            ws["A3"] = "Stakeholders:"
-            ws["A4"] = "Target End Date:"
-            ws["A6"] = "Milestone Name"
-            ws["B6"] = "Start Date"
-            ws["C6"] = "End Date"
-            ws["D6"] = "Milestone Owner"
-            ws["E6"] = "Progress"
-            ws["F6"] = "Status"
-
-            ws["B1"] = st.session_state["project_name"]
-            ws["B2"] = st.session_state["description"]
-            ws["B3"] = st.session_state["stakeholders"]
-            ws["B4"] = st.session_state["target_end_date"].strftime("%Y-%m-%d") if st.session_state["target_end_date"] else "N/A"
-
-            for i, milestone in enumerate(st.session_state["milestones"], start=7):
-                ws[f"A{i}"] = milestone["Name"]
-                ws[f"B{i}"] = milestone["Start Date"].strftime("%Y-%m-%d") if milestone["Start Date"] else "N/A"
-                ws[f"C{i}"] = milestone["End Date"].strftime("%Y-%m-%d") if milestone["End Date"] else "N/A"
-                ws[f"D{i}"] = milestone["Milestone Owner"]
-                ws[f"E{i}"] = milestone["Progress"]
-                ws[f"F{i}"] = milestone.get("Status", "")
-
-            # Create a bytes stream to hold the Excel file
-            output = io.BytesIO()
-            wb.save(output)
-            output.seek(0)
-
-            # Convert the bytes to a base64 encoded string
-            b64_string = base64.b64encode(output.read()).decode("utf-8")
-
-            # Create a download link
-            href = f'<a href="data:application/vnd.openxmlformats-officedocument.spreadsheetml.sheet;base64,{b64_string}" download="{st.session_state["project_name"]}.xlsx">Download Project Plan</a>'
-
-            st.markdown(href, unsafe_allow_html=True)
-
-            # Add JavaScript to persist the current_step after download
-            st.markdown(
-                """
-                <script>
-                    window.addEventListener('load', function() {
-                        // Get the current_step value from Streamlit session state (replace with your actual key)
-                        var currentStep = JSON.parse(sessionStorage.getItem('streamlit_session_state'))['current_step']; 
-
-                        // Store the current_step in the browser's local storage
-                        localStorage.setItem('current_step', currentStep); 
-                    });
-                </script>
-                """,
-                unsafe_allow_html=True,
+            # The workbook bytes are cached per plan version and only sent when the button is clicked
+            st.download_button(
+                "Download Project Plan",
+                data=plan_export_bytes(),
+                file_name=f"{st.session_state['project_name']}.xlsx",
+                mime=XLSX_MIME,
+                on_click="ignore",  # Downloading doesn't rerun the script
+                key="download_plan_button",
             )
 
             # Ask about analysis after download
@@ -1056,133 +1320,7 @@ def chatbot_flow():
             
     elif current_step == 7.1:  # Project Analysis (New Project or Loaded File)
         chatbot_message("Let's analyze your project plan!")
-
-        # Calculate Program Duration
-        (extreme_start_date, extreme_end_date, program_duration) = calculate_program_duration(
-            st.session_state["milestones"]
-        )
-
-        chatbot_message(
-            f"Your project is planned to run from {extreme_start_date.strftime('%Y-%m-%d')} to {extreme_end_date.strftime('%Y-%m-%d')}, a total of {program_duration} days."
-        )
-
-        # --- COLLECT DELAY WARNINGS ---
-        delay_warnings = []  # Store warnings in a list
-
-        # Analyze Milestone Progress
-        milestone_data = []
-        for milestone in st.session_state["milestones"]:
-            status, warning, expected_progress = analyze_milestone_progress(
-                milestone,
-                extreme_start_date,
-                extreme_end_date,
-                st.session_state["target_end_date"],
-            )
-            
-            # --- ONLY ADD WARNINGS FOR SIGNIFICANT DELAYS --- 
-            if status == "Behind Schedule":
-                milestone_end = milestone["End Date"] 
-                milestone_end = milestone_end.date() if isinstance(milestone_end, datetime) else milestone_end
-
-                today = datetime.now().date()
-                days_behind = (today - milestone_end).days
-
-                if days_behind >= 7: # Example: Consider a milestone delayed if it's 7 or more days past due
-                    delay_warnings.append(warning)
-
-            milestone_data.append(
-                {
-                    "Name": milestone["Name"],
-                    "Status": status,
-                    # --- Format Expected and Actual Progress --- 
-                    "Expected Progress": f"{expected_progress:.2f}", 
-                    "Actual Progress": f"{milestone['Progress']:.2f}",
-                    "Start Date": milestone["Start Date"],
-                    "End Date": milestone["End Date"]
-                }
-            )
-
-        # --- DISPLAY DELAY WARNINGS IN A BOX ---
-        if delay_warnings:
-            st.warning("Project Warnings:")
-            with st.expander("View Milestone Delay Details", expanded=False):  # Expandable box
-                for warning in delay_warnings:
-                    st.markdown(f"- {warning}")  # Display each warning with a bullet point
-
-        # Display Milestone Status
-        st.subheader("Milestone Status:")
-        st.table(milestone_data)
-
-        # --- Program Plan Visualization ---
-        st.subheader("Program Plan Visualization:")
-
-         # --- CREATE THE GANTT CHART DATA --- (This is where you add the code)
-        df_gantt = pd.DataFrame(
-            {
-                "Task": [m["Name"] for m in st.session_state["milestones"]],
-                "Start": [m["Start Date"] for m in st.session_state["milestones"]],
-                "Finish": [m["End Date"] for m in st.session_state["milestones"]],
-                # --- Convert Actual Progress to float --- (Corrected code)
-                "Complete": [float(m["Actual Progress"]) / 100 for m in milestone_data],  # For color 
-            }
-        )
-
-        # --- DETERMINE MILESTONE COLORS ---
-        colors = []
-        today = datetime.now().date()
-        for m in milestone_data:
-            start_date = m["Start Date"].date() if isinstance(m["Start Date"], datetime) else m["Start Date"]
-            end_date = m["End Date"].date() if isinstance(m["End Date"], datetime) else m["End Date"]
-
-            # 1. Delayed Milestones (Red)
-            if m["Status"] == "Behind Schedule": 
-                colors.append("red") 
-
-            # 2. Completed Milestones (Green)
-            elif end_date < today and m["Actual Progress"] == 100: 
-                colors.append("green")  
-
-            # 3. In-Progress Milestones (Light Blue)
-            elif start_date <= today <= end_date: 
-                colors.append("lightblue")  
-
-            # 4. Future Milestones (Gray)
-            else:
-                colors.append("gray")  
-
-        # --- CREATE THE GANTT CHART FIGURE ---
-        fig = px.timeline(
-            df_gantt, 
-            x_start="Start", 
-            x_end="Finish", 
-            y="Task",
-            color="Complete",
-            color_continuous_scale=[(0, "red"), (0.99, "lightblue"), (1, "green")], 
-            range_color=(0, 1),
-        )
-
-        # --- UPDATE PLOTLY LAYOUT ---
-        fig.update_yaxes(autorange="reversed") 
-        fig.update_layout(
-            title="Program Plan",
-            xaxis_title="Date",
-            yaxis_title="Milestones",
-            showlegend=False,
-            xaxis=dict(tickformat="%Y-%m-%d"),
-            hovermode="x unified",
-
-            # --- VISUAL TWEAKS ---
-            plot_bgcolor='rgba(0,0,0,0)' # Transparent background
-        )
-
-        # --- ADD TODAY'S DATE INDICATOR ---
-        fig.add_vline(x=today, line_width=3, line_dash="dash", line_color="red") # Make it more visible
-
-        # --- DISPLAY THE CHART ---
-        st.plotly_chart(fig, use_container_width=True)
-
-        # Milestone Progress Visualization (Plotly)
-        display_plotly_progress(milestone_data)
+        display_analysis(get_analysis_pipeline(), key="7_1")
 
         st.button("Next", on_click=go_to_step, args=(8,), key="next_button_7_1")
 
@@ -1230,8 +1368,9 @@ def chatbot_flow():
     elif current_step == 11:  # Modify Existing Project 
         chatbot_message("Great! Let's modify your plan. Please upload your project plan (.xlsx file).")
         uploaded_file = st.file_uploader("Choose a file", type=["xlsx"])
+        saved_name = saved_plan_picker("saved_plan_modify") if uploaded_file is None else None
 
-        if uploaded_file is not None:
+        if uploaded_file is not None or saved_name is not None:
             try:
                 # --- LOAD PROJECT PLAN ---
                 (
@@ -1240,8 +1379,8 @@ def chatbot_flow():
                     st.session_state["stakeholders"],
                     st.session_state["target_end_date"],
                     st.session_state["milestones"],
-                ) = load_project_plan(uploaded_file.name)
-                st.session_state["file_path"] = uploaded_file.name
+                ) = load_uploaded_plan(uploaded_file) if uploaded_file is not None else load_saved_plan(saved_name)
+                st.session_state["file_path"] = uploaded_file.name if uploaded_file is not None else saved_name
 
                 # --- GO TO MILESTONE MODIFICATION SECTION ---
                 if st.button("Let's Modify it!", on_click=go_to_step, args=(5,), key="next_button_11"):
@@ -1254,7 +1393,7 @@ def chatbot_flow():
     
 
     elif current_step == 12:  # After Modify, before Dependency
-        # Automatically save the modified project plan
+        # Make sure the modified plan is queued for saving; this is a no-op if it already is
         if st.session_state["file_path"]:
             try:
                 save_project_plan(
@@ -1265,12 +1404,10 @@ def chatbot_flow():
                     st.session_state["milestones"],
                     st.session_state["file_path"],  # Use the original file name
                 )
-                st.success(
-                    f"Project plan saved to '{st.session_state['file_path']}'!"
-                )
+                display_save_status(st.session_state["file_path"])
 
                 # --- Update Chatbot Messages ---
-                chatbot_message("Your modified project plan has been saved!") 
+                chatbot_message("Your modified project plan is being saved!")
                 chatbot_message("What would you like to do next?")
                 col1, col2 = st.columns(2)
                 with col1:
@@ -1289,130 +1426,7 @@ def chatbot_flow():
 
     elif current_step == 11.1: # Analysis after Modification
         chatbot_message("Let's analyze your modified project plan!")
-
-        # --- CALCULATE MILESTONE DATA ---
-        milestone_data = []
-        (extreme_start_date, extreme_end_date, program_duration) = calculate_program_duration(st.session_state["milestones"])
-        
-        delay_warnings = []
-        for milestone in st.session_state["milestones"]:
-            status, warning, expected_progress = analyze_milestone_progress(
-                milestone,
-                extreme_start_date,
-                extreme_end_date,
-                st.session_state["target_end_date"],
-            )
-            
-            # --- ONLY ADD WARNINGS FOR SIGNIFICANT DELAYS --- 
-            if status == "Behind Schedule":
-                milestone_end = milestone["End Date"] 
-                milestone_end = milestone_end.date() if isinstance(milestone_end, datetime) else milestone_end
-    
-                today = datetime.now().date()
-                days_behind = (today - milestone_end).days
-                
-                if days_behind >= 7: # Example: Consider a milestone delayed if it's 7 or more days past due
-                    delay_warnings.append(warning)
-
-
-            milestone_data.append(
-                {
-                    "Name": milestone["Name"],
-                    "Status": status,
-                    "Expected Progress": expected_progress,
-                    "Actual Progress": milestone["Progress"],
-                    "Start Date": milestone["Start Date"],
-                    "End Date": milestone["End Date"]
-                }
-            )
-
-        # --- DISPLAY PROJECT DURATION ---
-        chatbot_message(
-            f"Your project is planned to run from {extreme_start_date.strftime('%Y-%m-%d')} to {extreme_end_date.strftime('%Y-%m-%d')}, a total of {program_duration} days."
-        )
-
-        # --- DISPLAY DELAY WARNINGS ---
-        if delay_warnings:
-            st.warning("Project Warnings:")
-            with st.expander("View Milestone Delay Details", expanded=False):  
-                for warning in delay_warnings:
-                    st.markdown(f"- {warning}") 
-
-        # --- DISPLAY MILESTONE STATUS TABLE ---
-        st.subheader("Milestone Status:")
-        st.table(milestone_data)
-
-        # --- Program Plan Visualization ---
-        st.subheader("Program Plan Visualization:")
-
-        # --- Create Plotly Gantt Chart Data ---
-        df_gantt = pd.DataFrame(
-            {
-                "Task": [m["Name"] for m in st.session_state["milestones"]],
-                "Start": [m["Start Date"] for m in st.session_state["milestones"]],
-                "Finish": [m["End Date"] for m in st.session_state["milestones"]],
-                # --- Convert Actual Progress to float --- (Corrected code)
-                "Complete": [float(m["Actual Progress"]) / 100 for m in milestone_data],  # For color 
-            }
-        )
-
-
-        # --- DETERMINE MILESTONE COLORS ---
-        colors = []
-        today = datetime.now().date()
-        for m in milestone_data:
-            start_date = m["Start Date"].date() if isinstance(m["Start Date"], datetime) else m["Start Date"]
-            end_date = m["End Date"].date() if isinstance(m["End Date"], datetime) else m["End Date"]
-
-            # 1. Delayed Milestones (Red)
-            if m["Status"] == "Behind Schedule": 
-                colors.append("red") 
-
-            # 2. Completed Milestones (Green)
-            elif end_date < today and m["Actual Progress"] == 100: 
-                colors.append("green")  
-
-            # 3. In-Progress Milestones (Light Blue)
-            elif start_date <= today <= end_date: 
-                colors.append("lightblue")  
-
-            # 4. Future Milestones (Gray)
-            else:
-                colors.append("gray")  
-
-        # --- CREATE THE GANTT CHART FIGURE ---
-        fig = px.timeline(
-            df_gantt, 
-            x_start="Start", 
-            x_end="Finish", 
-            y="Task",
-            color="Complete",
-            color_continuous_scale=[(0, "red"), (0.99, "lightblue"), (1, "green")], 
-            range_color=(0, 1),
-        )
-
-        # --- UPDATE PLOTLY LAYOUT ---
-        fig.update_yaxes(autorange="reversed") 
-        fig.update_layout(
-            title="Program Plan",
-            xaxis_title="Date",
-            yaxis_title="Milestones",
-            showlegend=False,
-            xaxis=dict(tickformat="%Y-%m-%d"),
-            hovermode="x unified",
-
-            # --- VISUAL TWEAKS ---
-            plot_bgcolor='rgba(0,0,0,0)' # Transparent background
-        )
-
-        # --- ADD TODAY'S DATE INDICATOR ---
-        fig.add_vline(x=today, line_width=3, line_dash="dash", line_color="red") # Make it more visible
-
-        # --- DISPLAY THE CHART ---
-        st.plotly_chart(fig, use_container_width=True)
-
-        # --- MILESTONE PROGRESS BAR VISUALIZATION ---
-        display_plotly_progress(milestone_data)
+        display_analysis(get_analysis_pipeline(), key="11_1")
 
         # --- GO TO FEEDBACK BUTTON ---
         st.button("Go to Feedback", on_click=go_to_step, args=(13,), key="feedback_button_11_1") 
@@ -1437,4 +1451,10 @@ def chatbot_flow():
 
     
 
-chatbot_flow()  # Run the chatbot flow
\ No newline at end of file
+with get_profiler().rerun(st.session_state["current_step"]):
+    chatbot_flow()  # Run the chatbot flow
+
+if PROFILE_PANEL:
+    display_profile_panel(get_profiler())
+if PROFILE_JSON_PATH:
+    get_profiler().write_json(PROFILE_JSON_PATH)
\ No newline at end of file
@@ -0,0 +1,70 @@
+"""Benchmark of the project catalog lookups behind the dependency selectboxes.
+
+Compares the indexed ProjectCatalog with filtering a DataFrame by boolean
+masks on every rerun, as the app used to:
+
+    python -m benchmarks.catalog --sizes 1000,50000
+"""
+
+import argparse
+import time
+
+from planner import ProjectCatalog
+
+from .synthetic import generate_catalog
+
+
+def _best(function, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _masked_lookup(frame, portfolio, sub_portfolio, prefix):
+    # The cascading selectboxes' options, as filtered from the frame before the catalog
+    frame["Portfolio"].unique()
+    frame[frame["Portfolio"] == portfolio]["Sub-Portfolio"].unique()
+    projects = frame[(frame["Portfolio"] == portfolio) & (frame["Sub-Portfolio"] == sub_portfolio)]["Project Name"]
+    return projects[projects.str.lower().str.startswith(prefix.lower())].unique()
+
+
+def _indexed_lookup(catalog, portfolio, sub_portfolio, prefix):
+    catalog.portfolios()
+    catalog.sub_portfolios(portfolio)
+    return catalog.search(prefix, portfolio, sub_portfolio)
+
+
+def run(sizes, repeat=20):
+    """Prints the time to build the catalog and to compute one rerun's options both ways."""
+    print(f"{'projects':>9}{'build':>12}{'masks':>12}{'indexed':>12}")
+    for size in sizes:
+        frame = generate_catalog(size)
+        start = time.perf_counter()
+        catalog = ProjectCatalog(frame)
+        build = time.perf_counter() - start
+        portfolio = catalog.portfolios()[0]
+        sub_portfolio = catalog.sub_portfolios(portfolio)[0]
+        masks = _best(lambda: _masked_lookup(frame, portfolio, sub_portfolio, "word1"), repeat)
+        indexed = _best(lambda: _indexed_lookup(catalog, portfolio, sub_portfolio, "word1"), repeat)
+        print(f"{size:>9}{build * 1000:>9.1f} ms{masks * 1000:>9.2f} ms{indexed * 1000:>9.3f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark project catalog lookups.")
+    parser.add_argument(
+        "--sizes",
+        type=lambda text: [int(size) for size in text.split(",")],
+        default=[1000, 10000, 50000],
+        help="comma-separated project counts (default: %(default)s)",
+    )
+    parser.add_argument("--repeat", type=int, default=20, help="timed runs per lookup; the best is kept")
+    args = parser.parse_args(argv)
+    run(args.sizes, args.repeat)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,70 @@
+"""Cold-start import cost of the planner package and the modules the app pulls in.
+
+Each target is imported in a fresh interpreter (best of --repeat runs) and the
+heavy optional modules it loaded are listed, so an eager plotly or openpyxl
+import creeping back into the core package shows up:
+
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --check   # exits 1 if `import planner` loads a heavy module
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+
+TARGETS = ("numpy", "pandas", "planner", "planner.cli", "openpyxl", "plotly.express", "streamlit")
+HEAVY_MODULES = ("openpyxl", "plotly", "streamlit", "matplotlib")
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {target}
+seconds = time.perf_counter() - start
+print(json.dumps([seconds, [m for m in {heavy!r} if m in sys.modules]]))
+"""
+
+
+def measure(target, repeat=5):
+    """Returns (best import time in seconds, heavy modules loaded) for a fresh `import target`."""
+    best, heavy = float("inf"), []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(target=target, heavy=HEAVY_MODULES)],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        seconds, heavy = json.loads(output.strip().splitlines()[-1])
+        best = min(best, seconds)
+    return best, heavy
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure cold-start import times.")
+    parser.add_argument("targets", nargs="*", default=list(TARGETS), help="modules to import (default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per target; the best is kept")
+    parser.add_argument("--json", help="write the results to this JSON file")
+    parser.add_argument("--check", action="store_true", help="fail if `import planner` loads a heavy module")
+    args = parser.parse_args(argv)
+
+    results = []
+    for target in args.targets:
+        seconds, heavy = measure(target, args.repeat)
+        results.append({"target": target, "seconds": seconds, "heavy_modules": heavy})
+        print(f"{target:<20}{seconds * 1000:10.1f} ms   {', '.join(heavy) or '-'}", flush=True)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"python": sys.version.split()[0], "results": results}, f, indent=2)
+
+    if args.check:
+        _, heavy = measure("planner", 1)
+        if heavy:
+            print(f"`import planner` loaded {', '.join(heavy)}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,95 @@
+"""Benchmark of refreshing cross-project dependency forecasts across a portfolio.
+
+Saves a synthetic portfolio whose projects depend on earlier ones to a plan
+storage, then times a cold refresh, a refresh with nothing changed and a
+refresh after one upstream project slips:
+
+    python -m benchmarks.portfolio --projects 500 --milestones 200 --storage sqlite
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import date
+
+import numpy as np
+
+from planner import DEPENDENCY_PREFIX, PlanCache, Portfolio, open_plan_storage
+
+from .synthetic import generate_plan
+
+
+def generate_portfolio(projects, milestones, upstream=2, seed=0, as_of=None):
+    """Returns {saved plan name: ProjectPlan}; each project depends on up to upstream earlier ones.
+
+    Each dependency is a "d - Dependency on <project>" milestone that a
+    random milestone of the plan waits for.
+    """
+    rng = np.random.default_rng(seed)
+    plans = {}
+    for i in range(projects):
+        plan = generate_plan(milestones, seed=seed + i, as_of=as_of, dependency_ratio=0.05)
+        plan = plan._replace(project_name=f"Project {i}")
+        store = plan.milestones
+        count = min(i, int(rng.integers(0, upstream + 1)))
+        for j in rng.choice(i, count, replace=False) if count else ():
+            store.append({"Name": f"{DEPENDENCY_PREFIX}Project {j}", "Progress": 0})
+            # The new milestone has no predecessors, so this can't close a cycle
+            store.add_dependency(int(store.ids[-1]), int(store.ids[rng.integers(0, milestones)]), 0)
+        plans[f"Project {i}"] = plan
+    return plans
+
+
+def run(projects=500, milestones=200, upstream=2, backend="sqlite", seed=0):
+    """Prints the time and number of recomputed forecasts of each refresh."""
+    as_of = date.today()
+    plans = generate_portfolio(projects, milestones, upstream, seed, as_of)
+    with tempfile.TemporaryDirectory() as directory:
+        location = os.path.join(directory, "plans.db" if backend == "sqlite" else "plans")
+        if backend != "sqlite":
+            os.makedirs(location)
+        storage = open_plan_storage(f"{backend}:{location}")
+        start = time.perf_counter()
+        for name, plan in plans.items():
+            storage.save(name, plan)
+        print(f"saved {projects} plans of {milestones} milestones in {time.perf_counter() - start:.2f} s")
+
+        portfolio = Portfolio(storage, PlanCache(2**30))
+
+        def refresh(label):
+            recomputes = portfolio.recomputes
+            start = time.perf_counter()
+            forecasts = portfolio.refresh()
+            seconds = time.perf_counter() - start
+            print(f"{label:<28}{seconds * 1000:10.1f} ms{portfolio.recomputes - recomputes:8} recomputed")
+            return forecasts
+
+        before = refresh("cold refresh")
+        refresh("nothing changed")
+
+        # The first project slips by 30 days; every project downstream of it moves
+        slipped = plans["Project 0"]
+        store = slipped.milestones.copy()
+        for i, end_date in enumerate((store.end_dates + 30).tolist()):
+            store.update(i, {"End Date": end_date})
+        storage.save("Project 0", slipped._replace(milestones=store))
+        after = refresh("Project 0 slips 30 days")
+        moved = sum(before[name].finish_date != after[name].finish_date for name in after)
+        print(f"{moved} project forecasts moved")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark portfolio dependency forecasts.")
+    parser.add_argument("--projects", type=int, default=500)
+    parser.add_argument("--milestones", type=int, default=200, help="milestones per project")
+    parser.add_argument("--upstream", type=int, default=2, help="most upstream projects per project")
+    parser.add_argument("--storage", choices=("sqlite", "parquet", "xlsx"), default="sqlite")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    run(args.projects, args.milestones, args.upstream, args.storage, args.seed)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
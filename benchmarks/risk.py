@@ -0,0 +1,59 @@
+"""Benchmark of the Monte Carlo schedule risk simulation.
+
+Times simulate_schedule on synthetic plans for each distribution, and a
+portfolio of plans in this process and in a process pool:
+
+    python -m benchmarks.risk --sizes 100,1000 --trials 10000 --portfolio 16
+"""
+
+import argparse
+import os
+import time
+from datetime import date
+
+from planner import RISK_DISTRIBUTIONS, simulate_portfolio, simulate_schedule
+
+from .synthetic import generate_plan
+
+
+def run(sizes=(100, 1000), trials=10000, portfolio=16, portfolio_size=1000, workers=None):
+    """Prints the time of each simulation."""
+    as_of = date.today()
+    print(f"{'milestones':>10}  {'distribution':<14}{'trials':>8}{'time':>12}")
+    for size in sizes:
+        plan = generate_plan(size, as_of=as_of, dependency_ratio=0.05)
+        for distribution in RISK_DISTRIBUTIONS:
+            start = time.perf_counter()
+            simulate_schedule(plan.milestones, plan.target_end_date, trials, distribution, seed=0)
+            seconds = time.perf_counter() - start
+            print(f"{size:>10}  {distribution:<14}{trials:>8}{seconds * 1000:9.1f} ms")
+
+    if portfolio:
+        plans = {f"Project {i}": generate_plan(portfolio_size, seed=i, as_of=as_of, dependency_ratio=0.05)
+                 for i in range(portfolio)}
+        for label, pool in (("in process", 1), (f"pool of {workers or os.cpu_count()}", workers)):
+            start = time.perf_counter()
+            simulate_portfolio(plans, workers=pool, seed=0, trials=trials)
+            seconds = time.perf_counter() - start
+            print(f"portfolio of {portfolio} x {portfolio_size} milestones, {label}: {seconds:.2f} s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the schedule risk simulation.")
+    parser.add_argument(
+        "--sizes",
+        type=lambda text: [int(size) for size in text.split(",")],
+        default=[100, 1000],
+        help="comma-separated milestone counts (default: %(default)s)",
+    )
+    parser.add_argument("--trials", type=int, default=10000)
+    parser.add_argument("--portfolio", type=int, default=16, help="plans in the portfolio run (0 to skip)")
+    parser.add_argument("--portfolio-size", type=int, default=1000, help="milestones per portfolio plan")
+    parser.add_argument("--workers", type=int, default=None, help="pool processes (default: CPU count)")
+    args = parser.parse_args(argv)
+    run(args.sizes, args.trials, args.portfolio, args.portfolio_size, args.workers)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,206 @@
+"""Benchmarks of the load -> analyze -> render path on synthetic plans of growing size.
+
+Saving and loading are timed for workbooks and for each binary plan storage
+backend available here.
+
+Each stage is timed on its own (best of --repeat runs) and then run once more
+under tracemalloc for its peak memory:
+
+    python -m benchmarks.run --sizes 10,1000,100000 --json results.json
+    python -m benchmarks.run --compare results.json   # exits 1 on a regression
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date
+
+import numpy as np
+
+from planner import (
+    analyze_milestone_progress,
+    analyze_milestones_batch,
+    calculate_program_duration,
+    compute_schedule,
+    load_project_plan,
+    milestone_status_frame,
+    open_plan_storage,
+    write_project_plan,
+)
+from planner.charts import build_gantt_figure, build_progress_figure, gantt_frame
+
+from .synthetic import generate_plan
+
+DEFAULT_SIZES = (10, 100, 1000, 10000, 100000)
+
+
+def _analyze_per_row(plan, as_of):
+    # The row-at-a-time rules, run over the milestones with both dates as the app used to
+    milestones = plan.milestones
+    extreme_start_date, extreme_end_date, _ = calculate_program_duration(milestones)
+    for milestone in milestones:
+        if milestone["Start Date"] and milestone["End Date"]:
+            analyze_milestone_progress(milestone, extreme_start_date, extreme_end_date, plan.target_end_date)
+
+
+def _gantt(plan, as_of):
+    status, _, _ = analyze_milestones_batch(
+        plan.milestones.start_dates, plan.milestones.end_dates, plan.milestones.progress, as_of, plan.target_end_date
+    )
+    df_gantt, aggregated = gantt_frame(plan.milestones, status)
+    return build_gantt_figure(df_gantt, as_of, aggregated).to_json()  # What st.plotly_chart sends
+
+
+def _progress_chart(plan, as_of):
+    milestones = plan.milestones
+    status, expected_progress, _ = analyze_milestones_batch(
+        milestones.start_dates, milestones.end_dates, milestones.progress, as_of, plan.target_end_date
+    )
+    table = milestone_status_frame(milestones, status, expected_progress)
+    return build_progress_figure(
+        table["Name"].to_numpy(),
+        table["Actual Progress"].astype(float).to_numpy(),
+        table["Expected Progress"].astype(float).to_numpy(),
+    ).to_json()
+
+
+def _storages(path):
+    """The binary storage backends to benchmark, as (backend, storage), next to the workbook at path."""
+    storages = []
+    for backend, location in (("sqlite", path + ".db"), ("parquet", path + ".parquet.d")):
+        try:
+            storages.append((backend, open_plan_storage(f"{backend}:{location}")))
+        except ImportError:
+            pass  # pyarrow isn't installed
+    return storages
+
+
+def stages(path):
+    """The benchmarked stages as (name, function(plan, as_of)), in pipeline order."""
+    storage_stages = []
+    for backend, storage in _storages(path):
+        storage_stages += [
+            (f"save ({backend})", lambda plan, as_of, storage=storage: storage.save("plan", plan)),
+            (f"load ({backend})", lambda plan, as_of, storage=storage: storage.load("plan")),
+        ]
+    return [
+        ("save", lambda plan, as_of: write_project_plan(path, *plan)),
+        ("load", lambda plan, as_of: load_project_plan(path)),
+        *storage_stages,
+        ("duration", lambda plan, as_of: calculate_program_duration(plan.milestones)),
+        ("analysis (per row)", _analyze_per_row),
+        (
+            "analysis (batch)",
+            lambda plan, as_of: analyze_milestones_batch(
+                plan.milestones.start_dates,
+                plan.milestones.end_dates,
+                plan.milestones.progress,
+                as_of,
+                plan.target_end_date,
+            ),
+        ),
+        ("schedule", lambda plan, as_of: compute_schedule(plan.milestones)),
+        ("gantt", _gantt),
+        ("progress chart", _progress_chart),
+    ]
+
+
+def measure(function, plan, as_of, repeat=1, memory=True):
+    """Returns (best time in seconds, peak traced memory in bytes or None) for one stage."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(plan, as_of)
+        best = min(best, time.perf_counter() - start)
+    peak = None
+    if memory:
+        tracemalloc.start()
+        try:
+            function(plan, as_of)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return best, peak
+
+
+def run(sizes=DEFAULT_SIZES, repeat=1, memory=True, only=None, dependency_ratio=0.05, seed=0, out=sys.stdout):
+    """Runs the stages on a synthetic plan of each size; returns a list of result dicts."""
+    as_of = date.today()
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        # Warm up imports and caches so the first size isn't charged for them
+        warmup = generate_plan(10, seed=seed, as_of=as_of, dependency_ratio=dependency_ratio)
+        for _, function in stages(os.path.join(directory, "warmup.xlsx")):
+            function(warmup, as_of)
+
+        for size in sizes:
+            plan = generate_plan(size, seed=seed, as_of=as_of, dependency_ratio=dependency_ratio)
+            path = os.path.join(directory, f"plan_{size}.xlsx")
+            write_project_plan(path, *plan)  # So "load" has a file even if "save" is skipped
+            for _, storage in _storages(path):
+                storage.save("plan", plan)
+            for name, function in stages(path):
+                if only and name not in only:
+                    continue
+                seconds, peak = measure(function, plan, as_of, repeat, memory)
+                result = {"milestones": size, "stage": name, "seconds": seconds, "peak_bytes": peak}
+                results.append(result)
+                peak_text = f"{peak / 2**20:10.1f} MB" if peak is not None else ""
+                print(f"{size:>8}  {name:<20}{seconds * 1000:12.1f} ms{peak_text}", file=out, flush=True)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Returns the (result, baseline result) pairs that got more than tolerance slower."""
+    previous = {(r["milestones"], r["stage"]): r for r in baseline}
+    regressions = []
+    for result in results:
+        before = previous.get((result["milestones"], result["stage"]))
+        # Sub-millisecond stages are too noisy to compare
+        if before and before["seconds"] > 0.001 and result["seconds"] > before["seconds"] * (1 + tolerance):
+            regressions.append((result, before))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark loading, analyzing and charting synthetic plans.")
+    parser.add_argument(
+        "--sizes",
+        type=lambda text: [int(size) for size in text.split(",")],
+        default=list(DEFAULT_SIZES),
+        help="comma-separated milestone counts (default: %(default)s)",
+    )
+    parser.add_argument("--repeat", type=int, default=1, help="timed runs per stage; the best is kept")
+    parser.add_argument("--stage", action="append", dest="stages", help="only run this stage (repeatable)")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc run")
+    parser.add_argument("--dependencies", type=float, default=0.05, help="share of milestones with a dependency")
+    parser.add_argument("--json", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON file from an earlier --json run")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown against --compare")
+    args = parser.parse_args(argv)
+
+    print(f"{'size':>8}  {'stage':<20}{'time':>15}{'peak memory':>13}")
+    results = run(args.sizes, args.repeat, not args.no_memory, args.stages, args.dependencies)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"numpy": np.__version__, "python": sys.version.split()[0], "results": results}, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f)["results"], args.tolerance)
+        for result, before in regressions:
+            print(
+                f"REGRESSION {result['milestones']} milestones, {result['stage']}: "
+                f"{before['seconds'] * 1000:.1f} ms -> {result['seconds'] * 1000:.1f} ms",
+                file=sys.stderr,
+            )
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,82 @@
+"""Benchmark of branching and comparing what-if scenarios of a large plan.
+
+Branches scenarios off a synthetic plan, edits a few milestones in each and
+compares them, once with copy-on-write scenarios (ScenarioSet) and once with
+deep copies analysed from scratch, reporting the time and the traced memory
+the scenarios hold and peak at:
+
+    python -m benchmarks.scenarios --milestones 100000 --scenarios 12 --edits 10
+"""
+
+import argparse
+import copy
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+import numpy as np
+
+from planner import AnalysisPipeline, ScenarioSet
+
+from .synthetic import generate_plan
+
+
+def _edit(milestones, rows):
+    for i in rows.tolist():
+        milestone = milestones[i]
+        if milestone["End Date"] is not None:
+            milestones.update(i, {"End Date": milestone["End Date"] + timedelta(days=14)})
+
+
+def _copy_on_write(base, scenarios, rows):
+    scenario_set = ScenarioSet(base)
+    for k in range(scenarios):
+        _edit(scenario_set.branch(f"Scenario {k}").milestones, rows[k])
+    return scenario_set, scenario_set.compare()
+
+
+def _deep_copies(base, scenarios, rows):
+    pipelines = []
+    for k in range(scenarios):
+        milestones = copy.deepcopy(base.milestones)
+        _edit(milestones, rows[k])
+        pipelines.append(AnalysisPipeline().bind(milestones, base.as_of, base.target_end_date))
+    for pipeline in pipelines:
+        pipeline.schedule()
+        pipeline.delay_warnings()
+    return pipelines
+
+
+def run(milestones=100000, scenarios=12, edits=10, seed=0):
+    """Prints the time, held and peak traced memory of each way of building the scenarios."""
+    as_of = date.today()
+    plan = generate_plan(milestones, seed=seed, as_of=as_of, dependency_ratio=0.05)
+    base = AnalysisPipeline().bind(plan.milestones.freeze(), as_of, plan.target_end_date)
+    base.schedule()
+    base.delay_warnings()
+    rng = np.random.default_rng(seed)
+    rows = [rng.choice(milestones, edits, replace=False) for _ in range(scenarios)]
+    print(f"{scenarios} scenarios of {milestones} milestones, {edits} edits each")
+    for label, build in (("copy-on-write", _copy_on_write), ("deep copies", _deep_copies)):
+        tracemalloc.start()
+        start = time.perf_counter()
+        result = build(base, scenarios, rows)
+        seconds = time.perf_counter() - start
+        held, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del result
+        print(f"  {label:<14}{seconds:8.2f} s{held / 2**20:10.1f} MB held{peak / 2**20:10.1f} MB peak")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark what-if scenarios against deep copies.")
+    parser.add_argument("--milestones", type=int, default=100000)
+    parser.add_argument("--scenarios", type=int, default=12)
+    parser.add_argument("--edits", type=int, default=10, help="milestones edited in each scenario")
+    args = parser.parse_args(argv)
+    run(args.milestones, args.scenarios, args.edits)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,115 @@
+"""Synthetic project plans for benchmarking, in the same workbook layout as "Sample Dataset.xlsx".
+
+    python -m benchmarks.synthetic 10000 -o plan_10k.xlsx
+"""
+
+import argparse
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from planner import MilestoneStore, ProjectPlan, write_project_plan
+
+OWNER_COUNT = 50
+
+
+def generate_plan(milestones, seed=0, as_of=None, dependency_ratio=0.0):
+    """Returns a random ProjectPlan with the given number of milestones.
+
+    Milestones start within about three years around as_of (default today)
+    and last 1-90 days; progress follows the dates so the plan has a realistic
+    mix of completed, on-track and late milestones. About 1% have a missing
+    start date ("N/A") and about 2% share a name with another milestone.
+    dependency_ratio of the milestones (0 to 1) get a finish-to-start
+    dependency on an earlier milestone.
+    """
+    rng = np.random.default_rng(seed)
+    as_of = np.datetime64(as_of or date.today(), "D")
+    first = as_of - 365
+
+    start_dates = first + rng.integers(0, 3 * 365, milestones).astype("timedelta64[D]")
+    end_dates = start_dates + rng.integers(1, 91, milestones).astype("timedelta64[D]")
+    elapsed = np.clip((as_of - start_dates) / (end_dates - start_dates), 0, 1)
+    progress = np.clip(np.round(elapsed * 100 + rng.normal(0, 15, milestones)), 0, 100)
+    start_dates[rng.random(milestones) < 0.01] = np.datetime64("NaT")
+
+    names = np.char.add("Milestone ", np.arange(1, milestones + 1).astype(str)).astype(object)
+    duplicates = np.flatnonzero(rng.random(milestones) < 0.02)
+    names[duplicates] = names[rng.integers(0, milestones, len(duplicates))]
+    owners = np.char.add("Owner ", rng.integers(1, OWNER_COUNT + 1, milestones).astype(str)).astype(object)
+
+    store = MilestoneStore.from_columns(
+        {
+            "Name": names,
+            "Start Date": start_dates,
+            "End Date": end_dates,
+            "Milestone Owner": owners,
+            "Progress": progress,
+            "Status": np.full(milestones, "", dtype=object),
+        }
+    )
+    # Linking each chosen milestone to an earlier one keeps the graph acyclic
+    successors = np.flatnonzero(rng.random(milestones) < dependency_ratio)
+    successors = successors[successors > 0]
+    predecessors = rng.integers(0, successors, len(successors)) if len(successors) else successors
+    ids = store.ids
+    for predecessor, successor in zip(predecessors, successors):
+        store.add_dependency(ids[predecessor], ids[successor], int(rng.integers(0, 5)))
+
+    target_end_date = (as_of + 2 * 365).astype(object)
+    return ProjectPlan(
+        f"Synthetic Plan ({milestones} milestones)",
+        "Generated for benchmarking",
+        "Benchmark",
+        target_end_date,
+        store,
+    )
+
+
+def generate_catalog(projects, portfolios=20, sub_portfolios=10, seed=0):
+    """Returns a random project catalog frame (see planner.CATALOG_COLUMNS).
+
+    Projects are spread evenly over the portfolios, each with the given
+    number of sub-portfolios, and named after a few hundred common words so
+    name prefixes match many projects.
+    """
+    rng = np.random.default_rng(seed)
+    portfolio = rng.integers(1, portfolios + 1, projects)
+    sub_portfolio = rng.integers(1, sub_portfolios + 1, projects)
+    words = np.char.add("Word", np.arange(300).astype(str))
+    names = np.char.add(np.char.add(rng.choice(words, projects), " "), np.arange(1, projects + 1).astype(str))
+    return pd.DataFrame(
+        {
+            "Portfolio": np.char.add("Portfolio ", portfolio.astype(str)),
+            "Sub-Portfolio": np.char.add(
+                np.char.add(np.char.add("Sub-Portfolio ", portfolio.astype(str)), "."), sub_portfolio.astype(str)
+            ),
+            "Project Name": names,
+        }
+    )
+
+
+def write_plan(path, milestones, seed=0, as_of=None, dependency_ratio=0.0):
+    """Writes a generate_plan() plan to an .xlsx file and returns the plan."""
+    plan = generate_plan(milestones, seed, as_of, dependency_ratio)
+    write_project_plan(path, *plan)
+    return plan
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a synthetic project plan workbook.")
+    parser.add_argument("milestones", type=int, help="number of milestones")
+    parser.add_argument("-o", "--output", help="workbook path (default: synthetic_<milestones>.xlsx)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--as-of", type=date.fromisoformat, help="date the plan is centred on (default: today)")
+    parser.add_argument("--dependencies", type=float, default=0.0, help="share of milestones with a dependency")
+    args = parser.parse_args(argv)
+    output = args.output or f"synthetic_{args.milestones}.xlsx"
+    write_plan(output, args.milestones, args.seed, args.as_of, args.dependencies)
+    print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
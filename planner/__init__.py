@@ -0,0 +1,83 @@
+"""Core project planning logic, importable without the Streamlit app.
+
+Only numpy and pandas are loaded with the package; openpyxl and plotly are
+imported the first time a workbook is read or written or a chart is built.
+"""
+
+from .analysis import (
+    DELAY_WARNING_DAYS,
+    STATUS_BEHIND,
+    STATUS_COMPLETED,
+    STATUS_CRITICAL,
+    STATUS_LABELS,
+    STATUS_ON_TRACK,
+    WARNING_AFTER_TARGET,
+    WARNING_BEHIND,
+    WARNING_NONE,
+    WARNING_PAST_END,
+    Schedule,
+    analyze_milestone_progress,
+    analyze_milestones_batch,
+    calculate_program_duration,
+    compute_schedule,
+    delay_warning_mask,
+    milestone_status_frame,
+    milestone_warning_text,
+    schedule_frame,
+    schedule_warning_text,
+)
+from .cache import PlanCache, plan_nbytes
+from .catalog import CATALOG_COLUMNS, CATALOG_PLAN_COLUMN, CatalogFormatError, ProjectCatalog, load_project_catalog
+from .charts import (
+    GANTT_GROUPINGS,
+    GANTT_MAX_BARS,
+    PROGRESS_CHART_MAX_BARS,
+    build_gantt_figure,
+    build_progress_figure,
+    gantt_frame,
+)
+from .dates import DATE_CACHE_SIZE, normalize_date, normalize_dates
+from .dependencies import DependencyCycleError, DependencyGraph
+from .history import EDIT_HISTORY_SIZE, Edit, EditHistory
+from .incremental import MAX_INCREMENTAL_ROWS, IncrementalAnalysis
+from .pipeline import AnalysisPipeline
+from .portfolio import (
+    DEPENDENCY_PREFIX,
+    Portfolio,
+    ProjectForecast,
+    apply_forecasts,
+    dependency_projects,
+    forecast_plan,
+)
+from .profiling import RerunProfiler
+from .risk import (
+    RISK_DISTRIBUTIONS,
+    RISK_PERCENTILES,
+    RISK_TRIALS,
+    ScheduleRisk,
+    duration_factors,
+    simulate_portfolio,
+    simulate_schedule,
+)
+from .saver import SAVE_DEBOUNCE_SECONDS, PlanSaver
+from .scenarios import ScenarioSet
+from .storage import (
+    PLAN_STORAGE,
+    STORAGE_BACKENDS,
+    ParquetPlanStorage,
+    PlanStorage,
+    SQLitePlanStorage,
+    XlsxPlanStorage,
+    open_plan_storage,
+)
+from .store import CHANGE_LOG_SIZE, MILESTONE_FIELDS, MilestoneStore, as_milestone_store, format_dates
+from .workbook import (
+    LOAD_CHUNK_SIZE,
+    PlanFormatError,
+    ProjectPlan,
+    iter_milestone_chunks,
+    load_project_plan,
+    replace_file_atomically,
+    write_project_plan,
+    write_project_plan_atomically,
+)
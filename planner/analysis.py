@@ -0,0 +1,274 @@
+"""Schedule analysis of project plan milestones."""
+
+from collections import namedtuple
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from .store import as_milestone_store, format_dates
+
+
+def calculate_program_duration(milestones):
+    """Calculates the extreme start and end dates and the program duration (all None without dates)."""
+    milestones = as_milestone_store(milestones)
+    start_dates = milestones.start_dates
+    end_dates = milestones.end_dates
+
+    # Missing ("N/A") dates are NaT and don't take part in the extremes
+    start_dates = start_dates[~np.isnat(start_dates)]
+    end_dates = end_dates[~np.isnat(end_dates)]
+    if not len(start_dates) or not len(end_dates):
+        return None, None, None
+    extreme_start_date = start_dates.min().astype(object)
+    extreme_end_date = end_dates.max().astype(object)
+    program_duration = (extreme_end_date - extreme_start_date).days
+
+    return extreme_start_date, extreme_end_date, program_duration
+
+
+def analyze_milestone_progress(milestone, extreme_start_date, extreme_end_date, target_end_date):
+    """Analyzes the progress of a single milestone."""
+    milestone_start = milestone["Start Date"] 
+    milestone_end = milestone["End Date"] 
+    progress = int(milestone["Progress"]) 
+
+    milestone_start = milestone_start.date() if isinstance(milestone_start, datetime) else milestone_start
+    milestone_end = milestone_end.date() if isinstance(milestone_end, datetime) else milestone_end
+
+    today = datetime.now().date()
+
+    # 1. Calculate Expected Progress Based on Time:
+    total_milestone_days = (milestone_end - milestone_start).days
+    days_elapsed = (today - milestone_start).days
+
+    expected_progress = (days_elapsed / total_milestone_days) * 100 if total_milestone_days > 0 else 100
+    expected_progress = min(expected_progress, 100)  # Cap at 100%
+
+    # 2. Determine Milestone Status: 
+    status = "On Track"  # Default status
+    warning = "" 
+
+    if milestone_end < today:  # Milestone end date has passed
+        if progress == 100:
+            status = "Completed"
+        else:
+            status = "Behind Schedule"
+            warning = f"Milestone '{milestone['Name']}' is past its end date and not 100% complete."
+    elif milestone_start <= today <= milestone_end:  # Milestone is in progress
+        if progress < expected_progress - 10:
+            status = "Behind Schedule"
+            warning = f"Milestone '{milestone['Name']}' is behind schedule! It should be at about {expected_progress:.2f}% progress."
+    
+    # Check against target end date (if provided)
+    if target_end_date and milestone_end > target_end_date:
+        status = "Critical"
+        warning = f"Milestone '{milestone['Name']}' end date is after the project target end date! This needs immediate attention."
+
+    return status, warning, expected_progress
+
+
+# Status and warning codes returned by analyze_milestones_batch
+STATUS_ON_TRACK, STATUS_COMPLETED, STATUS_BEHIND, STATUS_CRITICAL = range(4)
+STATUS_LABELS = np.array(["On Track", "Completed", "Behind Schedule", "Critical"], dtype=object)
+
+WARNING_NONE, WARNING_PAST_END, WARNING_BEHIND, WARNING_AFTER_TARGET = range(4)
+
+DELAY_WARNING_DAYS = 7  # A behind-schedule milestone is only reported once it's this many days past due
+
+
+def analyze_milestones_batch(start_dates, end_dates, progress, as_of, target_end_date=None):
+    """Applies the analyze_milestone_progress rules to whole columns at once.
+
+    Takes datetime64[D] start/end arrays, a progress array and a single as-of
+    date. Returns (status codes, expected progress, warning codes); use
+    STATUS_LABELS and milestone_warning_text to turn codes into text.
+    Milestones with a missing start or end date get NaN expected progress
+    and stay "On Track".
+    """
+    start_dates = np.asarray(start_dates, dtype="datetime64[D]")
+    end_dates = np.asarray(end_dates, dtype="datetime64[D]")
+    progress = np.trunc(np.asarray(progress, dtype=np.float64))  # Same as int(progress)
+    today = np.datetime64(as_of, "D")
+
+    # 1. Expected progress based on time
+    total_days = (end_dates - start_dates).astype(np.float64)
+    elapsed_days = (today - start_dates).astype(np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        expected_progress = np.where(total_days > 0, elapsed_days / total_days * 100, 100.0)
+    expected_progress = np.minimum(expected_progress, 100)
+    missing = np.isnat(start_dates) | np.isnat(end_dates)
+    expected_progress[missing] = np.nan
+
+    # 2. Status and warnings
+    status = np.full(len(start_dates), STATUS_ON_TRACK, dtype=np.int8)
+    warning = np.full(len(start_dates), WARNING_NONE, dtype=np.int8)
+
+    past_end = end_dates < today
+    completed = past_end & (progress == 100)
+    status[completed] = STATUS_COMPLETED
+    overdue = past_end & ~completed
+    status[overdue] = STATUS_BEHIND
+    warning[overdue] = WARNING_PAST_END
+
+    in_progress = (start_dates <= today) & (today <= end_dates)
+    behind = in_progress & (progress < expected_progress - 10)
+    status[behind] = STATUS_BEHIND
+    warning[behind] = WARNING_BEHIND
+
+    if target_end_date:
+        after_target = end_dates > np.datetime64(target_end_date, "D")
+        status[after_target] = STATUS_CRITICAL
+        warning[after_target] = WARNING_AFTER_TARGET
+
+    return status, expected_progress, warning
+
+
+def milestone_warning_text(name, warning_code, expected_progress):
+    """Builds the warning message analyze_milestone_progress would give for one milestone."""
+    if warning_code == WARNING_PAST_END:
+        return f"Milestone '{name}' is past its end date and not 100% complete."
+    if warning_code == WARNING_BEHIND:
+        return f"Milestone '{name}' is behind schedule! It should be at about {expected_progress:.2f}% progress."
+    if warning_code == WARNING_AFTER_TARGET:
+        return f"Milestone '{name}' end date is after the project target end date! This needs immediate attention."
+    return ""
+
+
+def delay_warning_mask(status, end_dates, as_of):
+    """Selects behind-schedule milestones that are at least DELAY_WARNING_DAYS past their end date."""
+    days_behind = (np.datetime64(as_of, "D") - np.asarray(end_dates, dtype="datetime64[D]")).astype(np.float64)
+    return (status == STATUS_BEHIND) & (days_behind >= DELAY_WARNING_DAYS)
+
+
+def milestone_status_frame(milestones, status, expected_progress):
+    """Builds the "Milestone Status" table from the store columns and the batch analysis results."""
+    milestones = as_milestone_store(milestones)
+    return pd.DataFrame(
+        {
+            "Name": milestones.names,
+            "Status": STATUS_LABELS[status],
+            "Expected Progress": np.char.mod("%.2f", expected_progress),
+            "Actual Progress": np.char.mod("%.2f", milestones.progress),
+            "Start Date": format_dates(milestones.start_dates),
+            "End Date": format_dates(milestones.end_dates),
+        }
+    )
+
+
+Schedule = namedtuple(
+    "Schedule",
+    ("early_start", "early_finish", "late_start", "late_finish", "slack", "pushed_days", "critical", "critical_path"),
+)
+
+
+def compute_schedule(milestones):
+    """Computes the critical-path schedule of a plan from its dependencies, in O(V + E).
+
+    Each milestone keeps its planned duration and starts on its planned start
+    date or, if later, lag days after the forecast finish of each predecessor.
+    The arrays of the returned Schedule are aligned with the store rows: dates
+    as datetime64[D], slack and pushed_days (forecast start minus planned
+    start) in days. critical_path lists the rows of the longest chain, first
+    to last. Milestones missing a start or end date are left out (NaT dates,
+    zero slack, not critical).
+    """
+    milestones = as_milestone_store(milestones)
+    graph = milestones.dependencies
+    start_dates = milestones.start_dates
+    end_dates = milestones.end_dates
+    known = ~(np.isnat(start_dates) | np.isnat(end_dates))
+    planned_start = np.where(known, start_dates.astype(np.int64), 0)
+    duration = np.where(known, end_dates.astype(np.int64) - planned_start, 0)
+
+    # Row of each graph node; the ID column is sorted
+    ids = milestones.ids
+    order = graph.topological_order()
+    row_of = dict(zip(order, np.searchsorted(ids, order).tolist()))
+
+    def usable(node):
+        i = row_of[node]
+        return i if known[i] else None
+
+    # --- FORWARD PASS: early start / finish ---
+    early_start = planned_start.copy()
+    early_finish = early_start + duration
+    for node in order:
+        i = usable(node)
+        if i is None:
+            continue
+        for predecessor, lag_days in graph.predecessors(node).items():
+            j = usable(predecessor)
+            if j is not None:
+                early_start[i] = max(early_start[i], early_finish[j] + lag_days)
+        early_finish[i] = early_start[i] + duration[i]
+
+    # --- BACKWARD PASS: late start / finish against the project finish ---
+    project_finish = early_finish[known].max() if known.any() else 0
+    late_finish = np.full(len(milestones), project_finish, dtype=np.int64)
+    late_start = late_finish - duration
+    for node in reversed(order):
+        i = usable(node)
+        if i is None:
+            continue
+        for successor, lag_days in graph.successors(node).items():
+            j = usable(successor)
+            if j is not None:
+                late_finish[i] = min(late_finish[i], late_start[j] - lag_days)
+        late_start[i] = late_finish[i] - duration[i]
+
+    slack = np.where(known, late_start - early_start, 0)
+    critical = known & (slack == 0)
+
+    # --- CRITICAL PATH: walk back from the milestone that finishes last ---
+    critical_path = []
+    if known.any():
+        i = int(np.flatnonzero(known & (early_finish == project_finish))[0])
+        while i is not None:
+            critical_path.append(i)
+            previous = None
+            for predecessor, lag_days in graph.predecessors(int(ids[i])).items():
+                j = usable(predecessor)
+                if j is not None and critical[j] and early_finish[j] + lag_days == early_start[i]:
+                    previous = j
+                    break
+            i = previous
+        critical_path.reverse()
+
+    def to_dates(days):
+        dates = days.astype("datetime64[D]")
+        dates[~known] = np.datetime64("NaT")
+        return dates
+
+    return Schedule(
+        to_dates(early_start),
+        to_dates(early_finish),
+        to_dates(late_start),
+        to_dates(late_finish),
+        slack,
+        np.where(known, early_start - planned_start, 0),
+        critical,
+        critical_path,
+    )
+
+
+def schedule_frame(milestones, schedule):
+    """Builds the dependency schedule table for the milestones that take part in a dependency."""
+    milestones = as_milestone_store(milestones)
+    rows = np.sort(np.searchsorted(milestones.ids, milestones.dependencies.nodes()))
+    return pd.DataFrame(
+        {
+            "Name": milestones.names[rows],
+            "Planned Start": format_dates(milestones.start_dates[rows]),
+            "Forecast Start": format_dates(schedule.early_start[rows]),
+            "Forecast End": format_dates(schedule.early_finish[rows]),
+            "Latest Start": format_dates(schedule.late_start[rows]),
+            "Slack (days)": schedule.slack[rows],
+            "Critical": schedule.critical[rows],
+        }
+    )
+
+
+def schedule_warning_text(name, pushed_days):
+    """The warning for a milestone whose forecast start is pushed back by its dependencies."""
+    return f"Milestone '{name}' can only start {pushed_days} days after its planned start because of its dependencies."
@@ -0,0 +1,73 @@
+"""Process-wide cache of parsed project plans."""
+
+import sys
+import threading
+from collections import OrderedDict
+
+
+def plan_nbytes(plan):
+    """Estimates the memory held by a parsed plan."""
+    header = sum(sys.getsizeof(value) for value in plan[:-1])
+    return header + plan.milestones.nbytes()
+
+
+class PlanCache:
+    """Process-wide LRU cache of parsed plans, keyed by content hash and bounded by a byte budget.
+
+    The app shares one instance between all Streamlit sessions, so a workbook
+    opened by many users is parsed and held in memory once.
+    """
+
+    def __init__(self, budget_bytes):
+        self.budget_bytes = budget_bytes
+        self._plans = OrderedDict()  # key -> (plan, nbytes), least recently used first
+        self._lock = threading.Lock()
+        self.used_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._plans.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._plans.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, plan):
+        """Stores a plan (freezing its milestones) and evicts the least recently used plans over budget."""
+        plan.milestones.freeze()
+        nbytes = plan_nbytes(plan)
+        with self._lock:
+            if key in self._plans:
+                self.used_bytes -= self._plans.pop(key)[1]
+            self._plans[key] = (plan, nbytes)
+            self.used_bytes += nbytes
+            while self.used_bytes > self.budget_bytes and len(self._plans) > 1:
+                _, (_, evicted_bytes) = self._plans.popitem(last=False)
+                self.used_bytes -= evicted_bytes
+                self.evictions += 1
+        return plan
+
+    def get_or_load(self, key, load):
+        """Returns the cached plan for key, calling load() (which returns a ProjectPlan or None) on a miss."""
+        plan = self.get(key)
+        if plan is None:
+            plan = load()
+            if plan is not None:
+                self.put(key, plan)
+        return plan
+
+    def stats(self):
+        with self._lock:
+            return {
+                "plans": len(self._plans),
+                "used_mb": round(self.used_bytes / 2**20, 2),
+                "budget_mb": round(self.budget_bytes / 2**20, 2),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
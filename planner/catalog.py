@@ -0,0 +1,114 @@
+"""Indexed catalog of the projects in the portfolio."""
+
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+CATALOG_COLUMNS = ("Portfolio", "Sub-Portfolio", "Project Name")
+CATALOG_PLAN_COLUMN = "Plan"  # Optional: the name each project's plan is saved under, if not "<project>.xlsx"
+CATALOG_TABLE = "projects"  # Table read when the catalog is a SQLite database
+
+
+class CatalogFormatError(ValueError):
+    """Raised when a project catalog file lacks the catalog columns."""
+
+
+class ProjectCatalog:
+    """Projects by portfolio and sub-portfolio, indexed once for the cascading selectboxes.
+
+    The projects are sorted by portfolio, sub-portfolio and case-folded
+    name, so each sub-portfolio's projects are one contiguous slice and a
+    name prefix is a binary search within it. portfolios(),
+    sub_portfolios() and projects() are dictionary lookups and search() is
+    O(log n), whatever the size of the catalog.
+
+    plan_names() maps projects to the names their plans are saved under,
+    from the optional CATALOG_PLAN_COLUMN.
+    """
+
+    def __init__(self, frame):
+        missing = [column for column in CATALOG_COLUMNS if column not in frame.columns]
+        if missing:
+            raise CatalogFormatError(f"The project catalog has no {', '.join(missing)} column.")
+        self._plan_names = {}
+        if CATALOG_PLAN_COLUMN in frame.columns:
+            plans = frame.dropna(subset=["Project Name", CATALOG_PLAN_COLUMN])
+            self._plan_names = dict(zip(plans["Project Name"].astype(str), plans[CATALOG_PLAN_COLUMN].astype(str)))
+        frame = frame.loc[:, list(CATALOG_COLUMNS)].dropna().astype(str).drop_duplicates()
+        frame = frame.assign(key=frame["Project Name"].str.casefold())
+        frame = frame.sort_values(["Portfolio", "Sub-Portfolio", "key", "Project Name"], ignore_index=True)
+
+        self._names = frame["Project Name"].to_numpy(dtype=str)
+        self._keys = frame["key"].to_numpy(dtype=str)
+        self._groups = {}  # (portfolio, sub-portfolio) -> (first row, end row)
+        self._sub_portfolios = {}  # portfolio -> sub-portfolios, sorted
+        for (portfolio, sub_portfolio), rows in frame.groupby(["Portfolio", "Sub-Portfolio"], sort=False).indices.items():
+            self._groups[portfolio, sub_portfolio] = (int(rows[0]), int(rows[-1]) + 1)
+            self._sub_portfolios.setdefault(portfolio, []).append(sub_portfolio)
+        self._portfolios = list(self._sub_portfolios)
+
+        # All projects by key, for searching across the portfolio
+        order = np.argsort(self._keys, kind="stable")
+        self._all_names = self._names[order]
+        self._all_keys = self._keys[order]
+
+    @classmethod
+    def from_records(cls, records):
+        """Creates a catalog from dicts (or a dict of columns) with the CATALOG_COLUMNS keys."""
+        return cls(pd.DataFrame(records))
+
+    def __len__(self):
+        return len(self._names)
+
+    def portfolios(self):
+        return self._portfolios
+
+    def sub_portfolios(self, portfolio):
+        return self._sub_portfolios.get(portfolio, [])
+
+    def projects(self, portfolio, sub_portfolio):
+        """The names of the projects in a sub-portfolio, sorted (an array view, not a copy)."""
+        start, stop = self._groups.get((portfolio, sub_portfolio), (0, 0))
+        return self._names[start:stop]
+
+    def plan_names(self):
+        """{project name: saved plan name} for the projects whose catalog row names their plan."""
+        return self._plan_names
+
+    def search(self, prefix, portfolio=None, sub_portfolio=None):
+        """The names of the projects starting with prefix (ignoring case), sorted, as an array view.
+
+        The search is limited to one sub-portfolio if both portfolio and
+        sub_portfolio are given, and covers the whole catalog otherwise.
+        """
+        if portfolio is not None and sub_portfolio is not None:
+            start, stop = self._groups.get((portfolio, sub_portfolio), (0, 0))
+            names, keys = self._names[start:stop], self._keys[start:stop]
+        else:
+            names, keys = self._all_names, self._all_keys
+        prefix = prefix.casefold()
+        first = np.searchsorted(keys, prefix, side="left")
+        end = np.searchsorted(keys, prefix + "\U0010ffff", side="left")
+        return names[first:end]
+
+
+def load_project_catalog(path):
+    """Loads a ProjectCatalog from a .csv, .xlsx or .parquet file or a SQLite database's projects table."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        frame = pd.read_csv(path, dtype=str)
+    elif extension in (".xlsx", ".xlsm"):
+        frame = pd.read_excel(path, dtype=str)
+    elif extension == ".parquet":
+        frame = pd.read_parquet(path)
+    elif extension in (".db", ".sqlite", ".sqlite3"):
+        connection = sqlite3.connect(path)
+        try:
+            frame = pd.read_sql_query(f"SELECT * FROM {CATALOG_TABLE}", connection)
+        finally:
+            connection.close()
+    else:
+        raise CatalogFormatError(f"Unsupported project catalog file '{path}'; use .csv, .xlsx, .parquet or .db.")
+    return ProjectCatalog(frame)
@@ -0,0 +1,222 @@
+"""Plotly figures for the analysis screens: the Program Plan Gantt and the milestone progress chart.
+
+plotly is imported when a figure is first built, so importing this module
+(and the planner package) stays cheap for code that never draws a chart.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from .analysis import STATUS_LABELS
+from .store import as_milestone_store
+
+PROGRESS_CHART_MAX_BARS = int(os.environ.get("PROGRESS_CHART_MAX_BARS", 300))  # Larger plans get the WebGL view
+
+
+def build_progress_figure(names, actual_progress, expected_progress, max_bars=PROGRESS_CHART_MAX_BARS):
+    """Builds the milestone progress chart from column arrays with a fixed number of traces.
+
+    Up to max_bars milestones are drawn as overlaid bars (total, expected and
+    actual, with the percentages as bar labels). Past that the chart switches
+    to WebGL markers, one trace each for actual and expected progress.
+    """
+    import plotly.graph_objects as go
+
+    names = np.asarray(names, dtype=object)
+    actual_progress = np.asarray(actual_progress, dtype=np.float64)
+    expected_progress = np.asarray(expected_progress, dtype=np.float64)
+    fig = go.Figure()
+
+    if len(names) > max_bars:
+        position = np.arange(len(names))
+        for label, values, color in (
+            ("Actual Progress", actual_progress, "green"),
+            ("Expected Progress", expected_progress, "darkorange"),
+        ):
+            fig.add_trace(
+                go.Scattergl(
+                    x=position,
+                    y=values,
+                    mode="markers",
+                    marker=dict(color=color, size=4),
+                    name=label,
+                    customdata=names,
+                    hovertemplate="%{customdata}<br>" + label + ": %{y:.2f}%<extra></extra>",
+                )
+            )
+        fig.update_layout(
+            title=f"Milestone Progress ({len(names)} milestones)",
+            xaxis_title="Milestone (plan order)",
+            yaxis_title="Progress (%)",
+            plot_bgcolor="rgba(0,0,0,0)",
+        )
+        return fig
+
+    behind = expected_progress > actual_progress
+    known_expected = expected_progress[~np.isnan(expected_progress)]
+    y_max = known_expected.max() if len(known_expected) else 100
+
+    # --- TOTAL PROGRESS BAR ---
+    fig.add_trace(
+        go.Bar(
+            x=names,
+            y=np.full(len(names), 100),
+            marker_color="lightgray",
+            name="Total",  # Name for the legend
+            marker_line_color="white",
+            marker_line_width=2,
+            hoverinfo="skip",
+        )
+    )
+
+    # --- EXPECTED PROGRESS (Orange), only where it's ahead of the actual progress ---
+    expected_text = np.where(
+        expected_progress == 100, "100%", np.char.add(np.char.mod("%.2f", expected_progress), "%")
+    )
+    fig.add_trace(
+        go.Bar(
+            x=names,
+            y=np.where(behind, expected_progress, np.nan),
+            marker_color="darkorange",
+            name="Expected Progress",
+            width=0.6,
+            text=np.where(behind, expected_text, ""),
+            textposition="outside",
+            textfont=dict(color="black"),
+            showlegend=False,
+        )
+    )
+
+    # --- ACTUAL PROGRESS (Green) ---
+    fig.add_trace(
+        go.Bar(
+            x=names,
+            y=actual_progress,
+            marker_color="green",
+            name="Actual Progress",
+            width=0.6,
+            text=np.where(actual_progress < 100, np.char.add(np.char.mod("%.0f", actual_progress), "%"), ""),
+            textposition="inside",
+            insidetextanchor="middle",
+            textfont=dict(color="white"),
+            showlegend=False,
+        )
+    )
+
+    fig.update_layout(
+        barmode="overlay",
+        xaxis_tickangle=-45,
+        title="Milestone Progress",
+        xaxis_title="Milestone Name",
+        yaxis_title="Progress (%)",
+        plot_bgcolor="rgba(0,0,0,0)",  # Transparent background
+        bargap=0.1,
+        yaxis=dict(range=[0, y_max + 10]),
+    )
+    return fig
+
+
+GANTT_MAX_BARS = int(os.environ.get("GANTT_MAX_BARS", 500))  # Hard cap on bars sent to the browser per render
+GANTT_GROUPINGS = {"Time window": "time", "Milestone owner": "owner", "Status": "status"}
+
+
+def gantt_frame(milestones, status, window=None, group_by="time", max_bars=GANTT_MAX_BARS):
+    """Builds the Gantt rows for the milestones overlapping window (start, end), at most max_bars of them.
+
+    When the window holds max_bars milestones or fewer, every milestone is a
+    row. Otherwise the milestones are aggregated into buckets by start-date
+    window, owner or status, each shown as one bar from the earliest start
+    to the latest end, colored by mean progress. Returns (frame, aggregated).
+    """
+    milestones = as_milestone_store(milestones)
+    start_dates = milestones.start_dates
+    end_dates = milestones.end_dates
+    visible = ~(np.isnat(start_dates) | np.isnat(end_dates))
+    if window is not None:
+        window_start, window_end = (np.datetime64(d, "D") for d in window)
+        visible &= (start_dates <= window_end) & (end_dates >= window_start)
+    rows = np.flatnonzero(visible)
+
+    df = pd.DataFrame(
+        {
+            "Task": milestones.names[rows],
+            "Start": start_dates[rows],
+            "Finish": end_dates[rows],
+            "Complete": milestones.progress[rows] / 100,  # For color
+        }
+    )
+    if len(rows) <= max_bars:
+        df["Milestones"] = 1
+        return df, False
+
+    # --- AGGREGATE INTO BUCKETS ---
+    if group_by == "owner":
+        owners = milestones.owners[rows]
+        keys = np.where(pd.isna(owners), "Unassigned", owners.astype(str))
+    elif group_by == "status":
+        keys = STATUS_LABELS[status[rows]]
+    else:
+        first = df["Start"].min()
+        span_days = (df["Start"].max() - first).days + 1
+        bucket_days = max(1, -(-span_days // max_bars))  # Ceiling division keeps the bucket count under the cap
+        bucket = ((df["Start"] - first).dt.days // bucket_days).to_numpy()
+        bucket_start = first + pd.to_timedelta(bucket * bucket_days, unit="D")
+        keys = bucket_start.strftime("%Y-%m-%d").to_numpy()
+    df["Task"] = keys
+
+    buckets = df.groupby("Task", sort=False).agg(
+        Start=("Start", "min"), Finish=("Finish", "max"), Complete=("Complete", "mean"), Milestones=("Task", "size")
+    )
+    if len(buckets) > max_bars:
+        # Keep the largest buckets and fold the rest into one
+        buckets = buckets.sort_values("Milestones", ascending=False)
+        rest = buckets.iloc[max_bars - 1 :]
+        other = pd.DataFrame(
+            {
+                "Start": [rest["Start"].min()],
+                "Finish": [rest["Finish"].max()],
+                "Complete": [np.average(rest["Complete"], weights=rest["Milestones"])],
+                "Milestones": [rest["Milestones"].sum()],
+            },
+            index=pd.Index([f"Other ({len(rest)} groups)"], name="Task"),
+        )
+        buckets = pd.concat([buckets.iloc[: max_bars - 1], other])
+    buckets = buckets.reset_index().sort_values("Start", kind="stable")
+    buckets["Task"] = buckets["Task"] + " (" + buckets["Milestones"].astype(str) + ")"
+    return buckets, True
+
+
+def build_gantt_figure(df_gantt, today, aggregated=False):
+    """Builds the Program Plan timeline figure from a gantt_frame."""
+    import plotly.express as px
+
+    fig = px.timeline(
+        df_gantt,
+        x_start="Start",
+        x_end="Finish",
+        y="Task",
+        color="Complete",
+        color_continuous_scale=[(0, "red"), (0.99, "lightblue"), (1, "green")],
+        range_color=(0, 1),
+        hover_data={"Milestones": aggregated},
+    )
+
+    # --- UPDATE PLOTLY LAYOUT ---
+    fig.update_yaxes(autorange="reversed")
+    fig.update_layout(
+        title="Program Plan (grouped)" if aggregated else "Program Plan",
+        xaxis_title="Date",
+        yaxis_title="Milestone groups" if aggregated else "Milestones",
+        showlegend=False,
+        xaxis=dict(tickformat="%Y-%m-%d"),
+        hovermode="x unified",
+
+        # --- VISUAL TWEAKS ---
+        plot_bgcolor='rgba(0,0,0,0)' # Transparent background
+    )
+
+    # --- ADD TODAY'S DATE INDICATOR ---
+    fig.add_vline(x=today, line_width=3, line_dash="dash", line_color="red") # Make it more visible
+    return fig
@@ -0,0 +1,193 @@
+"""Headless batch analysis of plan workbooks.
+
+Analyzes every .xlsx plan under one or more directories in a process pool and
+writes one record per plan and/or per milestone as JSON Lines or CSV:
+
+    python -m planner analyze plans/ --format csv --level plan -o scores.csv
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+
+import numpy as np
+
+from .analysis import (
+    STATUS_BEHIND,
+    STATUS_COMPLETED,
+    STATUS_CRITICAL,
+    STATUS_LABELS,
+    STATUS_ON_TRACK,
+    analyze_milestones_batch,
+    calculate_program_duration,
+    delay_warning_mask,
+    milestone_warning_text,
+)
+from .store import format_dates
+from .workbook import load_project_plan
+
+PLAN_FIELDS = (
+    "record", "path", "project_name", "target_end_date", "start_date", "end_date", "duration_days",
+    "milestones", "on_track", "completed", "behind_schedule", "critical", "delay_warnings", "error",
+)
+MILESTONE_FIELDS = (
+    "record", "path", "name", "start_date", "end_date", "owner", "progress",
+    "expected_progress", "status", "warning",
+)
+
+
+def find_plan_files(paths):
+    """Yields the .xlsx files under the given files and directories, skipping Excel lock files."""
+    for path in paths:
+        if os.path.isfile(path):
+            yield path
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                if name.lower().endswith(".xlsx") and not name.startswith("~$"):
+                    yield os.path.join(root, name)
+
+
+def _iso(value):
+    return value.isoformat() if value is not None else None
+
+
+def analyze_plan_file(path, as_of, level="all"):
+    """Analyzes one plan workbook and returns its output records (dicts).
+
+    Runs in a worker process. Errors are reported in the plan record rather
+    than raised, so one bad workbook doesn't stop the batch.
+    """
+    try:
+        plan = load_project_plan(path)
+        milestones = plan.milestones
+        status, expected_progress, warning_codes = analyze_milestones_batch(
+            milestones.start_dates, milestones.end_dates, milestones.progress, as_of, plan.target_end_date
+        )
+        start_date, end_date, duration = (
+            calculate_program_duration(milestones) if len(milestones) else (None, None, None)
+        )
+    except Exception as e:
+        return [{**dict.fromkeys(PLAN_FIELDS), "record": "plan", "path": path, "error": f"{type(e).__name__}: {e}"}]
+
+    records = []
+    if level in ("plan", "all"):
+        counts = np.bincount(status, minlength=len(STATUS_LABELS))
+        records.append(
+            {
+                "record": "plan",
+                "path": path,
+                "project_name": plan.project_name,
+                "target_end_date": _iso(plan.target_end_date),
+                "start_date": _iso(start_date),
+                "end_date": _iso(end_date),
+                "duration_days": duration,
+                "milestones": len(milestones),
+                "on_track": int(counts[STATUS_ON_TRACK]),
+                "completed": int(counts[STATUS_COMPLETED]),
+                "behind_schedule": int(counts[STATUS_BEHIND]),
+                "critical": int(counts[STATUS_CRITICAL]),
+                "delay_warnings": int(delay_warning_mask(status, milestones.end_dates, as_of).sum()),
+                "error": None,
+            }
+        )
+    if level in ("milestone", "all"):
+        start_text = format_dates(milestones.start_dates)
+        end_text = format_dates(milestones.end_dates)
+        progress = milestones.progress
+        for i in range(len(milestones)):
+            records.append(
+                {
+                    "record": "milestone",
+                    "path": path,
+                    "name": milestones.names[i],
+                    "start_date": start_text[i],
+                    "end_date": end_text[i],
+                    "owner": milestones.owners[i],
+                    "progress": None if np.isnan(progress[i]) else float(progress[i]),
+                    "expected_progress": None if np.isnan(expected_progress[i]) else round(float(expected_progress[i]), 2),
+                    "status": STATUS_LABELS[status[i]],
+                    "warning": milestone_warning_text(milestones.names[i], warning_codes[i], expected_progress[i]) or None,
+                }
+            )
+    return records
+
+
+def _analyze_batch(args):
+    paths, as_of, level = args
+    return [record for path in paths for record in analyze_plan_file(path, as_of, level)]
+
+
+def iter_records(paths, as_of, level="all", workers=None, batch_size=8):
+    """Yields output records for every plan in paths, analyzing batches of plans in a process pool."""
+    paths = list(paths)
+    batches = [(paths[i : i + batch_size], as_of, level) for i in range(0, len(paths), batch_size)]
+    if workers == 1:
+        results = map(_analyze_batch, batches)
+        for records in results:
+            yield from records
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for records in executor.map(_analyze_batch, batches):
+            yield from records
+
+
+class _Writer:
+    """Writes records as JSON Lines or CSV."""
+
+    def __init__(self, stream, fmt, level):
+        self.stream = stream
+        self.fmt = fmt
+        if fmt == "csv":
+            fields = {"plan": PLAN_FIELDS, "milestone": MILESTONE_FIELDS}.get(level)
+            if fields is None:
+                fields = tuple(dict.fromkeys(PLAN_FIELDS + MILESTONE_FIELDS))
+            self.csv = csv.DictWriter(stream, fieldnames=fields, extrasaction="ignore")
+            self.csv.writeheader()
+
+    def write(self, record):
+        if self.fmt == "csv":
+            self.csv.writerow(record)
+        else:
+            self.stream.write(json.dumps(record, default=str) + "\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m planner", description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    analyze = subparsers.add_parser("analyze", help="Analyze every .xlsx plan under the given paths.")
+    analyze.add_argument("paths", nargs="+", help="Plan workbooks or directories to search recursively.")
+    analyze.add_argument("--format", choices=("jsonl", "csv"), default="jsonl")
+    analyze.add_argument(
+        "--level", choices=("plan", "milestone", "all"), default="all",
+        help="Emit per-plan records, per-milestone records or both (default).",
+    )
+    analyze.add_argument("-o", "--output", help="Output file (default: stdout).")
+    analyze.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count).")
+    analyze.add_argument(
+        "--as-of", type=lambda s: datetime.strptime(s, "%Y-%m-%d").date(), default=None,
+        help="Analyze as of this date, YYYY-MM-DD (default: today).",
+    )
+    args = parser.parse_args(argv)
+
+    as_of = args.as_of or date.today()
+    paths = list(find_plan_files(args.paths))
+    stream = open(args.output, "w", newline="", encoding="utf-8") if args.output else sys.stdout
+    errors = 0
+    try:
+        writer = _Writer(stream, args.format, args.level)
+        for record in iter_records(paths, as_of, args.level, args.workers):
+            if record["record"] == "plan" and record["error"] is not None:
+                errors += 1
+            writer.write(record)
+    finally:
+        if args.output:
+            stream.close()
+
+    print(f"Analyzed {len(paths)} plan(s); {errors} could not be read.", file=sys.stderr)
+    return 0
@@ -0,0 +1,99 @@
+"""Normalizing the date cells of ingested plans to datetime64[D]."""
+
+import re
+from datetime import date, datetime
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+DATE_CACHE_SIZE = 65536  # Distinct date cells remembered across columns and loads
+MISSING_DATE_TEXT = frozenset(("", "n/a", "na", "nat", "-"))  # Case-insensitive text for "no date"
+EXCEL_EPOCH = date(1899, 12, 30)  # Day 0 of Excel's 1900 date system for serials from 61 (1900-03-01) on
+EXCEL_LEAP_BUG_SERIAL = 60  # Excel's 1900-02-29, which doesn't exist; serials below it are one day later
+EXCEL_MAX_SERIAL = 2958465  # 9999-12-31
+
+# YYYY-MM-DD (also with / or . and single-digit month or day) or YYYYMMDD, optionally followed
+# by an ISO time and UTC offset, which are ignored
+_ISO_DATE = re.compile(
+    r"(\d{4})(?:([-/.])(\d{1,2})\2(\d{1,2})|(\d{2})(\d{2}))"
+    r"(?:[T ]\d{1,2}:\d{2}(?::\d{2}(?:[.,]\d+)?)?\s*(?:Z|[+-]\d{2}(?::?\d{2})?)?)?"
+)
+_UNIX_EPOCH = date(1970, 1, 1).toordinal()
+_NAT = np.datetime64("NaT", "D").astype(np.int64)
+
+
+class _InvalidDate(Exception):
+    pass
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE, typed=True)
+def _date_days(value):
+    """Days since 1970-01-01 of one date cell, None if it's empty or "N/A"; raises _InvalidDate otherwise."""
+    if isinstance(value, str):
+        text = value.strip()
+        if text.casefold() in MISSING_DATE_TEXT:
+            return None
+        match = _ISO_DATE.fullmatch(text)
+        if match is None:
+            raise _InvalidDate
+        year, _, month, day, compact_month, compact_day = match.groups()
+        try:
+            value = date(int(year), int(month or compact_month), int(day or compact_day))
+        except ValueError:
+            raise _InvalidDate  # e.g. 2024-02-30
+    elif isinstance(value, (bool, np.bool_)):
+        raise _InvalidDate
+    elif isinstance(value, (int, float, np.integer, np.floating)):
+        if not 1 <= value < EXCEL_MAX_SERIAL + 1:
+            raise _InvalidDate
+        serial = int(value)  # The fraction is the time of day
+        if serial == EXCEL_LEAP_BUG_SERIAL:
+            raise _InvalidDate
+        if serial < EXCEL_LEAP_BUG_SERIAL:
+            serial += 1
+        return EXCEL_EPOCH.toordinal() + serial - _UNIX_EPOCH
+    elif isinstance(value, np.datetime64):
+        return None if np.isnat(value) else int(value.astype("datetime64[D]").astype(np.int64))
+    elif isinstance(value, datetime):
+        value = value.date()
+    elif not isinstance(value, date):
+        raise _InvalidDate
+    return value.toordinal() - _UNIX_EPOCH
+
+
+def normalize_dates(values):
+    """Converts a column of date cells to a datetime64[D] array; returns (dates, positions of bad cells).
+
+    Cells can be dates, datetimes, ISO 8601 text (YYYY-MM-DD, YYYY/MM/DD,
+    YYYYMMDD, with or without a time), or Excel serial numbers. Empty cells
+    and "N/A" become NaT, as do the bad cells, which are returned for the
+    caller to report.
+
+    The column is factorized in one pass, so each distinct cell is parsed
+    once, and parsed cells are cached across calls: a plan's dates repeat a
+    lot, so most cells cost a hash lookup.
+    """
+    if isinstance(values, np.ndarray) and values.dtype.kind == "M":
+        return values.astype("datetime64[D]"), np.empty(0, dtype=np.intp)
+    values = np.asarray(values, dtype=object)
+    codes, uniques = pd.factorize(values.ravel())  # None and NaN get code -1
+    days = np.empty(len(uniques) + 1, dtype=np.int64)  # The last entry is for code -1
+    invalid = np.zeros(len(uniques) + 1, dtype=bool)
+    days[-1] = _NAT
+    for k, value in enumerate(uniques.tolist()):
+        try:
+            parsed = _date_days(value)
+        except _InvalidDate:
+            parsed, invalid[k] = None, True
+        days[k] = _NAT if parsed is None else parsed
+    return days[codes].astype("datetime64[D]"), np.flatnonzero(invalid[codes])
+
+
+def normalize_date(value):
+    """Converts one date cell to a datetime64[D] (NaT if empty, "N/A" or not a date)."""
+    try:
+        days = None if pd.isna(value) else _date_days(value)
+    except _InvalidDate:
+        days = None
+    return np.datetime64("NaT" if days is None else days, "D")
@@ -0,0 +1,100 @@
+"""Finish-to-start dependency graph between milestones."""
+
+
+class DependencyCycleError(ValueError):
+    """Raised when a dependency would make the graph cyclic."""
+
+
+class DependencyGraph:
+    """Finish-to-start dependencies with lags (in days) between milestones.
+
+    A dependency (predecessor, successor, lag_days) means the successor can't
+    start until lag_days after the predecessor finishes. Nodes are milestone
+    keys; the graph only holds nodes that take part in a dependency. Cycles
+    are rejected when an edge is added.
+    """
+
+    def __init__(self):
+        self._successors = {}  # node -> {successor: lag_days}
+        self._predecessors = {}  # node -> {predecessor: lag_days}
+
+    def __contains__(self, node):
+        return node in self._successors
+
+    def __len__(self):
+        """Number of dependencies."""
+        return sum(len(successors) for successors in self._successors.values())
+
+    def nodes(self):
+        return list(self._successors)
+
+    def edges(self):
+        """Yields (predecessor, successor, lag_days) for every dependency."""
+        for predecessor, successors in self._successors.items():
+            for successor, lag_days in successors.items():
+                yield predecessor, successor, lag_days
+
+    def successors(self, node):
+        return self._successors.get(node, {})
+
+    def predecessors(self, node):
+        return self._predecessors.get(node, {})
+
+    def add_dependency(self, predecessor, successor, lag_days=0):
+        """Records that successor starts lag_days after predecessor finishes."""
+        if predecessor == successor or self._reaches(successor, predecessor):
+            raise DependencyCycleError(f"'{successor}' already leads to '{predecessor}'; this would create a cycle.")
+        for node in (predecessor, successor):
+            self._successors.setdefault(node, {})
+            self._predecessors.setdefault(node, {})
+        self._successors[predecessor][successor] = lag_days
+        self._predecessors[successor][predecessor] = lag_days
+
+    def remove_dependency(self, predecessor, successor):
+        self._successors.get(predecessor, {}).pop(successor, None)
+        self._predecessors.get(successor, {}).pop(predecessor, None)
+        for node in (predecessor, successor):
+            if node in self._successors and not self._successors[node] and not self._predecessors[node]:
+                del self._successors[node], self._predecessors[node]
+
+    def remove_node(self, node):
+        """Removes a node and all of its dependencies."""
+        for successor in list(self.successors(node)):
+            self.remove_dependency(node, successor)
+        for predecessor in list(self.predecessors(node)):
+            self.remove_dependency(predecessor, node)
+
+    def _reaches(self, source, target):
+        """True if target can be reached from source along dependencies."""
+        stack, seen = [source], {source}
+        while stack:
+            node = stack.pop()
+            if node == target:
+                return True
+            for successor in self.successors(node):
+                if successor not in seen:
+                    seen.add(successor)
+                    stack.append(successor)
+        return False
+
+    def topological_order(self):
+        """Returns the nodes with every predecessor before its successors (Kahn's algorithm, O(V + E))."""
+        in_degree = {node: len(predecessors) for node, predecessors in self._predecessors.items()}
+        ready = [node for node, degree in in_degree.items() if degree == 0]
+        order = []
+        while ready:
+            node = ready.pop()
+            order.append(node)
+            for successor in self._successors[node]:
+                in_degree[successor] -= 1
+                if in_degree[successor] == 0:
+                    ready.append(successor)
+        if len(order) != len(in_degree):
+            raise DependencyCycleError("The dependency graph has a cycle.")
+        return order
+
+    def copy(self):
+        graph = DependencyGraph()
+        graph._successors = {node: dict(successors) for node, successors in self._successors.items()}
+        graph._predecessors = {node: dict(predecessors) for node, predecessors in self._predecessors.items()}
+        return graph
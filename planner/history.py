@@ -0,0 +1,125 @@
+"""Undo/redo history of milestone edits."""
+
+from collections import deque, namedtuple
+
+from .dependencies import DependencyCycleError
+
+EDIT_HISTORY_SIZE = 200  # Edits that can be undone; each holds at most one milestone and its dependencies
+
+# kind is "update", "insert" or "delete"; before/after are the changed fields of an
+# update, or the milestone dict an insert added (after) or a delete removed (before)
+Edit = namedtuple("Edit", ("kind", "milestone_id", "before", "after", "dependencies"))
+
+
+class EditHistory:
+    """Undo and redo of the milestone edits made to a MilestoneStore through it.
+
+    Each edit is kept as a delta keyed by milestone ID rather than a copy of
+    the plan: the old and new values of the fields an update changed, or
+    the milestone an insert added or a delete removed, with the deleted
+    milestone's dependencies. undo() and redo() move one delta from one
+    stack to the other and apply it, so they cost the same however long the
+    session has been. Only the last max_edits edits are kept, which bounds
+    the memory the history holds.
+
+    Edits made to the store directly aren't recorded. Since deltas are
+    applied by milestone ID, undoing one still changes the right milestone;
+    a deleted milestone comes back under its old ID and position.
+    """
+
+    def __init__(self, milestones, max_edits=EDIT_HISTORY_SIZE):
+        self.milestones = milestones
+        self._undo = deque(maxlen=max_edits)
+        self._redo = deque(maxlen=max_edits)
+
+    def __len__(self):
+        """Number of edits that can be undone."""
+        return len(self._undo)
+
+    def next_undo(self):
+        """The Edit undo() would revert, or None."""
+        return self._undo[-1] if self._undo else None
+
+    def next_redo(self):
+        """The Edit redo() would reapply, or None."""
+        return self._redo[-1] if self._redo else None
+
+    # --- Recorded edits ---
+
+    def update(self, i, milestone):
+        """Writes the given fields of milestone i (see MilestoneStore.update); returns True if any changed."""
+        milestones = self.milestones
+        before = milestones[i]
+        version = milestones.version
+        milestones.update(i, milestone)
+        if milestones.version == version:
+            return False
+        after = milestones[i]
+        changed = [field for field in after if after[field] != before[field]]
+        self._record(
+            Edit(
+                "update",
+                int(milestones.ids[i]),
+                {field: before[field] for field in changed},
+                {field: after[field] for field in changed},
+                (),
+            )
+        )
+        return True
+
+    def append(self, milestone):
+        """Appends one milestone dict."""
+        self.milestones.append(milestone)
+        self._record(Edit("insert", int(self.milestones.ids[-1]), None, self.milestones[-1], ()))
+
+    def delete(self, i):
+        """Deletes milestone i along with its dependencies."""
+        milestones = self.milestones
+        milestone_id = int(milestones.ids[i])
+        graph = milestones.dependencies
+        dependencies = [(predecessor, milestone_id, lag) for predecessor, lag in graph.predecessors(milestone_id).items()]
+        dependencies += [(milestone_id, successor, lag) for successor, lag in graph.successors(milestone_id).items()]
+        before = milestones[i]
+        del milestones[i]
+        self._record(Edit("delete", milestone_id, before, None, tuple(dependencies)))
+
+    def _record(self, edit):
+        self._undo.append(edit)
+        self._redo.clear()
+
+    # --- Undo and redo ---
+
+    def undo(self):
+        """Reverts the most recent edit; returns it, or None if there is nothing to undo."""
+        if not self._undo:
+            return None
+        edit = self._undo.pop()
+        self._apply(edit, reverse=True)
+        self._redo.append(edit)
+        return edit
+
+    def redo(self):
+        """Reapplies the most recently undone edit; returns it, or None if there is nothing to redo."""
+        if not self._redo:
+            return None
+        edit = self._redo.pop()
+        self._apply(edit, reverse=False)
+        self._undo.append(edit)
+        return edit
+
+    def _apply(self, edit, reverse):
+        milestones = self.milestones
+        i = milestones.row_of(edit.milestone_id)
+        if edit.kind == "update":
+            if i is not None:
+                milestones.update(i, edit.before if reverse else edit.after)
+        elif (edit.kind == "insert") == reverse:
+            if i is not None:
+                del milestones[i]
+        elif i is None:
+            milestones.restore(edit.milestone_id, edit.before if reverse else edit.after)
+            for predecessor, successor, lag_days in edit.dependencies:
+                try:
+                    milestones.add_dependency(predecessor, successor, lag_days)
+                except (KeyError, DependencyCycleError):
+                    pass  # The other milestone is gone too, or the graph changed since
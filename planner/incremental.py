@@ -0,0 +1,255 @@
+"""Incremental upkeep of a plan's analysis results as its milestones are edited."""
+
+import copy
+
+import numpy as np
+
+from .analysis import analyze_milestones_batch, compute_schedule
+
+MAX_INCREMENTAL_ROWS = 64  # More rows touched than this since the last sync are recomputed in one go
+
+
+class _Extreme:
+    """Running earliest or latest date of a column, with the number of rows holding it."""
+
+    def __init__(self, dates, earliest):
+        self.earliest = earliest
+        self.reset(dates)
+
+    def reset(self, dates):
+        known = dates[~np.isnat(dates)]
+        if len(known):
+            self.value = known.min() if self.earliest else known.max()
+            self.count = int((known == self.value).sum())
+        else:
+            self.value, self.count = None, 0
+
+    def add(self, date):
+        if np.isnat(date):
+            return
+        if self.value is None or (date < self.value if self.earliest else date > self.value):
+            self.value, self.count = date, 1
+        elif date == self.value:
+            self.count += 1
+
+    def remove(self, date):
+        """Drops one row's date; returns False if the extreme then has to be found again."""
+        if np.isnat(date) or self.value is None or date != self.value:
+            return True
+        self.count -= 1
+        return self.count > 0
+
+
+class IncrementalAnalysis:
+    """Analysis results of a plan that follow its edits row by row.
+
+    sync() replays the store's change log since the last sync: added and
+    updated milestones are re-analysed on their own, deleted ones are dropped
+    from the result arrays, and the extreme dates are kept as running
+    extremes (a full scan only happens when the last milestone holding an
+    extreme date moves). The dependency schedule is patched in place for
+    milestones outside the dependency graph and recomputed when an edit
+    touches the graph, the critical path or the project finish. If the log
+    doesn't reach back far enough, or more than MAX_INCREMENTAL_ROWS rows
+    were touched, everything is recomputed. Result arrays are updated in
+    place.
+
+    fork() starts the analysis of a copy-on-write copy of the plan from
+    these results: the two share their result arrays until either one syncs
+    an edit, and then only the edited rows are re-analysed.
+    """
+
+    def __init__(self, milestones, as_of, target_end_date=None):
+        self.milestones = milestones
+        self.as_of = as_of
+        self.target_end_date = target_end_date
+        self.full_recomputes = 0
+        self.incremental_updates = 0
+        self._shared = False  # True while the result arrays may be shared with a fork
+        self._recompute()
+
+    def _recompute(self):
+        milestones = self.milestones
+        self.status, self.expected_progress, self.warning_codes = analyze_milestones_batch(
+            milestones.start_dates, milestones.end_dates, milestones.progress, self.as_of, self.target_end_date
+        )
+        # The dates the results were computed from, to know what an edit replaced
+        self._start_dates = milestones.start_dates.copy()
+        self._end_dates = milestones.end_dates.copy()
+        self._earliest = _Extreme(self._start_dates, earliest=True)
+        self._latest = _Extreme(self._end_dates, earliest=False)
+        self._schedule = None
+        self._shared = False
+        self.version = milestones.version
+        self.full_recomputes += 1
+
+    def fork(self, milestones):
+        """Returns the analysis of milestones, a copy of this plan made at its synced version.
+
+        The fork shares this analysis's results until either one syncs an
+        edit, so analysing an unchanged copy costs nothing.
+        """
+        if milestones.version != self.version:
+            raise ValueError("The copy has to be made at the version the analysis is synced to.")
+        analysis = copy.copy(self)
+        analysis.milestones = milestones
+        analysis._earliest = copy.copy(self._earliest)
+        analysis._latest = copy.copy(self._latest)
+        analysis.full_recomputes = analysis.incremental_updates = 0
+        analysis._shared = self._shared = True
+        return analysis
+
+    def _own(self):
+        """Takes private copies of result arrays shared with a fork before they are written in place."""
+        if not self._shared:
+            return
+        for name in self._arrays():
+            setattr(self, name, getattr(self, name).copy())
+        schedule = self._schedule
+        if schedule is not None:
+            self._schedule = schedule._replace(**{field: getattr(schedule, field).copy() for field in schedule._fields})
+        self._shared = False
+
+    # --- Results ---
+
+    def duration(self):
+        """(extreme start date, extreme end date, program duration in days), as calculate_program_duration."""
+        if self._earliest.value is None or self._latest.value is None:
+            return None, None, None  # No start or end dates, as calculate_program_duration
+        extreme_start_date = self._earliest.value.astype(object)
+        extreme_end_date = self._latest.value.astype(object)
+        return extreme_start_date, extreme_end_date, (extreme_end_date - extreme_start_date).days
+
+    def schedule(self):
+        """The plan's critical-path Schedule (see compute_schedule), computed on first use."""
+        if self._schedule is None:
+            self.sync()  # Computed from the store as it is now, so the edits since the last sync are applied first
+            if self._schedule is None:
+                self._schedule = compute_schedule(self.milestones)
+        return self._schedule
+
+    # --- Applying edits ---
+
+    def sync(self):
+        """Brings the results up to date with the store; returns True if anything changed."""
+        milestones = self.milestones
+        if milestones.version == self.version:
+            return False
+        changes = milestones.changes_since(self.version)
+        if changes is None or sum(count for _, _, count in changes) > MAX_INCREMENTAL_ROWS:
+            self._recompute()
+            return True
+
+        self._own()
+        dirty = set()  # Rows to re-analyse, as positions in the current store
+        rescan = False  # An extreme date was removed and has to be found again
+        schedule_stale = False
+        for kind, row, count in changes:
+            if kind == "insert":
+                if row < len(self.status):
+                    self._schedule = None  # The rows after it move, so the schedule is recomputed
+                self._insert(row, count)
+                dirty = {i + count * (i >= row) for i in dirty}
+                dirty.update(range(row, row + count))
+            elif kind == "update":
+                dirty.add(row)
+            elif kind == "delete":
+                rescan |= not self._earliest.remove(self._start_dates[row])
+                rescan |= not self._latest.remove(self._end_dates[row])
+                schedule_stale |= self._schedule_drop(row)
+                self._delete(row)
+                dirty = {i - (i > row) for i in dirty if i != row}
+            else:  # "dependencies"
+                schedule_stale = True
+
+        rows = np.array(sorted(dirty), dtype=np.intp)
+        start_dates = milestones.start_dates[rows]
+        end_dates = milestones.end_dates[rows]
+        for old, new in zip(self._start_dates[rows], start_dates):
+            rescan |= not self._earliest.remove(old)
+            self._earliest.add(new)
+        for old, new in zip(self._end_dates[rows], end_dates):
+            rescan |= not self._latest.remove(old)
+            self._latest.add(new)
+        if not schedule_stale and self._schedule is not None:
+            schedule_stale = not self._schedule_patch(rows, start_dates, end_dates)
+
+        self._start_dates[rows] = start_dates
+        self._end_dates[rows] = end_dates
+        self.status[rows], self.expected_progress[rows], self.warning_codes[rows] = analyze_milestones_batch(
+            start_dates, end_dates, milestones.progress[rows], self.as_of, self.target_end_date
+        )
+        if rescan:
+            self._earliest.reset(self._start_dates)
+            self._latest.reset(self._end_dates)
+        if schedule_stale:
+            self._schedule = None
+        self.version = milestones.version
+        self.incremental_updates += 1
+        return True
+
+    def _arrays(self):
+        return ("status", "expected_progress", "warning_codes", "_start_dates", "_end_dates")
+
+    def _insert(self, row, count):
+        for name in self._arrays():
+            array = getattr(self, name)
+            filler = np.datetime64("NaT") if array.dtype.kind == "M" else 0
+            setattr(self, name, np.insert(array, row, np.full(count, filler, dtype=array.dtype)))
+
+    def _delete(self, row):
+        for name in self._arrays():
+            setattr(self, name, np.delete(getattr(self, name), row))
+
+    # --- Dependency schedule ---
+
+    def _schedule_drop(self, row):
+        """Removes a deleted row from the schedule; returns True if it has to be recomputed instead."""
+        schedule = self._schedule
+        if schedule is None:
+            return False
+        if row in schedule.critical_path:
+            return True
+        if row >= len(schedule.early_start):
+            return False  # Appended since the schedule was computed and not patched in yet
+        # The store logs a "dependencies" change for rows in the graph, so only the positions move
+        self._schedule = schedule._replace(
+            critical_path=[i - (i > row) for i in schedule.critical_path],
+            **{field: np.delete(getattr(schedule, field), row) for field in schedule._fields[:-1]},
+        )
+        return False
+
+    def _schedule_patch(self, rows, start_dates, end_dates):
+        """Patches the schedule of rows outside the dependency graph; returns False if it needs recomputing."""
+        schedule = self._schedule
+        graph = self.milestones.dependencies
+        ids = self.milestones.ids
+        if any(int(ids[i]) in graph or i in schedule.critical_path for i in rows):
+            return False
+        path = schedule.critical_path
+        project_finish = schedule.early_finish[path[-1]] if path else None
+        known = ~(np.isnat(start_dates) | np.isnat(end_dates))
+        # Finishing with the project could make the milestone the end of the critical path
+        if project_finish is None or (end_dates[known] >= project_finish).any():
+            return False
+
+        size = len(self.milestones)
+        fields = {field: getattr(schedule, field) for field in schedule._fields[:-1]}
+        for field, array in fields.items():
+            if len(array) < size:
+                filler = np.datetime64("NaT") if array.dtype.kind == "M" else 0
+                fields[field] = np.concatenate([array, np.full(size - len(array), filler, dtype=array.dtype)])
+
+        # Outside the graph a milestone keeps its planned dates and may finish as late as the project
+        nat = np.datetime64("NaT")
+        late_finish = np.where(known, project_finish, nat)
+        fields["early_start"][rows] = np.where(known, start_dates, nat)
+        fields["early_finish"][rows] = np.where(known, end_dates, nat)
+        fields["late_finish"][rows] = late_finish
+        fields["late_start"][rows] = late_finish - (end_dates - start_dates)
+        slack = np.where(known, (project_finish - end_dates).astype(np.int64), 0)
+        fields["slack"][rows] = slack
+        fields["pushed_days"][rows] = 0
+        fields["critical"][rows] = known & (slack == 0)
+        self._schedule = schedule._replace(**fields)
+        return True
@@ -0,0 +1,171 @@
+"""Cached analysis stages of a plan for the interactive screens."""
+
+from contextlib import nullcontext
+
+import numpy as np
+
+from .analysis import (
+    delay_warning_mask,
+    milestone_status_frame,
+    milestone_warning_text,
+    schedule_frame,
+    schedule_warning_text,
+)
+from .charts import GANTT_MAX_BARS, build_gantt_figure, build_progress_figure, gantt_frame
+from .incremental import IncrementalAnalysis
+from .risk import RISK_TRIALS, simulate_schedule
+
+
+class AnalysisPipeline:
+    """Analysis of one plan as separately cached stages, shared by the app's analysis screens.
+
+    bind() points the pipeline at a plan; stage results are kept until the
+    plan's version, the as-of date or the target end date changes, so widget
+    interactions on the analysis screen reuse the computed tables and figures.
+    Edits to the bound plan (milestone_actions) are applied to the duration,
+    status and schedule results incrementally rather than recomputing them.
+
+    fork() branches a what-if copy of the bound plan with a pipeline of its
+    own that starts from this one's results and cached stages.
+
+    If a RerunProfiler is given, recomputed stages are timed as its "analysis"
+    and "figure build" stages.
+    """
+
+    def __init__(self, profiler=None):
+        self.profiler = profiler
+        self.milestones = None
+        self.as_of = None
+        self.target_end_date = None
+        self._key = None
+        self._version = None
+        self._incremental = None
+        self._stages = {}
+
+    def bind(self, milestones, as_of, target_end_date):
+        key = (milestones.token, as_of, target_end_date)
+        if key != self._key:
+            self._key = key
+            with self._profile("analysis"):
+                self._incremental = IncrementalAnalysis(milestones, as_of, target_end_date)
+            self._stages = {}
+        elif milestones.version != self._version:
+            with self._profile("analysis"):
+                self._incremental.sync()
+            self._stages = {}
+        self._version = milestones.version
+        self.milestones = milestones
+        self.as_of = as_of
+        self.target_end_date = target_end_date
+        return self
+
+    def fork(self):
+        """Returns a pipeline bound to a copy-on-write copy of the bound plan.
+
+        The copy starts with this pipeline's analysis results and cached
+        stages; once it is edited, only the milestones it changed are
+        re-analysed.
+        """
+        self.bind(self.milestones, self.as_of, self.target_end_date)  # Catch up with edits to the plan
+        milestones = self.milestones.copy()
+        pipeline = type(self)(self.profiler)
+        pipeline._incremental = self._incremental.fork(milestones)
+        pipeline._key = (milestones.token, self.as_of, self.target_end_date)
+        pipeline._version = self._version
+        pipeline._stages = dict(self._stages)
+        pipeline.milestones = milestones
+        pipeline.as_of = self.as_of
+        pipeline.target_end_date = self.target_end_date
+        return pipeline
+
+    def _profile(self, name):
+        return self.profiler.stage(name) if self.profiler is not None else nullcontext()
+
+    def _stage(self, name, compute, params=None, profile="analysis"):
+        """Returns the cached result of a stage, recomputing it (timed as profile) if missing or if its params changed."""
+        cached = self._stages.get(name)
+        if cached is None or cached[0] != params:
+            with self._profile(profile):
+                cached = self._stages[name] = (params, compute())
+        return cached[1]
+
+    def duration(self):
+        """(extreme start date, extreme end date, program duration in days)"""
+        return self._stage("duration", self._incremental.duration)
+
+    def analysis(self):
+        """(status codes, expected progress, warning codes), as analyze_milestones_batch"""
+        incremental = self._incremental
+        return incremental.status, incremental.expected_progress, incremental.warning_codes
+
+    def delay_warnings(self):
+        def compute():
+            status, expected_progress, warning_codes = self.analysis()
+            rows = np.flatnonzero(delay_warning_mask(status, self.milestones.end_dates, self.as_of))
+            return [
+                milestone_warning_text(self.milestones.names[i], warning_codes[i], expected_progress[i])
+                for i in rows
+            ]
+
+        return self._stage("delay_warnings", compute)
+
+    def status_table(self):
+        def compute():
+            status, expected_progress, _ = self.analysis()
+            return milestone_status_frame(self.milestones, status, expected_progress)
+
+        return self._stage("status_table", compute)
+
+    def gantt(self, window=None, group_by="time", max_bars=GANTT_MAX_BARS):
+        """(gantt frame, aggregated, figure); only the most recent zoom/grouping is kept."""
+        def compute():
+            df_gantt, aggregated = gantt_frame(self.milestones, self.analysis()[0], window, group_by, max_bars)
+            return df_gantt, aggregated, build_gantt_figure(df_gantt, self.as_of, aggregated)
+
+        return self._stage("gantt", compute, params=(window, group_by, max_bars), profile="figure build")
+
+    def progress_figure(self):
+        def compute():
+            _, expected_progress, _ = self.analysis()
+            return build_progress_figure(self.milestones.names, self.milestones.progress, expected_progress)
+
+        return self._stage("progress_figure", compute, profile="figure build")
+
+    def schedule(self):
+        """Critical-path schedule of the plan's dependencies (see compute_schedule)."""
+        with self._profile("analysis"):
+            return self._incremental.schedule()
+
+    def schedule_table(self):
+        return self._stage("schedule_table", lambda: schedule_frame(self.milestones, self.schedule()))
+
+    def schedule_risk(self, trials=RISK_TRIALS, distribution="pert", optimistic=0.9, pessimistic=1.5, seed=0):
+        """Monte Carlo ScheduleRisk of the plan against its target end date, from as_of (see simulate_schedule).
+
+        The seed is fixed by default, so the figures only move when the plan
+        or the settings do.
+        """
+        return self._stage(
+            "schedule_risk",
+            lambda: simulate_schedule(
+                self.milestones,
+                self.target_end_date,
+                trials,
+                distribution,
+                optimistic=optimistic,
+                pessimistic=pessimistic,
+                seed=seed,
+                as_of=self.as_of,
+            ),
+            params=(trials, distribution, optimistic, pessimistic, seed),
+        )
+
+    def schedule_warnings(self):
+        def compute():
+            pushed_days = self.schedule().pushed_days
+            return [
+                schedule_warning_text(self.milestones.names[i], pushed_days[i])
+                for i in np.flatnonzero(pushed_days > 0)
+            ]
+
+        return self._stage("schedule_warnings", compute)
@@ -0,0 +1,178 @@
+"""Cross-project dependencies, resolved against the saved plans of the projects they refer to."""
+
+import threading
+from collections import namedtuple
+
+import numpy as np
+
+from .analysis import compute_schedule
+from .cache import PlanCache
+
+DEPENDENCY_PREFIX = "d - Dependency on "  # Name of a milestone standing for another project
+
+ProjectForecast = namedtuple("ProjectForecast", ("start_date", "finish_date", "progress", "target_end_date"))
+
+
+def dependency_projects(milestones):
+    """Returns {upstream project name: rows} for the plan's "d - Dependency on <project>" milestones."""
+    names = milestones.names
+    if not len(names):
+        return {}
+    rows = np.flatnonzero(np.char.startswith(names.astype(str), DEPENDENCY_PREFIX))
+    projects = {}
+    for i in rows.tolist():
+        projects.setdefault(names[i][len(DEPENDENCY_PREFIX) :], []).append(i)
+    return projects
+
+
+def apply_forecasts(milestones, forecasts):
+    """Sets each dependency milestone to its upstream project's forecast dates and progress.
+
+    forecasts maps upstream project names to ProjectForecast; milestones of
+    projects without a forecast keep their values. Returns the number of
+    milestones that changed.
+    """
+    changed = 0
+    for project, rows in dependency_projects(milestones).items():
+        forecast = forecasts.get(project)
+        if forecast is None or forecast.finish_date is None:
+            continue
+        for i in rows:
+            version = milestones.version
+            milestones.update(
+                i,
+                {"Start Date": forecast.start_date, "End Date": forecast.finish_date, "Progress": forecast.progress},
+            )
+            changed += milestones.version != version
+    return changed
+
+
+def forecast_plan(plan, upstream=None):
+    """Returns the ProjectForecast of a plan after resolving its dependencies on upstream forecasts.
+
+    The plan itself isn't changed: its dependency milestones are updated on
+    a copy-on-write copy, whose schedule then pushes their successors. The
+    forecast spans the scheduled start and finish of the milestones with
+    both dates; progress is their duration-weighted mean, as a whole percent.
+    """
+    milestones = plan.milestones
+    if upstream:
+        milestones = milestones.copy()
+        apply_forecasts(milestones, upstream)
+    schedule = compute_schedule(milestones)
+    known = ~np.isnat(schedule.early_start)
+    if not known.any():
+        return ProjectForecast(None, None, None, plan.target_end_date)
+    start = schedule.early_start[known]
+    finish = schedule.early_finish[known]
+    progress = milestones.progress[known]
+    weights = np.maximum((finish - start).astype(np.int64), 1)
+    reported = ~np.isnan(progress)
+    overall = int(round(np.average(progress[reported], weights=weights[reported]))) if reported.any() else 0
+    return ProjectForecast(start.min().astype(object), finish.max().astype(object), overall, plan.target_end_date)
+
+
+class Portfolio:
+    """Forecasts of the plans in a plan storage, with their cross-project dependencies resolved.
+
+    A milestone named "d - Dependency on <project>" stands for the upstream
+    project: its dates and progress follow that project's forecast, and the
+    plan's dependency schedule pushes the milestones waiting on it, so a slip
+    upstream moves every downstream forecast. A project's saved plan is found
+    under plan_names[project] or, failing that, under "<project>" or
+    "<project>.xlsx".
+
+    Plans are loaded on first use through cache (a PlanCache), keyed by
+    their storage revision. Each forecast is kept with the revision and
+    upstream forecasts it was computed from, so refresh() only recomputes
+    projects whose plan or upstream forecasts changed. A dependency that
+    would close a cycle between projects is left unresolved.
+    """
+
+    def __init__(self, storage, cache=None, plan_names=None):
+        self.storage = storage
+        self.cache = cache if cache is not None else PlanCache(256 * 2**20)
+        self.plan_names = dict(plan_names or {})  # project name -> saved plan name
+        self.recomputes = 0
+        self._entries = {}  # saved plan name -> (revision, upstream projects, upstream forecasts, forecast)
+        self._lock = threading.Lock()
+
+    def saved_plan_name(self, project, revisions):
+        """The name the project's plan is saved under, or None if it isn't saved."""
+        name = self.plan_names.get(project)
+        if name is not None:
+            return name if name in revisions else None
+        for name in (project, f"{project}.xlsx"):
+            if name in revisions:
+                return name
+        return None
+
+    def plan(self, name, revision):
+        """The saved plan name at the given revision, loaded once and shared (its milestones are frozen)."""
+        return self.cache.get_or_load(("saved", name, revision), lambda: self.storage.load(name))
+
+    def refresh(self, names=None):
+        """Returns {saved plan name: ProjectForecast} for the given saved plans (default: all) and their upstreams."""
+        with self._lock:
+            revisions = self.storage.revisions()
+            for name in set(self._entries) - set(revisions):
+                del self._entries[name]
+            forecasts = {}
+            expanded = set()
+            for root in revisions if names is None else names:
+                if root not in revisions:
+                    continue
+                # Depth-first, so each plan is forecast after its upstream plans
+                stack = [(root, False)]
+                while stack:
+                    name, ready = stack.pop()
+                    if ready:
+                        forecasts[name] = self._forecast(name, revisions, forecasts)
+                        continue
+                    if name in expanded:
+                        continue
+                    expanded.add(name)
+                    stack.append((name, True))
+                    for project in self._upstream_projects(name, revisions[name]):
+                        upstream = self.saved_plan_name(project, revisions)
+                        if upstream is not None and upstream not in expanded:
+                            stack.append((upstream, False))
+            return forecasts
+
+    def forecast(self, project):
+        """The ProjectForecast of a project from its saved plan, or None if it has none."""
+        name = self.saved_plan_name(project, self.storage.revisions())
+        return None if name is None else self.refresh([name]).get(name)
+
+    def upstream_forecasts(self, milestones):
+        """{project name: ProjectForecast} for the saved upstream projects of a plan's dependency milestones."""
+        projects = list(dependency_projects(milestones))
+        if not projects:
+            return {}
+        revisions = self.storage.revisions()
+        names = {project: self.saved_plan_name(project, revisions) for project in projects}
+        forecasts = self.refresh([name for name in names.values() if name is not None])
+        return {project: forecasts[name] for project, name in names.items() if name in forecasts}
+
+    def _upstream_projects(self, name, revision):
+        entry = self._entries.get(name)
+        if entry is not None and entry[0] == revision:
+            return entry[1]
+        return list(dependency_projects(self.plan(name, revision).milestones))
+
+    def _forecast(self, name, revisions, forecasts):
+        revision = revisions[name]
+        projects = self._upstream_projects(name, revision)
+        upstream = {}
+        for project in projects:
+            # An upstream plan not forecast yet is on the current path: a cycle
+            forecast = forecasts.get(self.saved_plan_name(project, revisions))
+            if forecast is not None:
+                upstream[project] = forecast
+        entry = self._entries.get(name)
+        if entry is not None and entry[0] == revision and entry[2] == upstream:
+            return entry[3]
+        forecast = forecast_plan(self.plan(name, revision), upstream)
+        self._entries[name] = (revision, projects, upstream, forecast)
+        self.recomputes += 1
+        return forecast
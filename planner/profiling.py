@@ -0,0 +1,122 @@
+"""Wall-clock profiling of app reruns, per step and per named stage."""
+
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import numpy as np
+
+from .workbook import replace_file_atomically
+
+PROFILE_WINDOW = 500  # Samples kept per step / stage for the rolling percentiles
+PERCENTILES = (50, 90, 99)
+
+
+def _step_key(step):
+    return f"{step:g}" if isinstance(step, (int, float)) else str(step)
+
+
+class RerunProfiler:
+    """Rolling timings of whole reruns by step, and of named stages within them.
+
+    rerun(step) wraps one run of the script; stage(name) wraps a piece of work
+    inside it ("file parse", "analysis", ...). Each stage is kept overall and
+    per step. The last PROFILE_WINDOW samples of each are kept for the
+    percentiles. One profiler is shared by all sessions: recording is
+    thread-safe and every thread (Streamlit runs each session's script in its
+    own) tracks its own current step and stages.
+    """
+
+    def __init__(self, window=PROFILE_WINDOW):
+        self.window = window
+        self.reruns = 0
+        self._steps = {}  # step -> deque of seconds
+        self._stages = {}  # stage name -> deque of seconds
+        self._step_stages = {}  # (step, stage name) -> deque of seconds
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _record(self, samples, key, seconds):
+        window = samples.get(key)
+        if window is None:
+            window = samples[key] = deque(maxlen=self.window)
+        window.append(seconds)
+
+    @contextmanager
+    def rerun(self, step):
+        """Times one run of the script, which is on the given step."""
+        step = _step_key(step)
+        self._local.step = step
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            self._local.step = None
+            with self._lock:
+                self.reruns += 1
+                self._record(self._steps, step, seconds)
+
+    @contextmanager
+    def stage(self, name):
+        """Times a named stage of the current rerun (or outside any rerun).
+
+        A stage nested in a stage of the same name is part of the outer one's
+        time and isn't recorded again.
+        """
+        active = self._local.__dict__.setdefault("active", set())
+        if name in active:
+            yield
+            return
+        active.add(name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            active.discard(name)
+            step = getattr(self._local, "step", None)
+            with self._lock:
+                self._record(self._stages, name, seconds)
+                if step is not None:
+                    self._record(self._step_stages, (step, name), seconds)
+
+    @staticmethod
+    def _stats(window):
+        samples = np.fromiter(window, dtype=np.float64) * 1000
+        stats = {"samples": len(samples)}
+        for p, value in zip(PERCENTILES, np.percentile(samples, PERCENTILES)):
+            stats[f"p{p}_ms"] = round(float(value), 3)
+        stats["max_ms"] = round(float(samples.max()), 3)
+        stats["last_ms"] = round(float(samples[-1]), 3)
+        return stats
+
+    def summary(self):
+        """Returns the rolling percentiles (in milliseconds) of every step, stage and stage within a step."""
+        with self._lock:
+            steps = {step: list(window) for step, window in self._steps.items()}
+            stages = {name: list(window) for name, window in self._stages.items()}
+            step_stages = {key: list(window) for key, window in self._step_stages.items()}
+            reruns = self.reruns
+        by_step = {}
+        for (step, name), window in sorted(step_stages.items()):
+            by_step.setdefault(step, {})[name] = self._stats(window)
+        return {
+            "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "reruns": reruns,
+            "window": self.window,
+            "steps": {step: self._stats(window) for step, window in sorted(steps.items())},
+            "stages": {name: self._stats(window) for name, window in sorted(stages.items())},
+            "stages_by_step": by_step,
+        }
+
+    def to_json(self):
+        return json.dumps(self.summary(), indent=2)
+
+    def write_json(self, path):
+        """Writes summary() to path, replacing the file atomically so readers never see half of it."""
+        data = self.to_json().encode()
+        replace_file_atomically(path, lambda f: f.write(data))
@@ -0,0 +1,179 @@
+"""Monte Carlo schedule risk of a plan against its target end date."""
+
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .store import as_milestone_store
+
+RISK_DISTRIBUTIONS = ("pert", "triangular", "uniform")
+RISK_TRIALS = 10000
+RISK_CHUNK_TRIALS = 2000  # Trials simulated at a time, to bound the trials x milestones matrices
+RISK_PERCENTILES = (50, 80, 95)
+
+ScheduleRisk = namedtuple(
+    "ScheduleRisk",
+    ("trials", "on_time_probability", "p50", "p80", "p95", "planned_finish", "mean_finish", "finish_drivers"),
+)
+
+
+def duration_factors(rng, distribution, size, optimistic, likely, pessimistic):
+    """Samples duration multipliers between optimistic and pessimistic, most often near likely.
+
+    The bounds can be scalars or arrays that broadcast against size (e.g. one
+    value per milestone). "pert" is a beta-PERT distribution, "triangular"
+    and "uniform" are what they say; uniform ignores likely.
+    """
+    low, mode, high = (np.asarray(value, dtype=np.float64) for value in (optimistic, likely, pessimistic))
+    if np.any(low > mode) or np.any(mode > high):
+        raise ValueError("Duration factors must satisfy optimistic <= likely <= pessimistic.")
+    span = high - low
+    spread = np.where(span > 0, span, 1.0)  # A zero span means the duration is fixed
+    if distribution == "uniform":
+        samples = low + span * rng.random(size)
+    elif distribution == "triangular":
+        # Inverse CDF, so the bounds may differ per milestone and be degenerate
+        u = rng.random(size)
+        split = (mode - low) / spread
+        samples = np.where(
+            u < split,
+            low + np.sqrt(u * spread * (mode - low)),
+            high - np.sqrt((1 - u) * spread * (high - mode)),
+        )
+    elif distribution == "pert":
+        alpha = 1 + 4 * (mode - low) / spread
+        beta = 1 + 4 * (high - mode) / spread
+        samples = low + span * rng.beta(np.broadcast_to(alpha, size), np.broadcast_to(beta, size))
+    else:
+        raise ValueError(f"Unknown distribution '{distribution}'; expected one of {', '.join(RISK_DISTRIBUTIONS)}.")
+    return np.where(span > 0, samples, mode)
+
+
+def simulate_schedule(
+    milestones,
+    target_end_date=None,
+    trials=RISK_TRIALS,
+    distribution="pert",
+    optimistic=0.9,
+    likely=1.0,
+    pessimistic=1.5,
+    seed=None,
+    chunk_size=RISK_CHUNK_TRIALS,
+    as_of=None,
+):
+    """Simulates the plan's finish date over many trials; returns a ScheduleRisk.
+
+    In each trial the remaining part of every milestone's duration (the part
+    its progress hasn't covered) is scaled by a factor drawn from the
+    distribution, and each milestone starts on its planned start or lag days
+    after its predecessors finish, as in compute_schedule. Remaining work
+    doesn't resume before as_of (a date, e.g. today), so a plan that has
+    fallen behind is simulated from where it stands. Trials are whole NumPy
+    columns: a chunk of trials x milestones is sampled and propagated at
+    once. Milestones missing a date are left out.
+
+    p50/p80/p95 are the finish dates met in that share of trials,
+    on_time_probability the share finishing by target_end_date (None without
+    one), planned_finish the finish of the plan as it stands, ignoring as_of,
+    and finish_drivers, aligned with the store rows, the share of trials in
+    which each milestone is the one that finishes last.
+    """
+    milestones = as_milestone_store(milestones)
+    start_dates = milestones.start_dates
+    end_dates = milestones.end_dates
+    known = ~(np.isnat(start_dates) | np.isnat(end_dates))
+    rows = np.flatnonzero(known)
+    finish_drivers = np.zeros(len(milestones))
+    if not len(rows) or trials <= 0:
+        return ScheduleRisk(0, None, None, None, None, None, None, finish_drivers)
+
+    planned_start = start_dates[rows].astype(np.int64).astype(np.float64)
+    duration = (end_dates[rows] - start_dates[rows]).astype(np.int64).astype(np.float64)
+    done = np.clip(np.nan_to_num(milestones.progress[rows]) / 100, 0, 1)
+    completed = duration * done
+    remaining = duration - completed
+    bounds = [np.broadcast_to(np.asarray(value, dtype=np.float64), (len(milestones),))[rows]
+              for value in (optimistic, likely, pessimistic)]
+
+    # Dependencies between dated milestones, as (position, [(predecessor position, lag)]) in topological order
+    position = np.full(len(milestones), -1)
+    position[rows] = np.arange(len(rows))
+    graph = milestones.dependencies
+    links = []
+    for node in graph.topological_order():
+        i = position[milestones.row_of(node)]
+        if i < 0:
+            continue
+        predecessors = [(position[milestones.row_of(p)], lag) for p, lag in graph.predecessors(node).items()]
+        predecessors = [(j, lag) for j, lag in predecessors if j >= 0]
+        if predecessors:
+            links.append((i, predecessors))
+
+    # Day each milestone's remaining work resumes on at the earliest; finished milestones keep their dates
+    no_resume = np.full(len(rows), -np.inf)
+    resume = no_resume
+    if as_of is not None:
+        resume = np.where(remaining > 0, np.datetime64(as_of, "D").astype(np.int64), -np.inf)
+
+    def finish_dates(factors, resume):
+        # factors is trials x milestones; returns the milestones' finish days, same shape
+        finish = np.maximum(planned_start + completed, resume) + remaining * factors
+        for i, predecessors in links:
+            start = np.full(len(factors), planned_start[i])
+            for j, lag in predecessors:
+                np.maximum(start, finish[:, j] + lag, out=start)
+            finish[:, i] = np.maximum(start + completed[i], resume[i]) + remaining[i] * factors[:, i]
+        return finish
+
+    planned_finish = finish_dates(np.ones((1, len(rows))), no_resume).max()
+    rng = np.random.default_rng(seed)
+    project_finish = np.empty(trials)
+    drivers = np.zeros(len(rows), dtype=np.int64)
+    for first in range(0, trials, chunk_size):
+        count = min(chunk_size, trials - first)
+        finish = finish_dates(duration_factors(rng, distribution, (count, len(rows)), *bounds), resume)
+        last = finish.argmax(axis=1)
+        project_finish[first : first + count] = finish[np.arange(count), last]
+        drivers += np.bincount(last, minlength=len(rows))
+    finish_drivers[rows] = drivers / trials
+
+    def to_date(days):
+        return np.datetime64(int(np.ceil(days)), "D").astype(object)
+
+    on_time_probability = None
+    if target_end_date is not None:
+        target = np.datetime64(target_end_date, "D").astype(np.int64)
+        on_time_probability = float((project_finish <= target).mean())
+    percentiles = np.percentile(project_finish, RISK_PERCENTILES)
+    return ScheduleRisk(
+        trials,
+        on_time_probability,
+        *(to_date(days) for days in percentiles),
+        to_date(planned_finish),
+        to_date(project_finish.mean()),
+        finish_drivers,
+    )
+
+
+def _simulate_plan(job):
+    plan, options = job
+    return simulate_schedule(plan.milestones, plan.target_end_date, **options)
+
+
+def simulate_portfolio(plans, workers=None, seed=None, **options):
+    """Runs simulate_schedule on each of {name: ProjectPlan}; returns {name: ScheduleRisk}.
+
+    Plans are simulated in a process pool (workers processes, default the
+    CPU count), or in this process if workers is 1. Each plan gets its own
+    random stream spawned from seed, so results don't depend on workers.
+    """
+    names = list(plans)
+    seeds = np.random.SeedSequence(seed).spawn(len(names))
+    jobs = [(plans[name], {**options, "seed": plan_seed}) for name, plan_seed in zip(names, seeds)]
+    if workers == 1:
+        results = list(map(_simulate_plan, jobs))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_simulate_plan, jobs))
+    return dict(zip(names, results))
@@ -0,0 +1,125 @@
+"""Write-behind saving of plans on a background thread."""
+
+import atexit
+import os
+import threading
+import time
+from contextlib import nullcontext
+
+from .storage import XlsxPlanStorage
+
+SAVE_DEBOUNCE_SECONDS = float(os.environ.get("SAVE_DEBOUNCE_SECONDS", 1.0))
+
+
+class PlanSaver:
+    """Saves plans on a worker thread once their edits have settled.
+
+    save(name, plan) only marks the plan saved under name dirty and returns.
+    The worker writes it when no newer save() for that name has come in for
+    debounce seconds, so a burst of edits turns into one write. A plan whose
+    version (and details) is already saved or queued is not queued again,
+    so save() is cheap to call on every rerun. The milestones are queued as a
+    copy-on-write snapshot, so later edits don't leak into a pending write.
+
+    Plans are written to storage (a PlanStorage; by default workbooks in the
+    working directory), whose backends never leave a half-written plan.
+    Pending plans are flushed when the interpreter exits.
+    """
+
+    def __init__(self, storage=None, debounce=SAVE_DEBOUNCE_SECONDS, profiler=None):
+        self.storage = storage if storage is not None else XlsxPlanStorage()
+        self.debounce = debounce
+        self.profiler = profiler  # Writes are timed as its "plan save" stage
+        self.writes = 0
+        self._pending = {}  # name -> (plan snapshot, plan key, due time)
+        self._writing = set()
+        self._saved = {}  # name -> plan key of the last successful write
+        self._errors = {}  # name -> exception from the last failed write
+        self._cond = threading.Condition()
+        self._worker = None
+        atexit.register(self.flush, 30)
+
+    @staticmethod
+    def _plan_key(plan):
+        # The token, unlike id(), can't be reused by a later store that reaches the same version
+        return (plan.milestones.token, plan.milestones.version) + tuple(plan[:-1])
+
+    def save(self, name, plan):
+        """Queues plan (a ProjectPlan) to be saved under name; returns False if it was already saved or queued."""
+        key = self._plan_key(plan)
+        with self._cond:
+            pending = self._pending.get(name)
+            if pending is not None and pending[1] == key:
+                return False
+            if pending is None and name not in self._writing and self._saved.get(name) == key:
+                return False
+            snapshot = plan._replace(milestones=plan.milestones.copy())
+            self._pending[name] = (snapshot, key, time.monotonic() + self.debounce)
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="plan-saver", daemon=True)
+                self._worker.start()
+            self._cond.notify_all()
+        return True
+
+    def status(self, name):
+        """Returns "pending", "error", "saved" or None (never saved here) for the plan saved under name."""
+        with self._cond:
+            if name in self._pending or name in self._writing:
+                return "pending"
+            if name in self._errors:
+                return "error"
+            return "saved" if name in self._saved else None
+
+    def error(self, name):
+        """The exception from the last failed write of name, or None."""
+        with self._cond:
+            return self._errors.get(name)
+
+    def flush(self, timeout=None):
+        """Writes all pending plans now and waits for them; returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            now = time.monotonic()
+            for name, (plan, key, _) in self._pending.items():
+                self._pending[name] = (plan, key, now)
+            self._cond.notify_all()
+            while self._pending or self._writing:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def _next_due(self):
+        # Called with the lock held; waits for the earliest pending plan to come due
+        while True:
+            if not self._pending:
+                self._cond.wait()
+                continue
+            name, (plan, key, due) = min(self._pending.items(), key=lambda item: item[1][2])
+            delay = due - time.monotonic()
+            if delay <= 0:
+                del self._pending[name]
+                self._writing.add(name)
+                return name, plan, key
+            self._cond.wait(delay)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                name, plan, key = self._next_due()
+            error = None
+            try:
+                with self.profiler.stage("plan save") if self.profiler is not None else nullcontext():
+                    self.storage.save(name, plan)
+            except Exception as e:
+                error = e
+            with self._cond:
+                self._writing.discard(name)
+                if error is None:
+                    self._saved[name] = key
+                    self._errors.pop(name, None)
+                    self.writes += 1
+                else:
+                    self._errors[name] = error
+                self._cond.notify_all()
@@ -0,0 +1,97 @@
+"""Named what-if scenarios of a plan, analysed side by side."""
+
+import numpy as np
+import pandas as pd
+
+from .analysis import STATUS_BEHIND, STATUS_CRITICAL, delay_warning_mask
+
+
+class ScenarioSet:
+    """What-if scenarios branched from a plan, each a copy-on-write copy with its own analysis.
+
+    base is the AnalysisPipeline bound to the plan. branch() forks it (see
+    AnalysisPipeline.fork): the scenario's milestones share the plan's
+    column arrays and an edit copies only the column it writes, and its
+    analysis starts from the base results, so only the milestones the
+    scenario changed are re-analysed. A dozen scenarios of a large plan cost
+    little more than the columns and rows they edit.
+
+    Scenarios are snapshots: later edits to the plan don't reach them.
+    """
+
+    def __init__(self, base):
+        self.base = base
+        self.plan = base.milestones  # The plan the scenarios were branched from
+        self._scenarios = {}  # name -> AnalysisPipeline, in the order they were created
+        self._origins = {}  # name -> copy of the plan as it was when the scenario was branched off it
+
+    def __len__(self):
+        return len(self._scenarios)
+
+    def __contains__(self, name):
+        return name in self._scenarios
+
+    def __getitem__(self, name):
+        """The scenario's AnalysisPipeline; edit its milestones to change the scenario."""
+        return self._scenarios[name]
+
+    def names(self):
+        return list(self._scenarios)
+
+    def branch(self, name, source=None):
+        """Creates scenario name from the plan, or from scenario source, and returns its pipeline."""
+        name = name.strip()
+        if not name:
+            raise ValueError("A scenario needs a name.")
+        if name in self._scenarios:
+            raise ValueError(f"A scenario named '{name}' already exists.")
+        pipeline = self.base if source is None else self._scenarios[source]
+        scenario = self._scenarios[name] = pipeline.fork()
+        # Copy-on-write, so it costs nothing until the plan is edited
+        self._origins[name] = scenario.milestones.copy() if source is None else self._origins[source]
+        return scenario
+
+    def remove(self, name):
+        del self._scenarios[name]
+        del self._origins[name]
+
+    def compare(self):
+        """Returns one row of key figures for the plan and for each scenario, as a DataFrame.
+
+        The scenarios are analysed as of the base pipeline's date and target
+        end date, reusing their cached results. A scenario's changed
+        milestones are counted against the plan as it was when the scenario
+        was branched, so later edits to the plan don't count.
+        """
+        base = self.base
+        rows = [("Base plan", base)] + [(name, pipeline) for name, pipeline in self._scenarios.items()]
+        base_finish = None
+        records = []
+        for name, pipeline in rows:
+            pipeline.bind(pipeline.milestones, base.as_of, base.target_end_date)
+            status = pipeline.analysis()[0]
+            finish = _finish_date(pipeline.schedule())
+            if pipeline is base:
+                base_finish = finish
+            records.append(
+                {
+                    "Scenario": name,
+                    "Changed Milestones": 0 if pipeline is base else len(pipeline.milestones.changed_ids(self._origins[name])),
+                    "Finish Date": finish,
+                    "Finish vs Base (days)": _days(finish, base_finish),
+                    "Days Past Target": _days(finish, base.target_end_date),
+                    "Behind Schedule": int((status == STATUS_BEHIND).sum()),
+                    "Critical": int((status == STATUS_CRITICAL).sum()),
+                    "Delay Warnings": int(delay_warning_mask(status, pipeline.milestones.end_dates, base.as_of).sum()),
+                }
+            )
+        return pd.DataFrame(records)
+
+
+def _finish_date(schedule):
+    finish = schedule.early_finish[~np.isnat(schedule.early_finish)]
+    return finish.max().astype(object) if len(finish) else None
+
+
+def _days(date, reference):
+    return None if date is None or reference is None else (date - reference).days
@@ -0,0 +1,420 @@
+"""Pluggable storage of saved project plans.
+
+A storage keeps plans under a name (the app uses the plan's file name) and
+has the same small interface whatever the backend:
+
+    storage = open_plan_storage("sqlite:plans.db")
+    storage.save("Website.xlsx", plan)
+    plan = storage.load("Website.xlsx")
+    storage.milestones_frame()  # Milestones of every saved plan, for portfolio-wide queries
+
+"xlsx:<directory>" keeps one workbook per plan, as the app always has;
+"sqlite:<file>" keeps all plans in one SQLite database, and
+"parquet:<directory>" keeps one Parquet file per plan (needs pyarrow). The
+binary backends store the milestone columns as they are, so opening a plan
+skips the cell-by-cell workbook parse; workbooks stay the format for
+importing and exporting plans.
+"""
+
+import importlib.util
+import json
+import os
+import sqlite3
+from abc import ABC, abstractmethod
+from datetime import date, datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from .store import MILESTONE_FIELDS, MilestoneStore
+from .workbook import ProjectPlan, load_project_plan, replace_file_atomically, write_project_plan_atomically
+
+PLAN_STORAGE = os.environ.get("PLAN_STORAGE", "xlsx:.")  # Where the app saves plans, as "<backend>:<location>"
+
+
+def _iso(value):
+    return value.isoformat() if value is not None else None
+
+
+def _from_iso(text):
+    return date.fromisoformat(text) if text else None
+
+
+def _plan_edges(milestones):
+    """The plan's dependencies as (predecessor row, successor row, lag_days) tuples."""
+    return [
+        (milestones.row_of(predecessor), milestones.row_of(successor), int(lag_days))
+        for predecessor, successor, lag_days in milestones.dependencies.edges()
+    ]
+
+
+def _build_plan(details, columns, edges):
+    """Rebuilds a ProjectPlan from its details, milestone columns and row-numbered dependencies."""
+    milestones = MilestoneStore.from_columns(columns)
+    ids = milestones.ids
+    for predecessor, successor, lag_days in edges:
+        milestones.add_dependency(ids[predecessor], ids[successor], lag_days)
+    project_name, description, stakeholders, target_end_date = details
+    return ProjectPlan(project_name, description, stakeholders, _from_iso(target_end_date), milestones)
+
+
+def _file_revision(path):
+    """A file's revision: its modification time and size."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class PlanStorage(ABC):
+    """Saved plans by name. Backends implement save, load, names, delete and revisions.
+
+    load() raises KeyError for a name that isn't saved. Saving replaces the
+    plan atomically, so a reader sees the old plan or the new one. Each save
+    gives the plan a new revision (an opaque stamp), so loaded plans can be
+    cached until their revision changes.
+    """
+
+    @abstractmethod
+    def save(self, name, plan):
+        pass
+
+    @abstractmethod
+    def load(self, name):
+        pass
+
+    @abstractmethod
+    def names(self):
+        pass
+
+    @abstractmethod
+    def delete(self, name):
+        pass
+
+    @abstractmethod
+    def revisions(self):
+        """Returns {name: revision} for every saved plan, without loading them."""
+
+    def __contains__(self, name):
+        return name in self.names()
+
+    def milestones_frame(self, names=None):
+        """Returns the milestones of the given plans (default: all) as one DataFrame with a "Plan" column."""
+        frames = []
+        for name in self.names() if names is None else names:
+            frame = self.load(name).milestones.to_frame()
+            frame.insert(0, "Plan", name)
+            frames.append(frame)
+        if not frames:
+            return pd.DataFrame(columns=("Plan",) + MILESTONE_FIELDS)
+        return pd.concat(frames, ignore_index=True)
+
+
+class XlsxPlanStorage(PlanStorage):
+    """One plan workbook per name in a directory."""
+
+    def __init__(self, directory="."):
+        self.directory = directory
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def save(self, name, plan):
+        write_project_plan_atomically(self._path(name), *plan)
+
+    def load(self, name):
+        path = self._path(name)
+        if not os.path.isfile(path):
+            raise KeyError(name)
+        return load_project_plan(path)
+
+    def names(self):
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(
+            name for name in os.listdir(self.directory)
+            if name.lower().endswith(".xlsx") and not name.startswith(("~$", "."))
+        )
+
+    def delete(self, name):
+        try:
+            os.remove(self._path(name))
+        except FileNotFoundError:
+            raise KeyError(name) from None
+
+    def revisions(self):
+        return {name: _file_revision(self._path(name)) for name in self.names()}
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS plans (
+    name TEXT PRIMARY KEY,
+    project_name TEXT,
+    description TEXT,
+    stakeholders TEXT,
+    target_end_date TEXT,
+    saved_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS milestones (
+    plan TEXT NOT NULL REFERENCES plans(name) ON DELETE CASCADE,
+    row INTEGER NOT NULL,
+    name TEXT,
+    start_date TEXT,
+    end_date TEXT,
+    owner TEXT,
+    progress REAL,
+    status TEXT,
+    PRIMARY KEY (plan, row)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS dependencies (
+    plan TEXT NOT NULL REFERENCES plans(name) ON DELETE CASCADE,
+    predecessor INTEGER NOT NULL,
+    successor INTEGER NOT NULL,
+    lag_days INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS dependencies_plan ON dependencies (plan);
+CREATE INDEX IF NOT EXISTS milestones_end_date ON milestones (end_date);
+"""
+
+# Milestone columns in table order, with the column they're stored in
+SQLITE_MILESTONE_COLUMNS = (
+    ("Name", "name"),
+    ("Start Date", "start_date"),
+    ("End Date", "end_date"),
+    ("Milestone Owner", "owner"),
+    ("Progress", "progress"),
+    ("Status", "status"),
+)
+
+
+class SQLitePlanStorage(PlanStorage):
+    """All plans in one SQLite database file.
+
+    Dates are stored as YYYY-MM-DD text (NULL if missing), which sorts and
+    compares correctly in SQL, and dependencies by milestone row. Every
+    operation opens its own connection, so a storage can be shared between
+    threads (the app's sessions and its background saver).
+    """
+
+    def __init__(self, path="plans.db"):
+        self.path = path
+        connection = self._connect()
+        try:
+            connection.executescript(SQLITE_SCHEMA)
+        finally:
+            connection.close()
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.execute("PRAGMA foreign_keys = ON")
+        connection.execute("PRAGMA journal_mode = WAL")  # Readers don't wait for the saver
+        return connection
+
+    def _query(self, sql, params=()):
+        connection = self._connect()
+        try:
+            return connection.execute(sql, params).fetchall()
+        finally:
+            connection.close()
+
+    def save(self, name, plan):
+        milestones = plan.milestones
+        progress = milestones.progress.astype(object)
+        progress[np.isnan(milestones.progress)] = None
+        rows = zip(
+            [name] * len(milestones),
+            range(len(milestones)),
+            milestones.names.tolist(),
+            np.datetime_as_string(milestones.start_dates, unit="D").tolist(),
+            np.datetime_as_string(milestones.end_dates, unit="D").tolist(),
+            milestones.owners.tolist(),
+            progress.tolist(),
+            milestones.statuses.tolist(),
+        )
+        details = [plan.project_name, plan.description, plan.stakeholders, _iso(plan.target_end_date)]
+        connection = self._connect()
+        try:
+            with connection:  # One transaction: the plan is replaced as a whole or not at all
+                connection.execute("DELETE FROM plans WHERE name = ?", (name,))
+                connection.execute(
+                    "INSERT INTO plans VALUES (?, ?, ?, ?, ?, ?)",
+                    [name, *details, datetime.now(timezone.utc).isoformat(timespec="microseconds")],
+                )
+                connection.executemany(
+                    "INSERT INTO milestones VALUES (?, ?, ?, NULLIF(?, 'NaT'), NULLIF(?, 'NaT'), ?, ?, ?)", rows
+                )
+                connection.executemany(
+                    "INSERT INTO dependencies VALUES (?, ?, ?, ?)",
+                    [(name, *edge) for edge in _plan_edges(milestones)],
+                )
+        finally:
+            connection.close()
+
+    def load(self, name):
+        connection = self._connect()
+        try:
+            details = connection.execute(
+                "SELECT project_name, description, stakeholders, target_end_date FROM plans WHERE name = ?", (name,)
+            ).fetchone()
+            if details is None:
+                raise KeyError(name)
+            rows = connection.execute(
+                "SELECT name, start_date, end_date, owner, progress, status FROM milestones"
+                " WHERE plan = ? ORDER BY row",
+                (name,),
+            ).fetchall()
+            edges = connection.execute(
+                "SELECT predecessor, successor, lag_days FROM dependencies WHERE plan = ?", (name,)
+            ).fetchall()
+        finally:
+            connection.close()
+        values = list(zip(*rows)) or [()] * len(MILESTONE_FIELDS)
+        columns = dict(zip(MILESTONE_FIELDS, values))
+        for field in ("Start Date", "End Date"):
+            columns[field] = np.array(columns[field], dtype="datetime64[D]")  # None -> NaT
+        columns["Progress"] = np.array(columns["Progress"], dtype=np.float64)  # None -> NaN
+        return _build_plan(details, columns, edges)
+
+    def names(self):
+        return [name for (name,) in self._query("SELECT name FROM plans ORDER BY name")]
+
+    def delete(self, name):
+        connection = self._connect()
+        try:
+            with connection:
+                if not connection.execute("DELETE FROM plans WHERE name = ?", (name,)).rowcount:
+                    raise KeyError(name)
+        finally:
+            connection.close()
+
+    def revisions(self):
+        return dict(self._query("SELECT name, saved_at FROM plans"))
+
+    def query(self, sql, params=()):
+        """Runs a read-only SQL query over the plans, milestones and dependencies tables; returns a DataFrame."""
+        connection = self._connect()
+        try:
+            return pd.read_sql_query(sql, connection, params=params)
+        finally:
+            connection.close()
+
+    def milestones_frame(self, names=None):
+        sql = (
+            "SELECT plan AS Plan, "
+            + ", ".join(f'{column} AS "{field}"' for field, column in SQLITE_MILESTONE_COLUMNS)
+            + " FROM milestones"
+        )
+        params = ()
+        if names is not None:
+            names = list(names)
+            sql += f" WHERE plan IN ({', '.join('?' * len(names))})"
+            params = names
+        frame = self.query(sql + " ORDER BY plan, row", params)
+        for field in ("Start Date", "End Date"):
+            frame[field] = pd.to_datetime(frame[field]).astype("datetime64[s]")
+        return frame
+
+
+class ParquetPlanStorage(PlanStorage):
+    """One Parquet file per plan in a directory, with the plan details and dependencies in its metadata.
+
+    pyarrow is imported on first use; opening this storage without it
+    raises ImportError.
+    """
+
+    METADATA_KEY = b"project_plan"
+
+    def __init__(self, directory="plans"):
+        if importlib.util.find_spec("pyarrow") is None:  # Fail now rather than on the first save
+            raise ImportError("The parquet plan storage needs pyarrow (pip install pyarrow).")
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, name):
+        return os.path.join(self.directory, name + ".parquet")
+
+    def save(self, name, plan):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        milestones = plan.milestones
+
+        def text(values):
+            return pa.array([None if value is None else str(value) for value in values], pa.string())
+
+        table = pa.table(
+            {
+                "Name": text(milestones.names),
+                "Start Date": pa.array(milestones.start_dates, pa.date32(), from_pandas=True),
+                "End Date": pa.array(milestones.end_dates, pa.date32(), from_pandas=True),
+                "Milestone Owner": text(milestones.owners),
+                "Progress": pa.array(milestones.progress, pa.float64()),
+                "Status": text(milestones.statuses),
+            }
+        )
+        metadata = {
+            "details": [plan.project_name, plan.description, plan.stakeholders, _iso(plan.target_end_date)],
+            "dependencies": _plan_edges(milestones),
+        }
+        table = table.replace_schema_metadata({self.METADATA_KEY: json.dumps(metadata, default=str)})
+        replace_file_atomically(self._path(name), lambda f: pq.write_table(table, f))
+
+    def load(self, name):
+        import pyarrow.parquet as pq
+
+        path = self._path(name)
+        if not os.path.isfile(path):
+            raise KeyError(name)
+        table = pq.read_table(path)
+        metadata = json.loads(table.schema.metadata[self.METADATA_KEY])
+        # date32 columns come back as datetime64[D] with NaT for nulls
+        columns = {field: table.column(field).to_numpy(zero_copy_only=False) for field in MILESTONE_FIELDS}
+        return _build_plan(metadata["details"], columns, metadata["dependencies"])
+
+    def names(self):
+        return sorted(
+            name[: -len(".parquet")] for name in os.listdir(self.directory)
+            if name.endswith(".parquet") and not name.startswith(".")
+        )
+
+    def delete(self, name):
+        try:
+            os.remove(self._path(name))
+        except FileNotFoundError:
+            raise KeyError(name) from None
+
+    def revisions(self):
+        return {name: _file_revision(self._path(name)) for name in self.names()}
+
+    def milestones_frame(self, names=None):
+        import pyarrow.parquet as pq
+
+        frames = []
+        for name in self.names() if names is None else names:
+            # Only the milestone columns are read; the plans aren't rebuilt
+            frame = pq.read_table(self._path(name), columns=list(MILESTONE_FIELDS)).to_pandas()
+            frame.insert(0, "Plan", name)
+            frames.append(frame)
+        if not frames:
+            return super().milestones_frame([])
+        frame = pd.concat(frames, ignore_index=True)
+        for field in ("Start Date", "End Date"):
+            frame[field] = pd.to_datetime(frame[field])
+        return frame
+
+
+STORAGE_BACKENDS = {
+    "xlsx": XlsxPlanStorage,
+    "sqlite": SQLitePlanStorage,
+    "parquet": ParquetPlanStorage,
+}
+
+
+def open_plan_storage(spec=PLAN_STORAGE):
+    """Opens a plan storage from a "<backend>:<location>" spec, e.g. "sqlite:plans.db" or "xlsx:."."""
+    backend, _, location = spec.partition(":")
+    storage_class = STORAGE_BACKENDS.get(backend)
+    if storage_class is None:
+        raise ValueError(f"Unknown plan storage '{backend}'; expected one of {', '.join(STORAGE_BACKENDS)}.")
+    return storage_class(location) if location else storage_class()
@@ -0,0 +1,428 @@
+"""Columnar milestone storage."""
+
+import itertools
+import sys
+from bisect import insort
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from .dates import normalize_date, normalize_dates
+from .dependencies import DependencyGraph
+
+MILESTONE_FIELDS = ("Name", "Start Date", "End Date", "Milestone Owner", "Progress", "Status")
+
+MILESTONE_DTYPES = {
+    "Name": object,
+    "Start Date": "datetime64[D]",
+    "End Date": "datetime64[D]",
+    "Milestone Owner": object,
+    "Progress": np.float64,
+    "Status": object,
+}
+
+CHANGE_LOG_SIZE = 256  # Changes remembered for incremental recomputation (see changes_since)
+
+_tokens = itertools.count()  # Source of MilestoneStore.token
+
+
+def _to_progress(value):
+    """Converts a progress cell to a float (NaN if missing or not a number)."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _coerce_column(field, values):
+    """Builds a typed array for one milestone column; cells that aren't dates or numbers become NaT/NaN."""
+    dtype = MILESTONE_DTYPES[field]
+    if dtype is object:
+        column = np.empty(len(values), dtype=object)
+        column[:] = list(values)
+        return column
+    if field != "Progress":
+        return normalize_dates(values)[0]
+    try:
+        return np.asarray(values, dtype=dtype)
+    except (TypeError, ValueError):
+        return np.array([_to_progress(v) for v in values], dtype=dtype)
+
+
+class MilestoneStore:
+    """Columnar storage for the milestones of a project plan.
+
+    Dates are kept as datetime64[D] arrays (NaT for "N/A"), progress as float64
+    and the text fields as object arrays, so analysis and charts can work on
+    whole columns at once. Indexing, iteration and assignment still deal in the
+    milestone dicts ("Name", "Start Date", ...) that the editing widgets use.
+
+    copy() is copy-on-write: the copy shares the column arrays, and a change
+    to either store copies only the columns it writes, so handing a cached
+    plan to a session or branching a scenario off it costs next to nothing.
+
+    Each milestone gets an ID when it is added that stays the same through
+    edits and deletions of other milestones. IDs only grow, so the ID column
+    is sorted and row_of() finds a milestone by binary search; a name -> IDs
+    index makes index_of() and ids_of() independent of the plan size.
+
+    dependencies is the plan's DependencyGraph, keyed by milestone ID; a
+    milestone's dependencies go away when it is deleted.
+
+    Every change bumps version and is logged as (kind, row, count), kind
+    being "insert", "update", "delete" or "dependencies", so derived results
+    can be patched with changes_since() instead of recomputed.
+
+    token identifies the store in cache keys: unlike id(), it is never
+    reused by another store (a copy gets its own), so (token, version)
+    always means the same contents.
+    """
+
+    def __init__(self, capacity=16):
+        self._size = 0
+        self._columns = {
+            field: np.empty(capacity, dtype=dtype) for field, dtype in MILESTONE_DTYPES.items()
+        }
+        self._columns["ID"] = np.empty(capacity, dtype=np.int64)
+        self._shared = set()  # Fields whose column arrays may be shared with a copy
+        self.token = next(_tokens)
+        self._next_id = 0
+        self._name_index = None  # name -> sorted list of IDs, built on first use
+        self.dependencies = DependencyGraph()
+        self.version = 0  # Bumped on every change, so derived results can be cached per version
+        self._changes = deque(maxlen=CHANGE_LOG_SIZE)  # (version, kind, row, count)
+
+    @classmethod
+    def from_columns(cls, columns):
+        """Creates a store from a mapping of field name to a sequence of values."""
+        size = len(columns["Name"])
+        store = cls(capacity=max(size, 16))
+        store.extend_columns(columns)
+        return store
+
+    @classmethod
+    def from_records(cls, records):
+        """Creates a store from a list of milestone dicts."""
+        records = list(records)
+        return cls.from_columns(
+            {field: [r.get(field, "" if field == "Status" else None) for r in records] for field in MILESTONE_FIELDS}
+        )
+
+    # --- Column access (views, not copies) ---
+
+    def column(self, field):
+        return self._columns[field][: self._size]
+
+    @property
+    def ids(self):
+        return self.column("ID")
+
+    @property
+    def names(self):
+        return self.column("Name")
+
+    @property
+    def start_dates(self):
+        return self.column("Start Date")
+
+    @property
+    def end_dates(self):
+        return self.column("End Date")
+
+    @property
+    def owners(self):
+        return self.column("Milestone Owner")
+
+    @property
+    def progress(self):
+        return self.column("Progress")
+
+    @property
+    def statuses(self):
+        return self.column("Status")
+
+    # --- Bulk updates ---
+
+    def _reserve(self, size, fields=None):
+        """Makes room for size rows, taking private copies of the shared columns among fields (default: all)."""
+        capacity = len(self._columns["Name"])
+        if size > capacity:
+            capacity = max(size, capacity * 2)
+            fields = list(self._columns)
+        else:
+            fields = [field for field in (self._columns if fields is None else fields) if field in self._shared]
+        for field in fields:
+            column = self._columns[field]
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[: self._size] = column[: self._size]
+            self._columns[field] = grown
+        self._shared.difference_update(fields)
+
+    def extend_columns(self, columns):
+        """Appends a block of rows given as field name -> sequence of values."""
+        count = len(columns["Name"])
+        if count == 0:
+            return
+        self._reserve(self._size + count)
+        for field in MILESTONE_FIELDS:
+            values = columns.get(field)
+            if values is None:
+                values = ["" if field == "Status" else None] * count
+            self._columns[field][self._size : self._size + count] = _coerce_column(field, values)
+        new_ids = np.arange(self._next_id, self._next_id + count)
+        self._columns["ID"][self._size : self._size + count] = new_ids
+        self._next_id += count
+        if self._name_index is not None:
+            for name, milestone_id in zip(self._columns["Name"][self._size : self._size + count], new_ids.tolist()):
+                self._name_index.setdefault(name, []).append(milestone_id)
+        self._size += count
+        self._changed("insert", self._size - count, count)
+
+    # --- Row-oriented view for the editing widgets ---
+
+    def __len__(self):
+        return self._size
+
+    def _index(self, i):
+        if i < 0:
+            i += self._size
+        if not 0 <= i < self._size:
+            raise IndexError("milestone index out of range")
+        return i
+
+    def __getitem__(self, i):
+        """Returns milestone i as a dict (a copy; assign it back to change the store)."""
+        i = self._index(i)
+        start = self._columns["Start Date"][i]
+        end = self._columns["End Date"][i]
+        progress = self._columns["Progress"][i]
+        if np.isnan(progress):
+            progress = None
+        elif progress.is_integer():
+            progress = int(progress)
+        else:
+            progress = float(progress)
+        return {
+            "Name": self._columns["Name"][i],
+            "Start Date": None if np.isnat(start) else start.astype(object),
+            "End Date": None if np.isnat(end) else end.astype(object),
+            "Milestone Owner": self._columns["Milestone Owner"][i],
+            "Progress": progress,
+            "Status": self._columns["Status"][i],
+        }
+
+    def __setitem__(self, i, milestone):
+        self.update(i, milestone)
+
+    def __delitem__(self, i):
+        i = self._index(i)
+        name = self._columns["Name"][i]
+        milestone_id = int(self._columns["ID"][i])
+        self._reserve(self._size)
+        for column in self._columns.values():
+            column[i : self._size - 1] = column[i + 1 : self._size]
+        self._size -= 1
+        self._unindex(name, milestone_id)
+        self._changed("delete", i, 1)
+        if milestone_id in self.dependencies:
+            self.dependencies.remove_node(milestone_id)
+            self._changed("dependencies")
+
+    def __iter__(self):
+        for i in range(self._size):
+            yield self[i]
+
+    def update(self, i, milestone):
+        """Writes the given fields of milestone i; the version only changes if a value did."""
+        i = self._index(i)
+        changed = False
+        for field, value in milestone.items():
+            if field not in MILESTONE_DTYPES:
+                continue
+            if field == "Progress":
+                value = _to_progress(value)
+            elif MILESTONE_DTYPES[field] != object:
+                value = normalize_date(value)
+            old = self._columns[field][i]
+            same = (old == value) or (
+                MILESTONE_DTYPES[field] != object and _is_missing(old) and _is_missing(value)
+            )
+            if not same:
+                self._reserve(self._size, (field,))
+                self._columns[field][i] = value
+                changed = True
+                if field == "Name" and self._name_index is not None:
+                    milestone_id = int(self._columns["ID"][i])
+                    self._unindex(old, milestone_id)
+                    insort(self._name_index.setdefault(value, []), milestone_id)
+        if changed:
+            self._changed("update", i, 1)
+
+    def restore(self, milestone_id, milestone):
+        """Puts a deleted milestone dict back under its old ID, at the position the ID sorts to; returns its row."""
+        milestone_id = int(milestone_id)
+        i = int(np.searchsorted(self.ids, milestone_id))
+        if milestone_id >= self._next_id or (i < self._size and self.ids[i] == milestone_id):
+            raise ValueError(f"milestone ID {milestone_id} wasn't deleted from this store")
+        self._reserve(self._size + 1)
+        for column in self._columns.values():
+            column[i + 1 : self._size + 1] = column[i : self._size]
+        for field in MILESTONE_FIELDS:
+            value = milestone.get(field, "" if field == "Status" else None)
+            self._columns[field][i] = _coerce_column(field, [value])[0]
+        self._columns["ID"][i] = milestone_id
+        self._size += 1
+        if self._name_index is not None:
+            insort(self._name_index.setdefault(self._columns["Name"][i], []), milestone_id)
+        self._changed("insert", i, 1)
+        return i
+
+    def append(self, milestone):
+        """Appends one milestone dict."""
+        self.extend_columns({field: [milestone.get(field, "" if field == "Status" else None)] for field in MILESTONE_FIELDS})
+
+    def copy(self):
+        """Returns a copy-on-write copy of the store."""
+        store = type(self)(capacity=0)
+        store._columns = dict(self._columns)
+        store._size = self._size
+        store.version = self.version
+        store._next_id = self._next_id
+        store._shared = set(self._columns)
+        self._shared = set(self._columns)
+        store.dependencies = self.dependencies.copy()
+        return store
+
+    def add_dependency(self, predecessor, successor, lag_days=0):
+        """Records that milestone ID successor starts lag_days after milestone ID predecessor finishes."""
+        for milestone_id in (predecessor, successor):
+            if self.row_of(milestone_id) is None:
+                raise KeyError(f"no milestone with ID {milestone_id}")
+        self.dependencies.add_dependency(int(predecessor), int(successor), lag_days)
+        self._changed("dependencies")
+
+    def remove_dependency(self, predecessor, successor):
+        """Drops the dependency of milestone ID successor on milestone ID predecessor."""
+        self.dependencies.remove_dependency(int(predecessor), int(successor))
+        self._changed("dependencies")
+
+    def _changed(self, kind, row=0, count=0):
+        self.version += 1
+        self._changes.append((self.version, kind, row, count))
+
+    def changes_since(self, version):
+        """Returns the changes made after version as (kind, row, count) tuples, oldest first.
+
+        Returns None if the log no longer reaches back to version (or version
+        belongs to another store), in which case derived results have to be
+        recomputed from scratch.
+        """
+        if version == self.version:
+            return []
+        if version > self.version or not self._changes or self._changes[0][0] > version + 1:
+            return None
+        return [change[1:] for change in self._changes if change[0] > version]
+
+    def freeze(self):
+        """Makes the column arrays read-only; changes then go to private copies."""
+        for column in self._columns.values():
+            column.flags.writeable = False
+        self._shared = set(self._columns)
+        return self
+
+    def changed_ids(self, other):
+        """Returns the sorted IDs of the milestones added, deleted or edited here relative to other.
+
+        other is typically the store this one was copied from. Columns the two
+        stores still share are skipped without comparing them.
+        """
+        ids, other_ids = self.ids, other.ids
+        common, rows, other_rows = np.intersect1d(ids, other_ids, assume_unique=True, return_indices=True)
+        same_rows = self._columns["ID"] is other._columns["ID"]
+        edited = np.zeros(len(common), dtype=bool)
+        for field, dtype in MILESTONE_DTYPES.items():
+            if same_rows and self._columns[field] is other._columns[field]:
+                continue
+            mine, theirs = self.column(field)[rows], other.column(field)[other_rows]
+            differs = mine != theirs
+            if dtype != object:
+                missing = np.isnat if mine.dtype.kind == "M" else np.isnan
+                differs &= ~(missing(mine) & missing(theirs))
+            edited |= differs
+        return np.union1d(np.setxor1d(ids, other_ids, assume_unique=True), common[edited])
+
+    def nbytes(self):
+        """Estimates the memory held by the store, including the strings in the text columns."""
+        total = sum(column.nbytes for column in self._columns.values())
+        for field, dtype in MILESTONE_DTYPES.items():
+            if dtype is object:
+                total += sum(map(sys.getsizeof, self.column(field)))
+        return total
+
+    # --- Lookup by ID and name ---
+
+    def row_of(self, milestone_id):
+        """Returns the position of the milestone with the given ID, or None."""
+        ids = self.ids
+        i = int(np.searchsorted(ids, milestone_id))
+        return i if i < self._size and ids[i] == milestone_id else None
+
+    def get(self, milestone_id):
+        """Returns the milestone with the given ID as a dict, or None."""
+        i = self.row_of(milestone_id)
+        return None if i is None else self[i]
+
+    def ids_of(self, name):
+        """Returns the IDs of the milestones with the given name, oldest first."""
+        return list(self._names().get(name, ()))
+
+    def index_of(self, name):
+        """Returns the position of the first milestone with the given name, or None."""
+        ids = self._names().get(name)
+        return self.row_of(ids[0]) if ids else None
+
+    def _names(self):
+        if self._name_index is None:
+            index = {}
+            for name, milestone_id in zip(self.names, self.ids.tolist()):
+                index.setdefault(name, []).append(milestone_id)
+            self._name_index = index
+        return self._name_index
+
+    def _unindex(self, name, milestone_id):
+        if self._name_index is None:
+            return
+        ids = self._name_index[name]
+        ids.remove(milestone_id)
+        if not ids:
+            del self._name_index[name]
+
+    def to_frame(self):
+        """Returns the milestones as a typed pandas DataFrame."""
+        return pd.DataFrame({field: self.column(field) for field in MILESTONE_FIELDS})
+
+    def to_display_frame(self):
+        """Returns the milestones as a DataFrame with dates formatted as YYYY-MM-DD ('N/A' if missing)."""
+        df = self.to_frame()
+        for field in ("Start Date", "End Date"):
+            df[field] = format_dates(self.column(field))
+        return df
+
+
+def format_dates(dates):
+    """Formats a datetime64 array as YYYY-MM-DD strings, with 'N/A' for missing dates."""
+    return np.where(np.isnat(dates), "N/A", np.datetime_as_string(dates, unit="D"))
+
+
+def _is_missing(value):
+    if isinstance(value, np.datetime64):
+        return np.isnat(value)
+    return isinstance(value, float) and np.isnan(value)
+
+
+def as_milestone_store(milestones):
+    """Returns milestones as a MilestoneStore, converting a list of dicts if needed."""
+    if isinstance(milestones, MilestoneStore):
+        return milestones
+    return MilestoneStore.from_records(milestones)
@@ -0,0 +1,231 @@
+"""Reading and writing project plan workbooks.
+
+A plan workbook has the project details in A1:B4, the milestone header in
+row 6 and one milestone per row from row 7 down to the first blank name.
+Dependencies between milestones, if any, are kept on a second sheet.
+
+openpyxl is imported on first use, so the package can be imported without
+paying for it.
+"""
+
+import os
+import stat
+import tempfile
+from collections import namedtuple
+import numpy as np
+
+from .dates import normalize_dates
+from .store import MILESTONE_FIELDS, MilestoneStore, as_milestone_store, format_dates
+
+ProjectPlan = namedtuple(
+    "ProjectPlan", ("project_name", "description", "stakeholders", "target_end_date", "milestones")
+)
+
+
+class PlanFormatError(ValueError):
+    """Raised when a workbook doesn't follow the project plan layout."""
+
+
+PLAN_HEADER_LABELS = ("Project Name:", "Description:", "Stakeholders:", "Target End Date:")
+MILESTONE_HEADER = ("Milestone Name", "Start Date", "End Date", "Milestone Owner", "Progress", "Status")
+DEPENDENCY_SHEET = "Dependencies"
+# The names are for people reading the sheet; the milestones are identified by their row on the plan sheet
+DEPENDENCY_HEADER = ("Predecessor", "Successor", "Lag (days)", "Predecessor Row", "Successor Row")
+
+
+def write_project_plan(target, project_name, description, stakeholders, target_end_date, milestones):
+    """Writes a project plan workbook to a file path or a binary file object (e.g. io.BytesIO).
+
+    Rows 1-4 hold the project details, row 6 the milestone header and the
+    milestones follow from row 7. Dependencies go on a "Dependencies" sheet
+    when the plan has any, naming each milestone and giving its row. The
+    workbook is built in write-only mode, so rows are streamed out instead
+    of being kept as a cell tree.
+    """
+    import openpyxl
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+
+    milestones = as_milestone_store(milestones)
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet()
+
+    title = WriteOnlyCell(ws, value=project_name)
+    title.font = Font(size=14, bold=True)
+    header_values = (
+        title,
+        description,
+        stakeholders,
+        target_end_date.strftime("%Y-%m-%d") if target_end_date else "N/A",
+    )
+    for label, value in zip(PLAN_HEADER_LABELS, header_values):
+        ws.append([label, value])
+    ws.append([])
+    ws.append(MILESTONE_HEADER)
+
+    # Whole progress values are written as integers, missing ones as empty cells
+    progress = milestones.progress
+    whole = progress == np.floor(progress)
+    progress_values = progress.astype(object)
+    progress_values[whole] = progress[whole].astype(np.int64).tolist()
+    progress_values[np.isnan(progress)] = None
+
+    for row in zip(
+        milestones.names,
+        format_dates(milestones.start_dates),
+        format_dates(milestones.end_dates),
+        milestones.owners,
+        progress_values,
+        milestones.statuses,
+    ):
+        ws.append(row)
+
+    if len(milestones.dependencies):
+        ws = wb.create_sheet(DEPENDENCY_SHEET)
+        ws.append(DEPENDENCY_HEADER)
+        names = milestones.names
+        for predecessor, successor, lag_days in milestones.dependencies.edges():
+            predecessor_row, successor_row = milestones.row_of(predecessor), milestones.row_of(successor)
+            ws.append([names[predecessor_row], names[successor_row], lag_days, predecessor_row + 7, successor_row + 7])
+
+    wb.save(target)
+
+
+def replace_file_atomically(path, write):
+    """Calls write(file) on a temporary binary file next to path, then renames it over path.
+
+    The temporary file is flushed to disk and given the permissions of the
+    file it replaces (0644 for a new file) before the rename, so path always
+    holds either the old or the new contents, never a partial file.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            mode = stat.S_IMODE(os.stat(path).st_mode)
+        except FileNotFoundError:
+            mode = 0o644
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def write_project_plan_atomically(path, project_name, description, stakeholders, target_end_date, milestones):
+    """Writes a plan workbook to path through replace_file_atomically, never leaving a half-written file."""
+    replace_file_atomically(
+        path, lambda f: write_project_plan(f, project_name, description, stakeholders, target_end_date, milestones)
+    )
+
+
+LOAD_CHUNK_SIZE = 5000  # Milestone rows converted to columns at a time while loading
+BAD_DATE_CELLS_SHOWN = 10  # Invalid date cells named in the load error; the rest are counted
+
+
+def iter_milestone_chunks(ws, chunk_size=LOAD_CHUNK_SIZE, on_progress=None):
+    """Yields the milestone rows (row 7 down to the first blank name) as column dicts of up to chunk_size rows.
+
+    on_progress, if given, is called after each chunk with the number of rows
+    read so far and the row count the sheet declares (None if unknown).
+    """
+    total_rows = ws.max_row - 6 if ws.max_row else None
+    ws.reset_dimensions()  # Don't trust the declared dimensions to find the last row
+    rows_read = 0
+    chunk = {field: [] for field in MILESTONE_FIELDS}
+    for row in ws.iter_rows(min_row=7, max_col=len(MILESTONE_FIELDS), values_only=True):
+        if row[0] is None:
+            break
+        for values, value in zip(chunk.values(), row):
+            values.append(value)
+        rows_read += 1
+        if rows_read % chunk_size == 0:
+            yield chunk
+            chunk = {field: [] for field in MILESTONE_FIELDS}
+            if on_progress:
+                on_progress(rows_read, total_rows)
+    if chunk["Name"]:
+        yield chunk
+    if on_progress:
+        on_progress(rows_read, rows_read)
+
+
+def _dependency_milestone(milestones, name, sheet_row):
+    """The ID of the milestone a Dependencies sheet entry refers to, or None.
+
+    Saved sheets give the milestone's row on the plan sheet. Older and
+    hand-made sheets only name it, in which case the first milestone with
+    that name is meant.
+    """
+    if isinstance(sheet_row, (int, float)) and sheet_row == int(sheet_row):
+        i = int(sheet_row) - 7
+        return int(milestones.ids[i]) if 0 <= i < len(milestones) else None
+    ids = milestones.ids_of(name) or milestones.ids_of(str(name))
+    return ids[0] if ids else None
+
+
+def load_project_plan(file_path, chunk_size=LOAD_CHUNK_SIZE, on_progress=None):
+    """Loads project plan data from an Excel file, handling 'N/A' for Target End Date.
+
+    The workbook is streamed in read-only mode and the milestones are added to
+    the store chunk by chunk, so memory stays bounded for very large plans.
+    Date cells may be dates, ISO text or Excel serial numbers (see
+    normalize_dates). Returns a ProjectPlan; raises PlanFormatError listing
+    every date cell that can't be parsed, or if the Dependencies sheet holds
+    a cycle, a bad lag or an unknown milestone.
+    """
+    import openpyxl
+
+    wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True) # data_only=True to read cell values
+    try:
+        ws = wb.active
+
+        header = [row[1] if len(row) > 1 else None for row in ws.iter_rows(max_row=4, max_col=2, values_only=True)]
+        header += [None] * (4 - len(header))
+        project_name, description, stakeholders, target_end_date_cell = header
+
+        # Every date cell goes through normalize_dates; the bad ones are reported together at the end
+        target_end_date, bad = normalize_dates([target_end_date_cell])
+        target_end_date = target_end_date[0].astype(object)  # A date, or None if empty or "N/A"
+        bad_cells = [f"B4 ({target_end_date_cell!r})" for _ in bad]
+
+        milestones = MilestoneStore()
+        first_row = 7
+        for chunk in iter_milestone_chunks(ws, chunk_size, on_progress):
+            for field in ("Start Date", "End Date"):
+                column = chr(ord("A") + MILESTONE_FIELDS.index(field))
+                dates, bad = normalize_dates(chunk[field])
+                bad_cells += [f"{column}{first_row + i} ({chunk[field][i]!r})" for i in bad.tolist()]
+                chunk[field] = dates
+            milestones.extend_columns(chunk)
+            first_row += len(chunk["Name"])
+        if bad_cells:
+            shown = ", ".join(bad_cells[:BAD_DATE_CELLS_SHOWN])
+            more = f" and {len(bad_cells) - BAD_DATE_CELLS_SHOWN} more" if len(bad_cells) > BAD_DATE_CELLS_SHOWN else ""
+            raise PlanFormatError(
+                f"Invalid dates in {len(bad_cells)} cell(s): {shown}{more}. "
+                "Please use YYYY-MM-DD, an Excel date or 'N/A'."
+            )
+
+        if DEPENDENCY_SHEET in wb.sheetnames:
+            for row in wb[DEPENDENCY_SHEET].iter_rows(min_row=2, max_col=len(DEPENDENCY_HEADER), values_only=True):
+                row = tuple(row) + (None,) * (len(DEPENDENCY_HEADER) - len(row))
+                predecessor, successor, lag_days, predecessor_row, successor_row = row
+                if predecessor is None or successor is None:
+                    break
+                predecessor_id = _dependency_milestone(milestones, predecessor, predecessor_row)
+                successor_id = _dependency_milestone(milestones, successor, successor_row)
+                if predecessor_id is None or successor_id is None:
+                    raise PlanFormatError(f"Dependency {predecessor} -> {successor} refers to an unknown milestone.")
+                try:
+                    milestones.add_dependency(predecessor_id, successor_id, int(lag_days or 0))
+                except (TypeError, ValueError) as e:
+                    raise PlanFormatError(f"Invalid dependency {predecessor} -> {successor}: {e}")
+    finally:
+        wb.close()  # Read-only workbooks keep the file open until closed
+
+    return ProjectPlan(project_name, description, stakeholders, target_end_date, milestones)
@@ -0,0 +1,18 @@
+from datetime import date
+
+from planner import MilestoneStore, calculate_program_duration
+
+
+def test_program_duration():
+    milestones = MilestoneStore.from_records(
+        [
+            {"Name": "Design", "Start Date": date(2024, 1, 1), "End Date": None},
+            {"Name": "Build", "Start Date": None, "End Date": date(2024, 3, 1)},
+        ]
+    )
+    assert calculate_program_duration(milestones) == (date(2024, 1, 1), date(2024, 3, 1), 60)
+
+
+def test_program_duration_without_dates():
+    milestones = MilestoneStore.from_records([{"Name": "Design"}, {"Name": "Build", "End Date": date(2024, 3, 1)}])
+    assert calculate_program_duration(milestones) == (None, None, None)
@@ -0,0 +1,46 @@
+from datetime import date
+
+from planner import MilestoneStore, PlanCache, ProjectPlan, plan_nbytes
+
+
+def make_plan(name):
+    milestones = MilestoneStore.from_records([{"Name": name, "End Date": date(2024, 1, 1)}] * 10)
+    return ProjectPlan(name, "", "", None, milestones)
+
+
+def test_hits_and_misses():
+    cache = PlanCache(budget_bytes=2**20)
+    assert cache.get("a") is None
+    plan = cache.put("a", make_plan("a"))
+    assert cache.get("a") is plan
+    assert cache.get_or_load("a", lambda: 1 / 0) is plan
+    assert cache.get_or_load("b", lambda: None) is None
+    assert (cache.hits, cache.misses) == (2, 2)
+
+
+def test_put_freezes_the_milestones():
+    plan = PlanCache(budget_bytes=2**20).put("a", make_plan("a"))
+    assert not plan.milestones.names.flags.writeable
+    copy = plan.milestones.copy()
+    copy.update(0, {"Name": "b"})  # A session's edits go to its own columns
+    assert plan.milestones[0]["Name"] == "a"
+
+
+def test_evicts_the_least_recently_used_plans_over_budget():
+    size = plan_nbytes(make_plan("a"))
+    cache = PlanCache(budget_bytes=2 * size)
+    cache.put("a", make_plan("a"))
+    cache.put("b", make_plan("b"))
+    cache.get("a")
+    cache.put("c", make_plan("c"))
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.evictions == 1 and cache.used_bytes == 2 * size
+
+
+def test_keeps_a_plan_larger_than_the_budget():
+    cache = PlanCache(budget_bytes=1)
+    cache.put("a", make_plan("a"))
+    cache.put("b", make_plan("b"))
+    assert cache.get("a") is None and cache.get("b") is not None
+    assert cache.stats()["plans"] == 1
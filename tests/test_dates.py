@@ -0,0 +1,46 @@
+from datetime import date, datetime
+
+import numpy as np
+
+from planner import normalize_date, normalize_dates
+
+
+def test_excel_serials():
+    assert normalize_date(1) == np.datetime64("1900-01-01")
+    assert normalize_date(59) == np.datetime64("1900-02-28")
+    assert normalize_date(61) == np.datetime64("1900-03-01")
+    assert normalize_date(45413) == np.datetime64("2024-05-01")
+    assert normalize_date(45413.75) == np.datetime64("2024-05-01")
+    assert normalize_date(2958465) == np.datetime64("9999-12-31")
+
+
+def test_serials_that_are_not_dates():
+    # 60 is Excel's 1900-02-29, which doesn't exist
+    for value in (0, -1, 60, 60.5, 2958466, True):
+        assert np.isnat(normalize_date(value)), value
+
+
+def test_text_dates():
+    for text in ("2024-05-01", "2024/5/1", "2024.05.01", "20240501", "2024-05-01T09:00", " 2024-05-01 00:00:00+02:00"):
+        assert normalize_date(text) == np.datetime64("2024-05-01"), text
+
+
+def test_dates_and_datetimes():
+    assert normalize_date(date(2024, 5, 1)) == np.datetime64("2024-05-01")
+    assert normalize_date(datetime(2024, 5, 1, 23, 59)) == np.datetime64("2024-05-01")
+    assert normalize_date(np.datetime64("2024-05-01T12:00")) == np.datetime64("2024-05-01")
+
+
+def test_normalize_dates_reports_bad_cells():
+    dates, bad = normalize_dates([date(2024, 5, 1), None, "N/A", "", "soon", 45413, "2024-02-30", float("nan"), 60])
+    assert dates.dtype == np.dtype("datetime64[D]")
+    assert dates[0] == dates[5] == np.datetime64("2024-05-01")
+    assert np.isnat(dates[1:5]).all() and np.isnat(dates[6:]).all()
+    assert bad.tolist() == [4, 6, 8]
+
+
+def test_normalize_dates_keeps_datetime_arrays():
+    values = np.array(["2024-05-01T10:00", "NaT"], dtype="datetime64[s]")
+    dates, bad = normalize_dates(values)
+    assert dates.tolist()[0] == date(2024, 5, 1) and np.isnat(dates[1])
+    assert len(bad) == 0
@@ -0,0 +1,80 @@
+from datetime import date
+
+from planner import EditHistory, MilestoneStore
+
+
+def make_history():
+    plan = MilestoneStore.from_records(
+        [
+            {"Name": "Design", "Start Date": date(2024, 1, 1), "End Date": date(2024, 2, 1), "Progress": 100},
+            {"Name": "Build", "Start Date": date(2024, 2, 1), "End Date": date(2024, 3, 1), "Progress": 20},
+            {"Name": "Launch", "Start Date": date(2024, 3, 1), "End Date": date(2024, 3, 15), "Progress": 0},
+        ]
+    )
+    plan.add_dependency(0, 1, 2)
+    plan.add_dependency(1, 2)
+    return EditHistory(plan)
+
+
+def test_undo_and_redo_an_update():
+    history = make_history()
+    plan = history.milestones
+    assert history.update(1, {"Progress": 60, "Status": "Late"})
+    assert not history.update(1, {"Progress": 60})
+    assert history.next_undo().before == {"Progress": 20, "Status": ""}
+    history.undo()
+    assert plan[1]["Progress"] == 20 and plan[1]["Status"] == ""
+    history.redo()
+    assert plan[1]["Progress"] == 60 and plan[1]["Status"] == "Late"
+
+
+def test_undo_a_delete_restores_the_milestone_and_its_dependencies():
+    history = make_history()
+    plan = history.milestones
+    before = list(plan)
+    history.delete(1)
+    assert len(plan) == 2 and list(plan.dependencies.edges()) == []
+    history.undo()
+    assert list(plan) == before
+    assert sorted(plan.dependencies.edges()) == [(0, 1, 2), (1, 2, 0)]
+    history.redo()
+    assert [m["Name"] for m in plan] == ["Design", "Launch"]
+
+
+def test_undo_an_append():
+    history = make_history()
+    plan = history.milestones
+    history.append({"Name": "Support"})
+    history.undo()
+    assert len(plan) == 3
+    history.redo()
+    assert plan[3]["Name"] == "Support"
+
+
+def test_undo_applies_to_the_milestone_by_id():
+    history = make_history()
+    plan = history.milestones
+    history.update(2, {"Progress": 50})
+    del plan[0]  # Not recorded; moves the edited milestone up a row
+    history.undo()
+    assert plan[1]["Name"] == "Launch" and plan[1]["Progress"] == 0
+
+
+def test_a_new_edit_clears_redo():
+    history = make_history()
+    history.update(0, {"Progress": 90})
+    history.undo()
+    history.update(1, {"Progress": 30})
+    assert history.redo() is None
+    assert len(history) == 1
+
+
+def test_history_is_bounded():
+    history = EditHistory(make_history().milestones, max_edits=2)
+    for progress in (10, 20, 30):
+        history.update(2, {"Progress": progress})
+    assert len(history) == 2
+    history.undo()
+    history.undo()
+    assert history.undo() is None
+    assert history.milestones[2]["Progress"] == 10
@@ -0,0 +1,113 @@
+from datetime import date
+
+import numpy as np
+
+from planner import EditHistory, IncrementalAnalysis, MilestoneStore
+
+AS_OF = date(2024, 2, 15)
+
+
+def make_plan():
+    return MilestoneStore.from_records(
+        [
+            {"Name": "Design", "Start Date": date(2024, 1, 1), "End Date": date(2024, 2, 1), "Progress": 100},
+            {"Name": "Build", "Start Date": date(2024, 2, 1), "End Date": date(2024, 3, 1), "Progress": 20},
+        ]
+    )
+
+
+def assert_matches_full_analysis(analysis):
+    full = IncrementalAnalysis(analysis.milestones, analysis.as_of, analysis.target_end_date)
+    np.testing.assert_array_equal(analysis.status, full.status)
+    np.testing.assert_array_equal(analysis.expected_progress, full.expected_progress)
+    np.testing.assert_array_equal(analysis.warning_codes, full.warning_codes)
+    assert analysis.duration() == full.duration()
+    schedule, full_schedule = analysis.schedule(), full.schedule()
+    assert schedule.critical_path == full_schedule.critical_path
+    for field in schedule._fields[:-1]:
+        np.testing.assert_array_equal(getattr(schedule, field), getattr(full_schedule, field), err_msg=field)
+
+
+def test_append_then_delete_before_sync():
+    plan = make_plan()
+    analysis = IncrementalAnalysis(plan, AS_OF)
+    analysis.schedule()
+    history = EditHistory(plan)
+    history.append({"Name": "Launch", "Start Date": date(2024, 3, 1), "End Date": date(2024, 3, 15)})
+    history.undo()
+    assert analysis.sync()
+    assert analysis.full_recomputes == 1
+    assert_matches_full_analysis(analysis)
+
+
+def random_plan(rng, size):
+    start = np.datetime64("2024-01-01") + rng.integers(0, 120, size)
+    records = []
+    for i in range(size):
+        records.append(
+            {
+                "Name": f"M{i}",
+                "Start Date": None if rng.random() < 0.05 else start[i],
+                "End Date": start[i] + int(rng.integers(1, 60)),
+                "Progress": int(rng.integers(0, 101)),
+            }
+        )
+    plan = MilestoneStore.from_records(records)
+    ids = plan.ids
+    for _ in range(size // 3):
+        predecessor, successor = sorted(rng.choice(size, 2, replace=False))
+        plan.add_dependency(ids[predecessor], ids[successor], int(rng.integers(0, 5)))
+    return plan
+
+
+def random_edit(rng, plan):
+    kind = rng.choice(["update", "update", "append", "delete", "dependency"])
+    i = int(rng.integers(len(plan)))
+    day = np.datetime64("2024-01-01") + int(rng.integers(0, 200))
+    if kind == "update":
+        plan.update(i, {"Start Date": day, "End Date": day + int(rng.integers(1, 60)), "Progress": int(rng.integers(0, 101))})
+    elif kind == "append":
+        plan.append({"Name": "New", "Start Date": day, "End Date": day + 10, "Progress": 0})
+    elif kind == "delete" and len(plan) > 2:
+        del plan[i]
+    elif kind == "dependency":
+        predecessor, successor = sorted(rng.choice(len(plan), 2, replace=False))
+        plan.add_dependency(plan.ids[predecessor], plan.ids[successor], 1)
+
+
+def test_sync_matches_full_analysis_after_random_edits():
+    rng = np.random.default_rng(0)
+    for _ in range(20):
+        plan = random_plan(rng, 30)
+        analysis = IncrementalAnalysis(plan, AS_OF, date(2024, 6, 1))
+        for _ in range(15):
+            for _ in range(int(rng.integers(1, 4))):
+                random_edit(rng, plan)
+            if rng.random() < 0.5:
+                analysis.schedule()  # Exercise the patched schedule as well as the recomputed one
+            analysis.sync()
+            assert_matches_full_analysis(analysis)
+        assert analysis.incremental_updates > 0
+
+
+def test_sync_recomputes_when_many_rows_change():
+    plan = random_plan(np.random.default_rng(1), 200)
+    analysis = IncrementalAnalysis(plan, AS_OF)
+    for i in range(len(plan)):
+        plan.update(i, {"Progress": 50})
+    analysis.sync()
+    assert analysis.full_recomputes == 2
+    assert_matches_full_analysis(analysis)
+
+
+def test_fork_shares_results_until_edited():
+    plan = make_plan()
+    analysis = IncrementalAnalysis(plan, AS_OF)
+    copy = plan.copy()
+    fork = analysis.fork(copy)
+    assert fork.status is analysis.status
+    copy.update(1, {"Progress": 100})
+    fork.sync()
+    assert fork.status is not analysis.status
+    assert_matches_full_analysis(fork)
+    assert_matches_full_analysis(analysis)
@@ -0,0 +1,62 @@
+from datetime import date
+
+import pytest
+
+from planner import AnalysisPipeline, MilestoneStore, ScenarioSet
+
+
+def make_scenarios():
+    milestones = MilestoneStore.from_records(
+        [
+            {"Name": "Design", "Start Date": date(2024, 1, 1), "End Date": date(2024, 2, 1), "Progress": 100},
+            {"Name": "Build", "Start Date": date(2024, 2, 1), "End Date": date(2024, 3, 1), "Progress": 20},
+            {"Name": "Launch", "Start Date": date(2024, 3, 1), "End Date": date(2024, 3, 15), "Progress": 0},
+        ]
+    )
+    milestones.add_dependency(0, 1)
+    milestones.add_dependency(1, 2)
+    return ScenarioSet(AnalysisPipeline().bind(milestones, date(2024, 2, 15), date(2024, 3, 20)))
+
+
+def figures(scenarios):
+    return scenarios.compare().set_index("Scenario")
+
+
+def test_scenarios_are_copies_of_the_plan():
+    scenarios = make_scenarios()
+    late = scenarios.branch(" Late build ")
+    late.milestones.update(1, {"End Date": date(2024, 3, 11)})
+    assert scenarios.names() == ["Late build"]
+    assert scenarios.plan[1]["End Date"] == date(2024, 3, 1)
+    row = figures(scenarios).loc["Late build"]
+    assert row["Changed Milestones"] == 1
+    assert row["Finish Date"] == date(2024, 3, 25)
+    assert row["Finish vs Base (days)"] == 10
+    assert row["Days Past Target"] == 5
+
+
+def test_edits_to_the_plan_after_branching_are_not_scenario_changes():
+    scenarios = make_scenarios()
+    scenarios.branch("Copy")
+    scenarios.base.milestones.update(0, {"Progress": 90})
+    del scenarios.base.milestones[2]
+    assert figures(scenarios).loc["Copy", "Changed Milestones"] == 0
+
+
+def test_branch_from_a_scenario_counts_changes_from_the_plan():
+    scenarios = make_scenarios()
+    scenarios.branch("Late").milestones.update(1, {"Progress": 10})
+    later = scenarios.branch("Later", source="Late")
+    later.milestones.update(2, {"Progress": 5})
+    assert figures(scenarios).loc["Later", "Changed Milestones"] == 2
+    scenarios.remove("Late")
+    assert scenarios.names() == ["Later"]
+
+
+def test_scenario_names():
+    scenarios = make_scenarios()
+    scenarios.branch("A")
+    with pytest.raises(ValueError):
+        scenarios.branch("A")
+    with pytest.raises(ValueError):
+        scenarios.branch("  ")
@@ -0,0 +1,92 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from planner import MILESTONE_FIELDS, MilestoneStore, PlanStorage, ProjectPlan, open_plan_storage
+
+
+def make_plan():
+    milestones = MilestoneStore.from_records(
+        [
+            {"Name": "Review", "Start Date": date(2024, 1, 1), "End Date": date(2024, 2, 1), "Progress": 100,
+             "Milestone Owner": "Ana", "Status": "Done"},
+            {"Name": "Review", "Start Date": date(2024, 2, 1), "End Date": date(2024, 3, 1), "Progress": 37.5},
+            {"Name": "42", "Start Date": None, "End Date": date(2024, 4, 1), "Progress": None},
+        ]
+    )
+    milestones.add_dependency(0, 1, 2)
+    milestones.add_dependency(1, 2)
+    return ProjectPlan("Website", "New site", "Marketing", date(2024, 6, 30), milestones)
+
+
+@pytest.fixture(params=["xlsx", "sqlite", "parquet"])
+def storage(request, tmp_path):
+    if request.param == "parquet":
+        pytest.importorskip("pyarrow")
+    location = tmp_path / "plans.db" if request.param == "sqlite" else tmp_path
+    return open_plan_storage(f"{request.param}:{location}")
+
+
+def milestone_rows(milestones):
+    # A workbook can't tell an empty cell from empty text
+    return [{field: None if value == "" else value for field, value in milestone.items()} for milestone in milestones]
+
+
+def assert_same_plan(loaded, plan):
+    assert tuple(loaded[:-1]) == tuple(plan[:-1])
+    assert milestone_rows(loaded.milestones) == milestone_rows(plan.milestones)
+    assert sorted(loaded.milestones.dependencies.edges()) == sorted(plan.milestones.dependencies.edges())
+
+
+def test_round_trip(storage):
+    plan = make_plan()
+    storage.save("Website.xlsx", plan)
+    assert storage.names() == ["Website.xlsx"]
+    assert "Website.xlsx" in storage
+    assert_same_plan(storage.load("Website.xlsx"), plan)
+
+
+def test_save_replaces_the_plan_and_its_revision(storage):
+    plan = make_plan()
+    storage.save("Website.xlsx", plan)
+    revision = storage.revisions()["Website.xlsx"]
+    plan.milestones.update(1, {"Progress": 80})
+    plan.milestones.remove_dependency(1, 2)
+    storage.save("Website.xlsx", plan)
+    assert storage.revisions()["Website.xlsx"] != revision
+    assert_same_plan(storage.load("Website.xlsx"), plan)
+
+
+def test_missing_plans(storage):
+    with pytest.raises(KeyError):
+        storage.load("Missing.xlsx")
+    with pytest.raises(KeyError):
+        storage.delete("Missing.xlsx")
+    storage.save("Website.xlsx", make_plan())
+    storage.delete("Website.xlsx")
+    assert storage.names() == [] and storage.revisions() == {}
+
+
+def test_milestones_frame(storage):
+    storage.save("A.xlsx", make_plan())
+    storage.save("B.xlsx", make_plan())
+    frame = storage.milestones_frame(["B.xlsx"])
+    assert list(frame.columns) == ["Plan", *MILESTONE_FIELDS]
+    assert frame["Plan"].tolist() == ["B.xlsx"] * 3
+    assert frame["End Date"].tolist()[0] == np.datetime64("2024-02-01")
+    assert len(storage.milestones_frame()) == 6
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        open_plan_storage("csv:plans")
+
+
+def test_backends_implement_the_interface():
+    class Incomplete(PlanStorage):
+        def save(self, name, plan):
+            pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
@@ -0,0 +1,112 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from planner import MilestoneStore
+
+
+def make_plan():
+    return MilestoneStore.from_records(
+        [
+            {"Name": "Design", "Start Date": date(2024, 1, 1), "End Date": date(2024, 2, 1), "Progress": 100},
+            {"Name": "Build", "Start Date": date(2024, 2, 1), "End Date": date(2024, 3, 1), "Progress": 20},
+            {"Name": "Review", "Start Date": "2024-03-01", "End Date": None, "Progress": None},
+        ]
+    )
+
+
+def test_rows_round_trip_as_dicts():
+    plan = make_plan()
+    assert plan[0] == {
+        "Name": "Design",
+        "Start Date": date(2024, 1, 1),
+        "End Date": date(2024, 2, 1),
+        "Milestone Owner": None,
+        "Progress": 100,
+        "Status": "",
+    }
+    assert plan[2]["Start Date"] == date(2024, 3, 1)
+    assert plan[2]["End Date"] is None and plan[2]["Progress"] is None
+
+
+def test_ids_are_stable_across_deletes():
+    plan = make_plan()
+    del plan[0]
+    plan.append({"Name": "Launch"})
+    assert plan.ids.tolist() == [1, 2, 3]
+    assert plan.row_of(0) is None
+    assert plan.get(3)["Name"] == "Launch"
+    assert plan.index_of("Review") == 1
+
+
+def test_copy_is_copy_on_write():
+    plan = make_plan()
+    copy = plan.copy()
+    assert copy.token != plan.token
+    copy.update(1, {"Progress": 50})
+    assert plan[1]["Progress"] == 20
+    assert copy._columns["Name"] is plan._columns["Name"]  # Columns that weren't written stay shared
+    plan.update(0, {"Name": "Plan"})
+    assert copy[0]["Name"] == "Design"
+
+
+def test_update_only_bumps_the_version_on_a_change():
+    plan = make_plan()
+    version = plan.version
+    plan.update(1, {"Progress": 20, "End Date": "2024-03-01"})
+    plan.update(2, {"End Date": None})
+    assert plan.version == version
+    plan.update(1, {"Progress": 30})
+    assert plan.version == version + 1
+
+
+def test_change_log():
+    plan = make_plan()
+    version = plan.version
+    plan.update(1, {"Progress": 30})
+    plan.append({"Name": "Launch"})
+    del plan[0]
+    plan.add_dependency(1, 2)
+    assert plan.changes_since(version) == [("update", 1, 1), ("insert", 3, 1), ("delete", 0, 1), ("dependencies", 0, 0)]
+    assert plan.changes_since(plan.version) == []
+    assert MilestoneStore().changes_since(version) is None
+
+
+def test_deleting_a_milestone_drops_its_dependencies():
+    plan = make_plan()
+    plan.add_dependency(0, 1, 2)
+    plan.add_dependency(1, 2)
+    del plan[1]
+    assert list(plan.dependencies.edges()) == []
+    with pytest.raises(KeyError):
+        plan.add_dependency(1, 2)
+
+
+def test_restore_puts_a_milestone_back_in_place():
+    plan = make_plan()
+    deleted = plan[1]
+    del plan[1]
+    assert plan.restore(1, deleted) == 1
+    assert plan.ids.tolist() == [0, 1, 2]
+    assert plan[1] == deleted
+    with pytest.raises(ValueError):
+        plan.restore(1, deleted)
+
+
+def test_changed_ids():
+    plan = make_plan()
+    copy = plan.copy()
+    assert copy.changed_ids(plan).tolist() == []
+    copy.update(2, {"End Date": "2024-04-01"})
+    del copy[0]
+    copy.append({"Name": "Launch"})
+    assert copy.changed_ids(plan).tolist() == [0, 2, 3]
+
+
+def test_freeze_makes_edits_copy_the_columns():
+    plan = make_plan().freeze()
+    plan.update(0, {"Progress": 50})
+    assert plan[0]["Progress"] == 50
+    assert not plan._columns["Name"].flags.writeable
+    assert np.isnan(plan.progress[2])